@@ -0,0 +1,179 @@
+"""Throughput of the session detail query at increasing concurrency.
+
+Requests go through an ASGI app in-process (no network), so what is measured
+is how well the worker overlaps database waits. The detail query
+(``session_tree_query``, as served by ``GET /v1/workout-session/{id}`` on a
+cache miss) runs on three stacks:
+
+* ``async``: ``get_db`` and ``load_session_tree`` on asyncpg, like the API.
+* ``threaded``: a ``def`` route on the sync engine (psycopg2). Starlette runs
+  it in its threadpool, so the loop stays free while threads block.
+* ``blocking``: the sync engine called from an ``async def`` route. Each query
+  stops the event loop, so req/s stays flat as concurrency grows.
+
+None of them goes through the detail cache, so every request waits on the
+database. A local database answers faster than the per-request CPU cost,
+which hides the difference; ``--latency-ms`` adds a ``pg_sleep`` per request
+to stand in for the network round trip of a remote one.
+
+    python -m benchmarks.bench_concurrency --requests 400 --levels 1 4 16 64
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+import httpx
+from fastapi import Depends, FastAPI, HTTPException, Response, status
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.database import SessionLocal, async_engine, engine, get_db, warm_pool
+from main import app
+from src.auth.dependencies import get_current_principal
+from src.auth.schema import Principal
+from src.workout_session.queries import (
+    build_session_tree,
+    load_session_tree,
+    session_tree_query,
+)
+
+bench_app = FastAPI()
+latency = 0.0
+
+
+def _detail(session) -> Response:
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Session not found"
+        )
+    return Response(content=session.model_dump_json(), media_type="application/json")
+
+
+@bench_app.get("/async/{session_id}")
+async def async_detail(
+    session_id: int,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+):
+    if latency:
+        await db.execute(select(func.pg_sleep(latency)))
+    return _detail(await load_session_tree(db, session_id, current_user.id))
+
+
+def _sync_detail(session_id: int, user_id: int) -> Response:
+    with SessionLocal() as db:
+        if latency:
+            db.execute(select(func.pg_sleep(latency)))
+        rows = db.execute(session_tree_query(session_id, user_id)).all()
+    return _detail(build_session_tree(rows))
+
+
+@bench_app.get("/threaded/{session_id}")
+def threaded_detail(
+    session_id: int, current_user: Principal = Depends(get_current_principal)
+):
+    return _sync_detail(session_id, current_user.id)
+
+
+@bench_app.get("/blocking/{session_id}")
+async def blocking_detail(
+    session_id: int, current_user: Principal = Depends(get_current_principal)
+):
+    # Driver bloqueante dentro de una corrutina: frena el loop entero
+    return _sync_detail(session_id, current_user.id)
+
+
+async def prepare(client: httpx.AsyncClient):
+    username = f"bench_{uuid.uuid4().hex[:8]}"
+    await client.post(
+        "/v1/auth/register",
+        json={
+            "name": "Bench User",
+            "username": username,
+            "password": "benchmark-password",
+            "email": f"{username}@example.com",
+        },
+    )
+    response = await client.post(
+        "/v1/auth/login",
+        data={"username": username, "password": "benchmark-password"},
+    )
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    # Un árbol con contenido, para que el detalle tenga filas que leer
+    exercises = []
+    for index in range(4):
+        response = await client.post(
+            "/v1/exercise/", json={"name": f"Bench {index}"}, headers=headers
+        )
+        exercises.append(
+            {
+                "exercise_id": response.json()["id"],
+                "sets": [
+                    {"set_number": n, "reps": 8, "weight": 60 + n, "unit": "kg"}
+                    for n in range(1, 5)
+                ],
+            }
+        )
+    response = await client.put(
+        "/v1/workout-session/sync",
+        json={
+            "name": "Benchmark session",
+            "session_date": "2024-01-01",
+            "exercises": exercises,
+        },
+        headers=headers,
+    )
+    return headers, response.json()["id"]
+
+
+async def run_level(client, path, headers, concurrency: int, requests: int):
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            response = await client.get(path, headers=headers)
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return requests / (time.perf_counter() - start)
+
+
+async def main():
+    global latency
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--latency-ms", type=float, default=2)
+    args = parser.parse_args()
+    latency = args.latency_ms / 1000
+
+    await warm_pool()
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://bench"
+    ) as api:
+        headers, session_id = await prepare(api)
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=bench_app), base_url="http://bench"
+    ) as client:
+        for label in ("async", "threaded", "blocking"):
+            path = f"/{label}/{session_id}"
+            print(f"GET {path} (+{args.latency_ms:g} ms)")
+            for level in args.levels:
+                throughput = await run_level(
+                    client, path, headers, level, args.requests
+                )
+                print(f"  concurrency={level:<4} {throughput:10.1f} req/s")
+
+    await async_engine.dispose()
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
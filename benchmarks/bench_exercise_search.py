@@ -0,0 +1,119 @@
+"""Exercise search: ILIKE '%term%' (list_exercises) vs the trigram search.
+
+Loads a synthetic catalog for a throwaway user inside a transaction that is
+rolled back at the end, so it can point at any database with pg_trgm.
+
+    python -m benchmarks.bench_exercise_search --catalog 100000 --repeat 20
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from sqlalchemy import insert, select, text
+
+from config.database import build_engine
+from src.exercise.models import Exercise
+from src.exercise.queries import search_exercises_query
+from src.user.models import User
+
+MOVEMENTS = [
+    "Bench press",
+    "Squat",
+    "Deadlift",
+    "Overhead press",
+    "Row",
+    "Curl",
+    "Lunge",
+    "Pull up",
+    "Dip",
+    "Fly",
+    "Extension",
+    "Raise",
+]
+VARIANTS = ["Incline", "Decline", "Paused", "Tempo", "Single arm", "Wide", "Close"]
+EQUIPMENT = ["barbell", "dumbbell", "cable", "machine", "kettlebell", "band"]
+MUSCLE_GROUPS = ["chest", "back", "legs", "shoulders", "biceps", "triceps", "core"]
+TERMS = ["bench", "squat", "dumbell", "pull", "incline press", "raise"]
+
+
+def load_catalog(connection, size: int, seed: int) -> int:
+    rng = random.Random(seed)
+    user_id = connection.execute(
+        insert(User)
+        .values(
+            name="Search benchmark",
+            username=f"search_bench_{seed}",
+            password_hash="x",
+            email="search-bench@example.com",
+        )
+        .returning(User.id)
+    ).scalar_one()
+
+    rows = [
+        {
+            "user_id": user_id,
+            "name": f"{rng.choice(VARIANTS)} {rng.choice(EQUIPMENT)} "
+            f"{rng.choice(MOVEMENTS)} #{i}",
+            "muscle_group": rng.choice(MUSCLE_GROUPS),
+        }
+        for i in range(size)
+    ]
+    connection.execute(insert(Exercise), rows)
+    connection.execute(text("ANALYZE exercises"))
+    return user_id
+
+
+def ilike_query(user_id: int, term: str, limit: int):
+    return (
+        select(Exercise)
+        .where(Exercise.user_id == user_id, Exercise.name.ilike(f"%{term}%"))
+        .order_by(Exercise.name, Exercise.id)
+        .limit(limit)
+    )
+
+
+def timed(connection, query, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = connection.execute(query).all()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--catalog", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    engine = build_engine()
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        try:
+            user_id = load_catalog(connection, args.catalog, args.seed)
+            print(f"catalog={args.catalog} limit={args.limit}")
+            for term in TERMS:
+                ilike_ms, ilike_rows = timed(
+                    connection, ilike_query(user_id, term, args.limit), args.repeat
+                )
+                search_ms, search_rows = timed(
+                    connection,
+                    search_exercises_query(user_id, term, args.limit),
+                    args.repeat,
+                )
+                print(
+                    f"{term!r:<16} ilike={ilike_ms:8.2f}ms ({ilike_rows:>3} rows) "
+                    f"trigram={search_ms:8.2f}ms ({search_rows:>3} rows)"
+                )
+        finally:
+            transaction.rollback()
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Per-request connection cost on the async engine the API uses.
+
+Each request mimics one served through ``get_db``: open an ``AsyncSession``,
+run a trivial query and close it, with ``--concurrency`` requests in flight.
+Three engines built by ``build_async_engine`` are compared:
+
+* ``NullPool``: a new asyncpg connection per request.
+* ``pool cold``: ``TimedAsyncQueuePool`` right after startup, so the first
+  burst pays for opening the connections.
+* ``pool warm``: the same pool after ``warm_pool``, as ``main.py`` does on
+  startup.
+
+The ``first`` row is the first burst (one request per worker), ``steady`` the
+rest. ``wait`` is the checkout time ``TimedAsyncQueuePool`` records (connects
+included); ``NullPool`` does not record it and shows 0.
+
+    python -m benchmarks.bench_pool --requests 400 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from config.database import build_async_engine, warm_pool
+from config.metrics import RequestStats, current_stats
+
+
+async def request(session_factory) -> tuple[float, float]:
+    stats = RequestStats()
+    current_stats.set(stats)
+    start = time.perf_counter()
+    async with session_factory() as db:
+        await db.execute(text("SELECT 1"))
+    return (time.perf_counter() - start) * 1000, stats.pool_wait * 1000
+
+
+async def burst(session_factory, concurrency: int, requests: int):
+    remaining = requests
+    timings = []
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            # Cada request en su propia tarea: su propio RequestStats
+            timings.append(await asyncio.create_task(request(session_factory)))
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return timings
+
+
+def report(label: str, phase: str, timings: list[tuple[float, float]]):
+    ordered = sorted(total for total, _ in timings)
+    p95 = ordered[max(int(len(ordered) * 0.95) - 1, 0)]
+    wait = statistics.mean(wait for _, wait in timings)
+    print(
+        f"{label:<10} {phase:<7} n={len(ordered):<5} "
+        f"mean={statistics.mean(ordered):8.2f}ms "
+        f"p50={statistics.median(ordered):8.2f}ms p95={p95:8.2f}ms "
+        f"wait={wait:8.2f}ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    for label, pooled, warm in (
+        ("NullPool", False, False),
+        ("pool cold", True, False),
+        ("pool warm", True, True),
+    ):
+        engine = build_async_engine(pooled=pooled)
+        try:
+            if warm:
+                await warm_pool(args.concurrency, engine=engine)
+            session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+            first = await burst(session_factory, args.concurrency, args.concurrency)
+            report(label, "first", first)
+            steady = await burst(session_factory, args.concurrency, args.requests)
+            report(label, "steady", steady)
+        finally:
+            await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
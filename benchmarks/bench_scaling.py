@@ -0,0 +1,136 @@
+"""Scaling check: router read queries against one user's growing history.
+
+For every size (sets in a single user's history) a user is bulk-loaded with
+``scripts.bulk_load``, or reused if an earlier run loaded it. Every read query
+from ``scripts.explain_routes.route_queries`` is then timed for that user,
+taking the median of ``--repeat`` runs after a warm-up.
+
+Between consecutive sizes the growth exponent is log(t2/t1) / log(n2/n1):
+
+- about 0 for queries that should not depend on history (pages, single rows);
+- about 1 for the ones that have to read all of it (progression, summaries).
+
+Steps where both timings are under ``--floor-ms`` are fixed overhead and
+noise, so they are skipped. The run exits 1 if any query's exponent exceeds
+1 + ``--tolerance`` (super-linear growth).
+
+    python -m benchmarks.bench_scaling --sizes 1000 10000 100000 1000000
+"""
+
+import argparse
+import json
+import math
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from sqlalchemy import exc, select
+
+from config.database import build_engine
+from scripts.bulk_load import bulk_load
+from scripts.explain_routes import route_queries, sample_ids
+from src.user.models import User
+
+
+def history_user(engine, size: int, seed: int) -> int:
+    prefix = f"scale{size}"
+    with engine.begin() as connection:
+        user_id = connection.scalar(
+            select(User.id).where(User.username == f"{prefix}_{seed}_0")
+        )
+        if user_id is None:
+            print(f"loading a history of {size} sets ...")
+            (user_id,), _ = bulk_load(
+                connection, users=1, sets=size, seed=seed, prefix=prefix
+            )
+    return user_id
+
+
+def time_queries(connection, user_id: int, repeat: int) -> dict[str, float | None]:
+    timings = {}
+    for name, statement in route_queries(sample_ids(connection, user_id)):
+        # Solo lecturas: las escrituras cambiarían el historial que se mide
+        if not statement.is_select:
+            continue
+        savepoint = connection.begin_nested()
+        try:
+            connection.execute(statement).all()
+            runs = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                connection.execute(statement).all()
+                runs.append(time.perf_counter() - start)
+        except exc.DBAPIError as error:
+            savepoint.rollback()
+            print(f"{name:<48} ERROR {error.orig}".splitlines()[0])
+            timings[name] = None
+            continue
+        savepoint.commit()
+        timings[name] = statistics.median(runs) * 1000
+    return timings
+
+
+def exponents(sizes: list[int], timings: list[float], floor_ms: float):
+    steps = []
+    for (n1, t1), (n2, t2) in zip(zip(sizes, timings), zip(sizes[1:], timings[1:])):
+        if max(t1, t2) < floor_ms:
+            continue
+        steps.append(math.log(t2 / t1) / math.log(n2 / n1))
+    return steps
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--floor-ms", type=float, default=1.0)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+    sizes = sorted(args.sizes)
+
+    engine = build_engine(pooled=False)
+    by_size = {}
+    for size in sizes:
+        user_id = history_user(engine, size, args.seed)
+        with engine.connect() as connection:
+            by_size[size] = time_queries(connection, user_id, args.repeat)
+            connection.rollback()
+    engine.dispose()
+
+    header = "".join(f"{size:>11,}" for size in sizes)
+    print(f"\n{'query (ms)':<48}{header}{'exponent':>10}")
+    failures = []
+    report = {}
+    for name in by_size[sizes[0]]:
+        timings = [by_size[size].get(name) for size in sizes]
+        if None in timings:
+            failures.append(f"{name}: error")
+            continue
+        steps = exponents(sizes, timings, args.floor_ms)
+        worst = max(steps, default=None)
+        report[name] = {"ms": dict(zip(sizes, timings)), "exponent": worst}
+
+        flag = ""
+        if worst is not None and worst > 1 + args.tolerance:
+            flag = "  SUPER-LINEAR"
+            failures.append(f"{name}: exponent {worst:.2f}")
+        cells = "".join(f"{t:>11.2f}" for t in timings)
+        exponent = "-" if worst is None else f"{worst:.2f}"
+        print(f"{name:<48}{cells}{exponent:>10}{flag}")
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+
+    if failures:
+        print("\nfailures:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""Response serialization cost per endpoint: before vs after typed models.
+
+"before" is what the routers used to hand FastAPI: ORM objects or ad-hoc
+dicts with no response_model, encoded through ``jsonable_encoder`` and the
+stdlib ``JSONResponse``. "after" is the current path: the declared Pydantic
+response model validates the row tuples and ``ORJSONResponse`` renders the
+result. No database is needed; the payloads are built in memory.
+
+    python -m benchmarks.bench_serialization --items 50 --repeat 2000
+"""
+
+import argparse
+import statistics
+import time
+from datetime import date, datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+
+import config.database  # noqa: F401  (registra los modelos antes de usarlos)
+from src.exercise.models import Exercise
+from src.exercise.schemas import ExercisePage, ExerciseRead
+from src.sets.schemas import SetRead, WeightUnit
+from src.sync.schemas import ChangesPage
+from src.workout_session.models import WorkoutSession
+from src.workout_session.schema import (
+    SessionExerciseDetail,
+    SessionSetDetail,
+    WorkoutSessionDetail,
+    WorkoutSessionPage,
+)
+
+NOW = datetime(2024, 6, 1, 18, 30)
+SET_DETAIL_FIELDS = set(SessionSetDetail.model_fields)
+
+
+def session_rows(n):
+    return [
+        {
+            "id": i,
+            "user_id": 1,
+            "name": f"Session {i}",
+            "notes": "Felt strong" if i % 3 else None,
+            "session_date": date(2024, 1, 1) + timedelta(days=i),
+            "created_at": NOW,
+        }
+        for i in range(1, n + 1)
+    ]
+
+
+def exercise_rows(n):
+    return [
+        {
+            "id": i,
+            "name": f"Exercise {i}",
+            "description": None,
+            "muscle_group": "chest",
+            "created_at": NOW,
+        }
+        for i in range(1, n + 1)
+    ]
+
+
+def set_rows(n):
+    return [
+        {
+            "id": i,
+            "session_exercise_id": 1,
+            "set_number": i,
+            "reps": 8,
+            "weight": 60.0 + i,
+            "unit": WeightUnit.kg,
+            "order_index": i,
+        }
+        for i in range(1, n + 1)
+    ]
+
+
+def detail_tree(exercises, sets):
+    return WorkoutSessionDetail(
+        id=1,
+        user_id=1,
+        name="Push day",
+        notes=None,
+        created_at=NOW,
+        session_date=date(2024, 6, 1),
+        version=3,
+        exercises=[
+            SessionExerciseDetail(
+                id=e,
+                name=f"Exercise {e}",
+                description=None,
+                session_exercise_id=e,
+                order_index=e,
+                sets=[
+                    SessionSetDetail(
+                        **{k: v for k, v in s.items() if k in SET_DETAIL_FIELDS}
+                    )
+                    for s in set_rows(sets)
+                ],
+            )
+            for e in range(1, exercises + 1)
+        ],
+    )
+
+
+def changes_page(n):
+    return {
+        "exercises": [{**e, "row_version": e["id"]} for e in exercise_rows(n)],
+        "workout_sessions": [
+            {k: v for k, v in s.items() if k != "user_id"} | {"row_version": s["id"]}
+            for s in session_rows(n)
+        ],
+        "session_exercises": [
+            {
+                "id": i,
+                "session_id": 1,
+                "exercise_id": i,
+                "order_index": i * 1024,
+                "row_version": i,
+            }
+            for i in range(1, n + 1)
+        ],
+        "sets": [{**s, "row_version": s["id"]} for s in set_rows(n)],
+        "deleted": [],
+        "next_cursor": "WzEwXQ",
+        "has_more": False,
+    }
+
+
+def before(content):
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def after(model):
+    adapter = TypeAdapter(model)
+
+    def render(content):
+        value = adapter.validate_python(content, from_attributes=True)
+        return ORJSONResponse(adapter.dump_python(value, mode="json")).body
+
+    return render
+
+
+def scenarios(items: int):
+    sessions = session_rows(items)
+    exercises = exercise_rows(items)
+    sets = set_rows(8)
+    tree = detail_tree(exercises=8, sets=5)
+    changes = changes_page(items)
+    # Antes las rutas devolvían las entidades ORM ya cargadas
+    session_objects = [WorkoutSession(**s) for s in sessions]
+    exercise_objects = [Exercise(**e) for e in exercises]
+
+    session_page = after(WorkoutSessionPage)
+    exercise_page = after(ExercisePage)
+    exercise_read = after(ExerciseRead)
+    set_list = after(list[SetRead])
+    changes_render = after(ChangesPage)
+
+    return [
+        (
+            "list_sessions",
+            lambda: before({"items": session_objects, "next_cursor": None}),
+            lambda: session_page({"items": sessions, "next_cursor": None}),
+        ),
+        (
+            "list_exercises",
+            lambda: before({"items": exercise_objects, "next_cursor": None}),
+            lambda: exercise_page({"items": exercises, "next_cursor": None}),
+        ),
+        (
+            "create_exercise",
+            lambda: before(exercise_objects[0]),
+            lambda: exercise_read(exercises[0]),
+        ),
+        (
+            "list_sets_from_exercise",
+            lambda: before(sets),
+            lambda: set_list(sets),
+        ),
+        (
+            "detail_session",
+            lambda: before(tree),
+            lambda: tree.model_dump_json().encode(),
+        ),
+        (
+            "sync.list_changes",
+            lambda: before(changes),
+            lambda: changes_render(changes),
+        ),
+    ]
+
+
+def measure(fn, repeat: int):
+    fn()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1_000_000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'endpoint':<26}{'before':>12}{'after':>12}{'speedup':>10}")
+    for name, old, new in scenarios(args.items):
+        old_us = measure(old, args.repeat)
+        new_us = measure(new, args.repeat)
+        print(f"{name:<26}{old_us:>10.1f}us{new_us:>10.1f}us{old_us / new_us:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,546 @@
+"""Load-test suite: scripted user journeys against a seeded database.
+
+The first run seeds a deterministic dataset with ``scripts.seed_data`` (users
+with years of sessions, exercises and sets); later runs with the same
+``--users/--sessions/--seed`` reuse it. Requests go through the ASGI app
+in-process, so no network is involved. Each worker plays one seeded user and
+picks journeys from a seeded RNG: login, logging a workout, browsing history,
+reordering and deleting. Every request is timed and its query count is read
+back from the Server-Timing header.
+
+    python -m benchmarks.bench_suite --users 8 --sessions 1000 --iterations 30 \
+        --output bench/run.json --baseline bench/baseline.json
+
+The JSON report has p50/p95/p99, throughput and queries per request for each
+endpoint and journey. With ``--baseline`` the run is compared endpoint by
+endpoint, and the exit status is 1 if p95 grew beyond ``--tolerance`` or an
+endpoint issues more queries than before.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import statistics
+import sys
+import time
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+import httpx
+from sqlalchemy import func, select
+
+from config.database import async_engine, build_engine, warm_pool
+from main import app
+from scripts.seed_data import SEED_PASSWORD, seed
+from src.exercise.models import Exercise
+from src.session_exercises.models import SessionExercises
+from src.user.models import User
+from src.workout_session.models import WorkoutSession
+
+DEFAULT_MIX = "login=1,log_workout=3,browse_history=5,reorder=2,delete=2"
+_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+def parse_mix(spec: str) -> dict[str, int]:
+    mix = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, weight = item.partition("=")
+        if name not in JOURNEYS:
+            raise SystemExit(f"unknown journey {name!r}")
+        mix[name] = int(weight)
+    return mix
+
+
+def dataset_prefix(users: int, sessions: int) -> str:
+    return f"b{users}x{sessions}"
+
+
+def prepare_dataset(args):
+    # Siembra una sola vez por combinación de parámetros y devuelve, por
+    # usuario, los ids que los recorridos necesitan
+    prefix = dataset_prefix(args.users, args.sessions)
+    pattern = f"{prefix}\\_{args.seed}\\_%"
+    engine = build_engine(pooled=False)
+    with engine.begin() as connection:
+        existing = connection.scalar(
+            select(func.count()).where(User.username.like(pattern))
+        )
+        if not existing:
+            print(f"seeding {args.users} users x {args.sessions} sessions ...")
+            seed(
+                connection,
+                users=args.users,
+                sessions_per_user=args.sessions,
+                seed=args.seed,
+                prefix=prefix,
+            )
+
+        users = []
+        for user_id, username in connection.execute(
+            select(User.id, User.username)
+            .where(User.username.like(pattern))
+            .order_by(User.id)
+        ):
+            exercise_ids = list(
+                connection.scalars(
+                    select(Exercise.id)
+                    .where(Exercise.user_id == user_id)
+                    .order_by(Exercise.id)
+                )
+            )
+            # Sesiones del historial con ejercicios, para leer y reordenar
+            session_ids = list(
+                connection.scalars(
+                    select(WorkoutSession.id)
+                    .where(
+                        WorkoutSession.user_id == user_id,
+                        select(SessionExercises.id)
+                        .where(SessionExercises.session_id == WorkoutSession.id)
+                        .exists(),
+                    )
+                    .order_by(WorkoutSession.id)
+                )
+            )
+            users.append(
+                {
+                    "username": username,
+                    "exercise_ids": exercise_ids,
+                    "session_ids": session_ids,
+                }
+            )
+    engine.dispose()
+    return users
+
+
+class Recorder:
+    def __init__(self):
+        self.requests = defaultdict(list)
+        self.journeys = defaultdict(list)
+
+    def add(self, endpoint: str, elapsed: float, queries: int | None):
+        self.requests[endpoint].append((elapsed, queries))
+
+
+class BenchUser:
+    # Un usuario sembrado durante la corrida: su token, sus ids y las sesiones
+    # que creó y todavía no borró
+    def __init__(self, client, recorder, data, rng):
+        self.client = client
+        self.recorder = recorder
+        self.username = data["username"]
+        self.exercise_ids = data["exercise_ids"]
+        self.session_ids = data["session_ids"]
+        self.rng = rng
+        self.headers = {}
+        self.created = []
+
+    async def call(self, method: str, route: str, expect=200, path=None, **kwargs):
+        # route es la plantilla: agrupa las mediciones igual que /metrics
+        url = route.format(**path) if path else route
+        start = time.perf_counter()
+        response = await self.client.request(
+            method, url, headers=self.headers, **kwargs
+        )
+        elapsed = time.perf_counter() - start
+        if response.status_code != expect:
+            raise RuntimeError(
+                f"{method} {url}: {response.status_code} {response.text[:200]}"
+            )
+        match = _QUERIES.search(response.headers.get("server-timing", ""))
+        self.recorder.add(
+            f"{method} {route}", elapsed, int(match.group(1)) if match else None
+        )
+        return response
+
+    async def login(self):
+        response = await self.call(
+            "POST",
+            "/v1/auth/login",
+            data={"username": self.username, "password": SEED_PASSWORD},
+        )
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    def history_session(self) -> int:
+        # Sesgo hacia lo reciente, como un usuario real
+        index = int(len(self.session_ids) * (1 - self.rng.random() ** 3))
+        return self.session_ids[min(index, len(self.session_ids) - 1)]
+
+
+async def journey_login(user: BenchUser):
+    await user.login()
+    await user.call("GET", "/v1/user/")
+
+
+async def journey_log_workout(user: BenchUser):
+    session = (
+        await user.call(
+            "POST",
+            "/v1/workout-session/",
+            json={"name": "Bench workout", "session_date": date.today().isoformat()},
+        )
+    ).json()
+    session_id = session["id"]
+    user.created.append(session_id)
+    exercise_ids = user.rng.sample(user.exercise_ids, min(4, len(user.exercise_ids)))
+    await user.call(
+        "POST",
+        "/v1/workout-session/{session_id}/add-exercises",
+        path={"session_id": session_id},
+        json={"exercise_ids": exercise_ids},
+    )
+
+    # Un ejercicio set por set, como se carga en el gimnasio; el resto en lote
+    first, rest = exercise_ids[0], exercise_ids[1:]
+    set_ids = []
+    for number in range(1, 4):
+        written = await user.call(
+            "POST",
+            "/v1/set/{session_id}/{exercise_id}",
+            path={"session_id": session_id, "exercise_id": first},
+            json={
+                "set_number": number,
+                "reps": user.rng.randint(3, 12),
+                "weight": round(user.rng.uniform(20, 140), 1),
+                "unit": "kg",
+                "order_index": number,
+            },
+        )
+        set_ids.append(written.json()["id"])
+    if rest:
+        await user.call(
+            "POST",
+            "/v1/set/batch",
+            expect=201,
+            json={
+                "sets": [
+                    {
+                        "session_id": session_id,
+                        "exercise_id": exercise_id,
+                        "set_number": number,
+                        "reps": user.rng.randint(3, 12),
+                        "weight": round(user.rng.uniform(20, 140), 1),
+                        "unit": user.rng.choice(["kg", "lb"]),
+                    }
+                    for exercise_id in rest
+                    for number in range(1, 5)
+                ]
+            },
+        )
+    await user.call(
+        "PUT",
+        "/v1/set/{set_id}",
+        path={"set_id": set_ids[-1]},
+        json={
+            "set_number": 3,
+            "reps": 5,
+            "weight": round(user.rng.uniform(20, 140), 1),
+            "unit": "kg",
+            "order_index": 3,
+        },
+    )
+    await user.call(
+        "GET", "/v1/workout-session/{session_id}", path={"session_id": session_id}
+    )
+
+
+async def journey_browse_history(user: BenchUser):
+    cursor = None
+    for _ in range(3):
+        page = (
+            await user.call(
+                "GET",
+                "/v1/workout-session/",
+                params={"cursor": cursor} if cursor else None,
+            )
+        ).json()
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    session_id = user.history_session()
+    detail = (
+        await user.call(
+            "GET", "/v1/workout-session/{session_id}", path={"session_id": session_id}
+        )
+    ).json()
+    exercise_id = user.rng.choice(detail["exercises"])["id"]
+    await user.call(
+        "GET",
+        "/v1/set/{session_id}/{exercise_id}",
+        path={"session_id": session_id, "exercise_id": exercise_id},
+    )
+    await user.call("GET", "/v1/exercise/")
+    await user.call(
+        "GET",
+        "/v1/analytics/exercises/{exercise_id}/progression",
+        path={"exercise_id": exercise_id},
+    )
+    await user.call(
+        "GET",
+        "/v1/analytics/exercises/{exercise_id}/records",
+        path={"exercise_id": exercise_id},
+    )
+    await user.call("GET", "/v1/analytics/volume", params={"period": "week"})
+    await user.call("GET", "/v1/analytics/muscle-groups")
+    await user.call("GET", "/v1/sync/changes")
+
+
+async def journey_reorder(user: BenchUser):
+    session_id = user.history_session()
+    detail = (
+        await user.call(
+            "GET", "/v1/workout-session/{session_id}", path={"session_id": session_id}
+        )
+    ).json()
+    exercises = detail["exercises"]
+    await user.call(
+        "PUT",
+        "/v1/workout-session/{session_id}/reorder",
+        path={"session_id": session_id},
+        json={"exercise_ids": [e["id"] for e in reversed(exercises)]},
+    )
+    await user.call(
+        "PUT",
+        "/v1/workout-session/{session_id}/exercises/{exercise_id}/position",
+        path={"session_id": session_id, "exercise_id": exercises[-1]["id"]},
+        json={"position": len(exercises)},
+    )
+
+    sets = user.rng.choice(exercises)["sets"]
+    if len(sets) > 1:
+        await user.call(
+            "PUT",
+            "/v1/set/reorder",
+            json={
+                "orders": [
+                    {"set_id": s["id"], "order_index": other["order_index"]}
+                    for s, other in zip(sets, reversed(sets))
+                ]
+            },
+        )
+        await user.call(
+            "PUT",
+            "/v1/set/{set_id}/position",
+            path={"set_id": sets[-1]["id"]},
+            json={"position": 1},
+        )
+
+
+async def journey_delete(user: BenchUser):
+    # Borra lo que cargó log_workout, así el dataset no crece entre corridas
+    if not user.created:
+        await journey_log_workout(user)
+    session_id = user.created.pop()
+    detail = (
+        await user.call(
+            "GET", "/v1/workout-session/{session_id}", path={"session_id": session_id}
+        )
+    ).json()
+    exercises = detail["exercises"]
+    sets = exercises[0]["sets"]
+    if sets:
+        await user.call("DELETE", "/v1/set/{set_id}", path={"set_id": sets[-1]["id"]})
+    if len(exercises) > 1:
+        await user.call(
+            "DELETE",
+            "/v1/workout-session/{session_id}/remove-exercises",
+            path={"session_id": session_id},
+            json={"exercise_ids": [exercises[-1]["id"]]},
+        )
+    await user.call(
+        "DELETE", "/v1/workout-session/{session_id}", path={"session_id": session_id}
+    )
+
+
+JOURNEYS = {
+    "login": journey_login,
+    "log_workout": journey_log_workout,
+    "browse_history": journey_browse_history,
+    "reorder": journey_reorder,
+    "delete": journey_delete,
+}
+
+
+async def worker(user: BenchUser, mix: dict[str, int], iterations: int):
+    names, weights = list(mix), list(mix.values())
+    for _ in range(iterations):
+        name = user.rng.choices(names, weights)[0]
+        start = time.perf_counter()
+        await JOURNEYS[name](user)
+        user.recorder.journeys[name].append(time.perf_counter() - start)
+
+
+def percentile(ordered: list[float], p: float) -> float:
+    # Rango más cercano: siempre es una medición real
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def latency_summary(timings: list[float], wall: float) -> dict:
+    ordered = sorted(timings)
+    return {
+        "count": len(ordered),
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "throughput_rps": round(len(ordered) / wall, 2),
+    }
+
+
+def summarize(recorder: Recorder, wall: float) -> tuple[dict, dict]:
+    endpoints = {}
+    for endpoint, samples in sorted(recorder.requests.items()):
+        queries = [q for _, q in samples if q is not None]
+        endpoints[endpoint] = {
+            **latency_summary([elapsed for elapsed, _ in samples], wall),
+            "queries_mean": round(statistics.fmean(queries), 2) if queries else None,
+            "queries_max": max(queries, default=None),
+        }
+    journeys = {
+        name: latency_summary(timings, wall)
+        for name, timings in sorted(recorder.journeys.items())
+    }
+    return endpoints, journeys
+
+
+def print_report(report: dict):
+    print(
+        f"{'endpoint':<72}{'n':>6}{'p50':>9}{'p95':>9}{'p99':>9}"
+        f"{'req/s':>9}{'q/req':>7}"
+    )
+    for endpoint, row in report["endpoints"].items():
+        print(
+            f"{endpoint:<72}{row['count']:>6}{row['p50_ms']:>9.2f}"
+            f"{row['p95_ms']:>9.2f}{row['p99_ms']:>9.2f}"
+            f"{row['throughput_rps']:>9.1f}{row['queries_mean'] or 0:>7.1f}"
+        )
+    print()
+    for name, row in report["journeys"].items():
+        print(
+            f"journey {name:<64}{row['count']:>6}{row['p50_ms']:>9.2f}"
+            f"{row['p95_ms']:>9.2f}{row['p99_ms']:>9.2f}{row['throughput_rps']:>9.1f}"
+        )
+    total = report["total"]
+    print(
+        f"\n{total['requests']} requests in {total['wall_s']:.2f}s "
+        f"({total['throughput_rps']:.1f} req/s)"
+    )
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    print(
+        f"\n{'endpoint':<72}{'base p95':>10}{'p95':>9}{'delta':>8}"
+        f"{'base q':>8}{'q':>6}"
+    )
+    for endpoint, row in report["endpoints"].items():
+        base = baseline["endpoints"].get(endpoint)
+        if base is None:
+            print(f"{endpoint:<72}{'(new)':>10}")
+            continue
+        delta = row["p95_ms"] / base["p95_ms"] - 1 if base["p95_ms"] else 0.0
+        flags = []
+        if delta > tolerance:
+            flags.append("p95")
+        # Las consultas son deterministas: cualquier aumento es una regresión
+        if (row["queries_mean"] or 0) > (base["queries_mean"] or 0) + 0.01:
+            flags.append("queries")
+        print(
+            f"{endpoint:<72}{base['p95_ms']:>10.2f}{row['p95_ms']:>9.2f}"
+            f"{delta:>+8.0%}{base['queries_mean'] or 0:>8.1f}"
+            f"{row['queries_mean'] or 0:>6.1f}  {' '.join(flags)}"
+        )
+        if flags:
+            regressions.append(f"{endpoint}: {', '.join(flags)}")
+    return regressions
+
+
+async def run(args, users_data):
+    mix = parse_mix(args.mix)
+    recorder = Recorder()
+    await warm_pool()
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://bench"
+    ) as client:
+        users = [
+            BenchUser(client, recorder, data, random.Random(args.seed * 1000 + index))
+            for index, data in enumerate(users_data[: args.concurrency])
+        ]
+        for user in users:
+            await user.login()
+        # El login de preparación no cuenta
+        recorder.requests.clear()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(u, mix, args.iterations) for u in users))
+        wall = time.perf_counter() - start
+
+        # Lo que log_workout dejó sin borrar
+        for user in users:
+            for session_id in user.created:
+                await client.delete(
+                    f"/v1/workout-session/{session_id}", headers=user.headers
+                )
+    await async_engine.dispose()
+    return recorder, wall
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+    if args.concurrency > args.users:
+        # Cada worker juega su propio usuario: sin conflictos de versión
+        parser.error("--concurrency cannot exceed --users")
+
+    users_data = prepare_dataset(args)
+    recorder, wall = asyncio.run(run(args, users_data))
+    endpoints, journeys = summarize(recorder, wall)
+    requests = sum(row["count"] for row in endpoints.values())
+    report = {
+        "meta": {
+            "finished": datetime.now(timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            **{
+                key: str(value) if isinstance(value, Path) else value
+                for key, value in vars(args).items()
+            },
+        },
+        "total": {
+            "requests": requests,
+            "wall_s": round(wall, 3),
+            "throughput_rps": round(requests / wall, 2),
+        },
+        "endpoints": endpoints,
+        "journeys": journeys,
+    }
+    print_report(report)
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"results written to {args.output}")
+
+    if args.baseline:
+        regressions = compare(
+            report, json.loads(args.baseline.read_text()), args.tolerance
+        )
+        if regressions:
+            print("\nregressions:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
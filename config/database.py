@@ -1,39 +1,154 @@
 from dotenv import load_dotenv
 from sqlalchemy import create_engine
+from sqlalchemy.engine import URL
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from sqlalchemy.pool import NullPool
 import os
 
+from config.metrics import TimedAsyncQueuePool, instrument_engine
+from config.slow_queries import SlowQueryLog
+
 # Cargar variables de entorno del archivo .env
 load_dotenv()
 
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
 # Datos de conexión desde variables de entorno
 DATABASE_USER = os.getenv("DB_USER")
 DATABASE_PASSWORD = os.getenv("DB_PASSWORD")
 DATABASE_HOST = os.getenv("DB_HOST", "localhost")
-DATABASE_PORT = os.getenv("DB_PORT", 5432)
+DATABASE_PORT = int(os.getenv("DB_PORT", 5432))
 DATABASE_NAME = os.getenv("DB_NAME")
+DATABASE_SSLMODE = os.getenv("DB_SSLMODE", "require")
+
+# Configuración del pool de conexiones
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_PRE_PING = _env_bool("DB_POOL_PRE_PING", True)
+# Conexiones que se abren al arrancar la app (por defecto, el pool completo)
+DB_POOL_WARM = int(os.getenv("DB_POOL_WARM", DB_POOL_SIZE))
+# Permite volver al comportamiento anterior (una conexión nueva por request)
+DB_USE_NULLPOOL = _env_bool("DB_USE_NULLPOOL", False)
+
+# Log de consultas lentas: umbral en ms (0 = apagado) y captura del plan
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 0))
+SLOW_QUERY_EXPLAIN = _env_bool("SLOW_QUERY_EXPLAIN", True)
+SLOW_QUERY_MAX_ENTRIES = int(os.getenv("SLOW_QUERY_MAX_ENTRIES", 200))
+
+# URLs de conexión a PostgreSQL: psycopg2 para herramientas síncronas
+# (scripts, migraciones) y asyncpg para la API
+DATABASE_URL = URL.create(
+    "postgresql+psycopg2",
+    username=DATABASE_USER,
+    password=DATABASE_PASSWORD,
+    host=DATABASE_HOST,
+    port=DATABASE_PORT,
+    database=DATABASE_NAME,
+    query={"sslmode": DATABASE_SSLMODE},
+)
+ASYNC_DATABASE_URL = DATABASE_URL.set(drivername="postgresql+asyncpg", query={})
+
+
+def _pool_options(pooled: bool) -> dict:
+    if not pooled:
+        return {"poolclass": NullPool}
+
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+def build_engine(url=DATABASE_URL, pooled: bool = not DB_USE_NULLPOOL):
+    return create_engine(url, **_pool_options(pooled))
+
 
-# URL de conexión a PostgreSQL
-DATABASE_URL = f"postgresql+psycopg2://{DATABASE_USER}:{DATABASE_PASSWORD}@{DATABASE_HOST}:{DATABASE_PORT}/{DATABASE_NAME}?sslmode=require"
+def build_async_engine(url=ASYNC_DATABASE_URL, pooled: bool = not DB_USE_NULLPOOL):
+    options = _pool_options(pooled)
+    if pooled:
+        # Igual al pool por defecto, pero mide la espera del checkout
+        options["poolclass"] = TimedAsyncQueuePool
 
-# Crear engine SQLAlchemy
-engine = create_engine(DATABASE_URL, poolclass=NullPool)
+    # asyncpg no entiende "sslmode" en la URL, recibe el modo como "ssl"
+    engine = create_async_engine(url, connect_args={"ssl": DATABASE_SSLMODE}, **options)
+    # Consultas, filas y tiempo de base por request (ver config/metrics.py)
+    instrument_engine(engine.sync_engine)
+    return engine
 
-# Crear SessionLocal
+
+# Crear engines SQLAlchemy
+engine = build_engine()
+async_engine = build_async_engine()
+
+slow_query_log = None
+if SLOW_QUERY_MS > 0:
+    slow_query_log = SlowQueryLog(
+        SLOW_QUERY_MS, explain=SLOW_QUERY_EXPLAIN, max_entries=SLOW_QUERY_MAX_ENTRIES
+    )
+    slow_query_log.instrument(async_engine)
+
+# Crear sesiones
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
 
 # Base para los modelos
 Base = declarative_base()
 
 
 # Dependencia para obtener sesión DB en FastAPI
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
+
+
+async def warm_pool(size: int = DB_POOL_WARM, engine=None):
+    # Abrir las conexiones todas a la vez para que queden en el pool;
+    # si se devolvieran una por una, el pool reutilizaría siempre la misma.
+    engine = engine or async_engine
+    if isinstance(engine.pool, NullPool):
+        return 0
+
+    connections = []
+    try:
+        for _ in range(min(size, DB_POOL_SIZE)):
+            connections.append(await engine.connect())
     finally:
-        db.close()
+        for connection in connections:
+            await connection.close()
+
+    return len(connections)
+
+
+def pool_stats():
+    pool = async_engine.pool
+    if isinstance(pool, NullPool):
+        return {"pool": "NullPool"}
+
+    return {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "max_overflow": DB_MAX_OVERFLOW,
+        "timeout": DB_POOL_TIMEOUT,
+        "recycle": DB_POOL_RECYCLE,
+        "pre_ping": DB_POOL_PRE_PING,
+    }
 
 
 from src.user.models import User as _
@@ -41,3 +156,6 @@ from src.exercise.models import Exercise as _
 from src.session_exercises.models import SessionExercises as _
 from src.sets.models import Set as _
 from src.workout_session.models import WorkoutSession as _
+from src.sync.models import Tombstone as _
+from src.analytics.models import DailyRollup as _
+from src.analytics.models import PersonalRecord as _
@@ -0,0 +1,200 @@
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+ROW_BUCKETS = (0, 1, 10, 50, 100, 500, 1000, 5000, 10000)
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    rows: int = 0
+    db_time: float = 0.0
+    pool_wait: float = 0.0
+    scope: dict | None = None
+
+
+# Estadísticas del request en curso; los eventos del engine corren dentro del
+# mismo contexto (greenlet de SQLAlchemy) y las acumulan aquí
+current_stats: ContextVar[RequestStats | None] = ContextVar(
+    "request_stats", default=None
+)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self):
+        cumulative = 0
+        for bound, count in zip((*self.buckets, "+Inf"), self.counts):
+            cumulative += count
+            yield bound, cumulative
+
+
+class RequestMetrics:
+    # Formato de texto de Prometheus, sin dependencias. Todo corre en el
+    # event loop, así que no hace falta lock
+    HISTOGRAMS = {
+        "http_request_duration_seconds": ("Request wall time", LATENCY_BUCKETS),
+        "http_request_db_seconds": ("Time spent in database queries", LATENCY_BUCKETS),
+        "http_request_db_queries": ("Queries per request", QUERY_BUCKETS),
+        "http_request_db_rows": ("Rows returned per request", ROW_BUCKETS),
+        "http_request_pool_wait_seconds": (
+            "Time waiting for a pooled connection",
+            LATENCY_BUCKETS,
+        ),
+    }
+
+    def __init__(self):
+        self.requests = defaultdict(int)
+        self.histograms = {
+            name: defaultdict(lambda buckets=buckets: Histogram(buckets))
+            for name, (_, buckets) in self.HISTOGRAMS.items()
+        }
+
+    def observe(
+        self, method: str, route: str, status: int, wall: float, stats: RequestStats
+    ):
+        labels = (method, route)
+        self.requests[(method, route, status)] += 1
+        for name, value in (
+            ("http_request_duration_seconds", wall),
+            ("http_request_db_seconds", stats.db_time),
+            ("http_request_db_queries", stats.queries),
+            ("http_request_db_rows", stats.rows),
+            ("http_request_pool_wait_seconds", stats.pool_wait),
+        ):
+            self.histograms[name][labels].observe(value)
+
+    def render(self) -> str:
+        lines = [
+            "# HELP http_requests_total Requests by route and status",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route, status), count in sorted(self.requests.items()):
+            lines.append(
+                f'http_requests_total{{method="{method}",route="{route}",'
+                f'status="{status}"}} {count}'
+            )
+
+        for name, (description, _) in self.HISTOGRAMS.items():
+            lines += [f"# HELP {name} {description}", f"# TYPE {name} histogram"]
+            for (method, route), histogram in sorted(self.histograms[name].items()):
+                labels = f'method="{method}",route="{route}"'
+                for bound, cumulative in histogram.samples():
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+                lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+        return "\n".join(lines) + "\n"
+
+
+request_metrics = RequestMetrics()
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    # El pool no tiene evento "antes del checkout": se mide la espera aquí
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            stats = current_stats.get()
+            if stats is not None:
+                stats.pool_wait += time.perf_counter() - start
+
+
+def instrument_engine(engine):
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _finish(conn, cursor, statement, parameters, context, executemany):
+        stats = current_stats.get()
+        if stats is None:
+            return
+        stats.queries += 1
+        stats.db_time += time.perf_counter() - context._metrics_start
+        # rowcount de un SELECT son las filas devueltas
+        if cursor.description is not None and cursor.rowcount > 0:
+            stats.rows += cursor.rowcount
+
+
+def route_template(scope) -> str:
+    # La plantilla ("/v1/set/{set_id}") y no la ruta real, para no crear una
+    # serie por id
+    route = scope.get("route")
+    return getattr(route, "path_format", None) or getattr(route, "path", "unmatched")
+
+
+def current_route() -> str:
+    # Ruta del request en curso, para atribuirle lo que pase en la base
+    stats = current_stats.get()
+    if stats is None or stats.scope is None:
+        return "none"
+    return route_template(stats.scope)
+
+
+def _server_timing(stats: RequestStats, wall: float) -> bytes:
+    return (
+        f'db;dur={stats.db_time * 1000:.2f};desc="{stats.queries} queries", '
+        f"pool;dur={stats.pool_wait * 1000:.2f}, "
+        f"app;dur={wall * 1000:.2f}"
+    ).encode()
+
+
+class MetricsMiddleware:
+    # ASGI puro: no envuelve el body como BaseHTTPMiddleware
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestStats(scope=scope)
+        token = current_stats.set(stats)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (
+                        b"server-timing",
+                        _server_timing(stats, time.perf_counter() - start),
+                    ),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_stats.reset(token)
+            request_metrics.observe(
+                scope["method"],
+                route_template(scope),
+                status,
+                time.perf_counter() - start,
+                stats,
+            )
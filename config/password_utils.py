@@ -1,11 +1,102 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 from passlib.context import CryptContext
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Procesos dedicados a bcrypt; por defecto la mitad de los CPUs para que el
+# event loop siga teniendo dónde correr durante una ráfaga de logins
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+# Operaciones que pueden esperar turno además de las que están corriendo
+HASH_MAX_QUEUE = int(os.getenv("HASH_MAX_QUEUE", HASH_WORKERS * 4))
+# Tope total (corriendo + en espera), siempre por debajo del pool de
+# conexiones: aunque un request retenga su conexión mientras espera el hash,
+# una ráfaga de logins no puede dejar sin conexiones al resto de la API. Se
+# lee del entorno y no de config.database para no cargar el engine en los
+# procesos de hash
+_DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+HASH_MAX_IN_FLIGHT = max(1, min(HASH_WORKERS + HASH_MAX_QUEUE, _DB_POOL_SIZE - 1))
+
+
+class HashingPoolBusy(Exception):
+    pass
+
 
 def verify_password(plain, hashed):
     return pwd_context.verify(plain, hashed)
 
 
 def hash_password(password):
+    if len(password.encode("utf-8")) > 72:
+        password = password.encode("utf-8")[:72].decode("utf-8", errors="ignore")
     return pwd_context.hash(password)
+
+
+def _warm_up():
+    return None
+
+
+_executor: ProcessPoolExecutor | None = None
+_in_flight = 0
+
+
+def start_hashing_pool():
+    global _executor
+    if _executor is not None:
+        return
+
+    # "spawn" para no heredar el event loop ni las conexiones del proceso padre
+    _executor = ProcessPoolExecutor(
+        max_workers=HASH_WORKERS, mp_context=multiprocessing.get_context("spawn")
+    )
+    for _ in range(HASH_WORKERS):
+        _executor.submit(_warm_up)
+
+
+def shutdown_hashing_pool():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def hashing_pool_stats():
+    return {
+        "workers": HASH_WORKERS,
+        "max_queue": HASH_MAX_QUEUE,
+        "max_in_flight": HASH_MAX_IN_FLIGHT,
+        "in_flight": _in_flight,
+    }
+
+
+def _release():
+    global _in_flight
+    _in_flight -= 1
+
+
+async def _run_in_pool(fn, *args):
+    global _in_flight
+    if _in_flight >= HASH_MAX_IN_FLIGHT:
+        raise HashingPoolBusy()
+
+    start_hashing_pool()
+    loop = asyncio.get_running_loop()
+
+    future = _executor.submit(fn, *args)
+    _in_flight += 1
+    # Se libera el cupo cuando el proceso termina, no cuando el request se
+    # cancela: un hash ya en marcha sigue ocupando un worker
+    future.add_done_callback(lambda _: loop.call_soon_threadsafe(_release))
+
+    return await asyncio.wrap_future(future)
+
+
+async def verify_password_async(plain, hashed):
+    return await _run_in_pool(verify_password, plain, hashed)
+
+
+async def hash_password_async(password):
+    return await _run_in_pool(hash_password, password)
@@ -0,0 +1,252 @@
+import asyncio
+import hmac
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from config.metrics import route_template
+from config.security import ADMIN_TOKEN
+
+# Muestreo: cada cuánto se mira la pila del event loop
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", 1))
+# Modo de fondo: fracción de requests que se perfilan, por defecto y por
+# prefijo de ruta ("/v1/set=0.1,/v1/workout-session=0.05")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0))
+PROFILE_SAMPLE_RATES = os.getenv("PROFILE_SAMPLE_RATES", "")
+# Perfiles individuales que se guardan (los más recientes)
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", 50))
+
+# Primer módulo reconocible desde la hoja de la pila -> categoría
+CATEGORIES = (
+    ("jose", "jwt"),
+    ("fastapi.encoders", "serialization"),
+    ("fastapi.responses", "serialization"),
+    ("orjson", "serialization"),
+    ("json", "serialization"),
+    ("pydantic", "validation"),
+    ("fastapi._compat", "validation"),
+    ("sqlalchemy.orm", "orm"),
+    ("sqlalchemy.engine", "sql_execution"),
+    ("sqlalchemy.sql", "sql_compile"),
+    ("sqlalchemy.dialects", "driver"),
+    ("asyncpg", "driver"),
+    ("src", "app"),
+    ("config", "app"),
+    ("fastapi", "framework"),
+    ("starlette", "framework"),
+)
+
+
+def parse_rates(spec: str) -> dict[str, float]:
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        prefix, _, rate = item.partition("=")
+        rates[prefix.strip()] = float(rate)
+    return rates
+
+
+def _frame_name(frame) -> str:
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{frame.f_code.co_qualname}"
+
+
+def fold(frame) -> str:
+    # Formato "folded" (flamegraph.pl, speedscope): raíz;...;hoja
+    stack = []
+    while frame is not None:
+        stack.append(frame)
+        frame = frame.f_back
+    stack.reverse()
+
+    # Lo que está debajo del Handle._run de asyncio es el event loop, no el
+    # request
+    start = 0
+    for index, candidate in enumerate(stack):
+        if candidate.f_globals.get("__name__") == "asyncio.events":
+            start = index + 1
+    return ";".join(_frame_name(f) for f in stack[start:])
+
+
+def category(stack: str) -> str:
+    for name in reversed(stack.split(";")):
+        module = name.split(":", 1)[0]
+        for prefix, label in CATEGORIES:
+            if module == prefix or module.startswith(prefix + "."):
+                return label
+    return "other"
+
+
+@dataclass
+class Profile:
+    method: str
+    path: str
+    route: str = "unmatched"
+    id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    started: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    duration: float = 0.0
+    requests: int = 1
+    samples: Counter = field(default_factory=Counter)
+
+    def categories(self) -> dict[str, int]:
+        totals = Counter()
+        for stack, count in self.samples.items():
+            totals[category(stack)] += count
+        return dict(totals.most_common())
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.items())
+
+    def summary(self):
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "started": self.started,
+            "duration_ms": round(self.duration * 1000, 2),
+            "requests": self.requests,
+            "samples": sum(self.samples.values()),
+            "categories": self.categories(),
+        }
+
+
+class SamplingProfiler:
+    # Un hilo que, mientras haya requests perfilados, mira cada intervalo la
+    # pila del hilo del event loop y se la asigna a la tarea que está
+    # corriendo. Solo cuenta CPU del loop: lo que espera I/O no aparece.
+    # No toca sys.setswitchinterval (afectaría a todo el proceso): el hilo
+    # toma el GIL cuando el loop lo suelta o cada 5 ms, así que un tramo de
+    # CPU largo queda con menos muestras que el intervalo configurado
+    def __init__(self, interval_ms: float = PROFILE_INTERVAL_MS):
+        self.interval = interval_ms / 1000
+        self.active: dict[asyncio.Task, Profile] = {}
+        self._loop = None
+        self._loop_thread = None
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start(self, profile: Profile):
+        task = asyncio.current_task()
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self.active = {**self.active, task: profile}
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="request-profiler", daemon=True
+            )
+            self._thread.start()
+        self._wake.set()
+        return task
+
+    def stop(self, task):
+        self.active = {t: p for t, p in self.active.items() if t is not task}
+        if not self.active:
+            self._wake.clear()
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            time.sleep(self.interval)
+            task = asyncio.current_task(self._loop)
+            profile = self.active.get(task)
+            if profile is None:
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is not None:
+                profile.samples[fold(frame)] += 1
+
+
+class ProfileStore:
+    def __init__(self, keep: int = PROFILE_KEEP):
+        self.recent: deque[Profile] = deque(maxlen=keep)
+        # Modo de fondo: muestras acumuladas por ruta
+        self.routes: dict[tuple[str, str], Profile] = {}
+
+    def add(self, profile: Profile, explicit: bool):
+        if explicit:
+            self.recent.append(profile)
+            return
+
+        key = (profile.method, profile.route)
+        merged = self.routes.get(key)
+        if merged is None:
+            self.routes[key] = profile
+            return
+        merged.requests += 1
+        merged.duration += profile.duration
+        merged.samples.update(profile.samples)
+
+    def get(self, profile_id: str) -> Profile | None:
+        return next((p for p in self.recent if p.id == profile_id), None)
+
+    def route(self, method: str, route: str) -> Profile | None:
+        return self.routes.get((method, route))
+
+
+profiler = SamplingProfiler()
+profile_store = ProfileStore()
+
+
+def _header(scope, name: bytes) -> str | None:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+class ProfilerMiddleware:
+    # X-Profile + X-Admin-Token válido: se perfila ese request y la respuesta
+    # trae X-Profile-Id (GET /v1/admin/profiles/{id}). Además, una fracción
+    # de los requests se perfila en segundo plano y se acumula por ruta
+    def __init__(self, app, sample_rate=PROFILE_SAMPLE_RATE, rates=None):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.rates = parse_rates(PROFILE_SAMPLE_RATES) if rates is None else rates
+
+    def _rate(self, path: str) -> float:
+        prefixes = [p for p in self.rates if path.startswith(p)]
+        if not prefixes:
+            return self.sample_rate
+        return self.rates[max(prefixes, key=len)]
+
+    def _explicit(self, scope) -> bool:
+        if not ADMIN_TOKEN or _header(scope, b"x-profile") is None:
+            return False
+        token = _header(scope, b"x-admin-token") or ""
+        # En bytes: compare_digest rechaza str con caracteres no ASCII
+        return hmac.compare_digest(token.encode("latin-1"), ADMIN_TOKEN.encode())
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        explicit = self._explicit(scope)
+        rate = self._rate(scope["path"])
+        if not explicit and not (rate and random.random() < rate):
+            return await self.app(scope, receive, send)
+
+        profile = Profile(method=scope["method"], path=scope["path"])
+
+        async def send_wrapper(message):
+            if explicit and message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"x-profile-id", profile.id.encode()),
+                ]
+            await send(message)
+
+        task = profiler.start(profile)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.stop(task)
+            profile.duration = time.perf_counter() - start
+            profile.route = route_template(scope)
+            profile_store.add(profile, explicit)
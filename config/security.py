@@ -1,12 +1,12 @@
+import os
 from datetime import datetime, timedelta
 from jose import jwt
-from passlib.context import CryptContext
 
 SECRET_KEY = "CAMBIA_ESTE_SECRETO"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Token para los endpoints de /v1/admin; sin valor, quedan deshabilitados
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
 
 
 def create_access_token(data: dict):
@@ -14,9 +14,3 @@ def create_access_token(data: dict):
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-
-
-def hash_password(password: str):
-    if len(password.encode("utf-8")) > 72:
-        password = password.encode("utf-8")[:72].decode("utf-8", errors="ignore")
-    return pwd_context.hash(password)
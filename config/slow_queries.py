@@ -0,0 +1,192 @@
+import asyncio
+import contextvars
+import hashlib
+import logging
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from sqlalchemy import event
+
+from config.metrics import current_route
+
+logger = logging.getLogger(__name__)
+
+# Marcadores de asyncpg con su cast ("$3::INTEGER"), literales y números
+_PLACEHOLDER = re.compile(r"\$\d+(?:::[\w\[\]]+(?:\(\d+(?:,\s*\d+)?\))?)?")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w$.])\d+(?:\.\d+)?\b")
+# "IN (?, ?, ?)" y "VALUES (?, ?), (?, ?)" varían con la cantidad de filas
+_LIST = re.compile(r"\(\?(?:, \?)+\)")
+_ROWS = re.compile(r"(\((?:\?|\?, )+[^()]*\))(?:, \(\?(?:, \?)*[^()]*\))+")
+_SPACES = re.compile(r"\s+")
+_EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+# Verdadero dentro de la tarea que captura planes: sus consultas no se anotan
+_capturing = contextvars.ContextVar("slow_query_capturing", default=False)
+
+
+def normalize(statement: str) -> str:
+    sql = _SPACES.sub(" ", statement).strip()
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _LIST.sub("(?, ...)", sql)
+    return _ROWS.sub(r"\1, ...", sql)
+
+
+def _shape(value) -> str:
+    if isinstance(value, (list, tuple)):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+
+def parameter_shape(parameters, executemany: bool) -> str:
+    # Tipos de los parámetros, no sus valores (pueden ser datos personales)
+    if executemany:
+        rows = list(parameters)
+        first = parameter_shape(rows[0], False) if rows else "()"
+        return f"{len(rows)} x {first}"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{k}: {_shape(v)}" for k, v in parameters.items()) + "}"
+    return "(" + ", ".join(_shape(v) for v in parameters or ()) + ")"
+
+
+@dataclass
+class SlowQuery:
+    fingerprint: str
+    statement: str
+    calls: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    routes: Counter = field(default_factory=Counter)
+    parameter_shapes: Counter = field(default_factory=Counter)
+    plan: str | None = None
+    last_seen: datetime | None = None
+
+    def as_dict(self):
+        return {
+            "fingerprint": self.fingerprint,
+            "statement": self.statement,
+            "calls": self.calls,
+            "total_ms": round(self.total_time * 1000, 2),
+            "mean_ms": round(self.total_time / self.calls * 1000, 2),
+            "max_ms": round(self.max_time * 1000, 2),
+            "routes": dict(self.routes.most_common()),
+            "parameter_shapes": dict(self.parameter_shapes.most_common()),
+            "plan": self.plan,
+            "last_seen": self.last_seen,
+        }
+
+
+class SlowQueryLog:
+    # Consultas por encima del umbral, agrupadas por huella de su SQL
+    # normalizado. El plan se captura una vez por huella, en una tarea aparte
+    # con su propia conexión, para no frenar el request que la disparó
+    def __init__(
+        self,
+        threshold_ms: float,
+        explain: bool = True,
+        max_entries: int = 200,
+        explain_timeout_ms: int = 5000,
+    ):
+        self.threshold = threshold_ms / 1000
+        self.explain = explain
+        self.max_entries = max_entries
+        self.explain_timeout_ms = explain_timeout_ms
+        self.entries: dict[str, SlowQuery] = {}
+        self._engine = None
+        self._pending: set[asyncio.Task] = set()
+
+    def instrument(self, engine):
+        # engine es el AsyncEngine: los eventos van en su sync_engine y los
+        # EXPLAIN salen por el mismo pool
+        self._engine = engine
+
+        @event.listens_for(engine.sync_engine, "before_cursor_execute")
+        def _start(conn, cursor, statement, parameters, context, executemany):
+            context._slow_query_start = time.perf_counter()
+
+        @event.listens_for(engine.sync_engine, "after_cursor_execute")
+        def _finish(conn, cursor, statement, parameters, context, executemany):
+            elapsed = time.perf_counter() - context._slow_query_start
+            if elapsed >= self.threshold and not _capturing.get():
+                self.record(statement, parameters, executemany, elapsed)
+
+    def record(self, statement, parameters, executemany: bool, elapsed: float):
+        sql = normalize(statement)
+        fingerprint = hashlib.sha1(sql.encode()).hexdigest()[:16]
+        route = current_route()
+        shape = parameter_shape(parameters, executemany)
+
+        entry = self.entries.get(fingerprint)
+        if entry is None:
+            if len(self.entries) >= self.max_entries:
+                # Se descarta la huella que menos tiempo acumula
+                del self.entries[min(self.entries.values(), key=_total).fingerprint]
+            entry = self.entries[fingerprint] = SlowQuery(fingerprint, sql)
+            explainable = statement.lstrip().upper().startswith(_EXPLAINABLE)
+            if self.explain and explainable and not executemany:
+                self._capture_plan(entry, statement, parameters)
+
+        entry.calls += 1
+        entry.total_time += elapsed
+        entry.max_time = max(entry.max_time, elapsed)
+        entry.routes[route] += 1
+        entry.parameter_shapes[shape] += 1
+        entry.last_seen = datetime.now(timezone.utc)
+
+        logger.warning(
+            "slow query %.1fms [%s] route=%s params=%s: %s",
+            elapsed * 1000,
+            fingerprint,
+            route,
+            shape,
+            sql,
+        )
+
+    def _capture_plan(self, entry: SlowQuery, statement, parameters):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        # Contexto vacío: el EXPLAIN no cuenta en las métricas del request
+        task = loop.create_task(
+            self._explain(entry, statement, parameters),
+            context=contextvars.Context(),
+        )
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _explain(self, entry: SlowQuery, statement, parameters):
+        # ANALYZE ejecuta la consulta: solo para lecturas, y siempre dentro
+        # de una transacción que se descarta
+        _capturing.set(True)
+        is_read = statement.lstrip().upper().startswith(("SELECT", "WITH"))
+        is_read = is_read and " FOR UPDATE" not in statement.upper()
+        options = "ANALYZE, BUFFERS" if is_read else "BUFFERS false"
+        try:
+            async with self._engine.connect() as connection:
+                await connection.exec_driver_sql(
+                    f"SET LOCAL statement_timeout = {int(self.explain_timeout_ms)}"
+                )
+                result = await connection.exec_driver_sql(
+                    f"EXPLAIN ({options}) {statement}", tuple(parameters or ())
+                )
+                entry.plan = "\n".join(row[0] for row in result)
+                await connection.rollback()
+        except Exception as error:
+            entry.plan = f"EXPLAIN failed: {error}"
+
+    def top(self, limit: int = 20):
+        ranked = sorted(self.entries.values(), key=_total, reverse=True)
+        return [entry.as_dict() for entry in ranked[:limit]]
+
+    def reset(self):
+        self.entries.clear()
+
+
+def _total(entry: SlowQuery):
+    return entry.total_time
@@ -1,13 +1,51 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse, PlainTextResponse
 
+from config.database import async_engine, warm_pool
+from config.metrics import MetricsMiddleware, request_metrics
+from config.profiler import ProfilerMiddleware
+from config.password_utils import (
+    HashingPoolBusy,
+    shutdown_hashing_pool,
+    start_hashing_pool,
+)
+from src.admin.routes import router as admin_router
+from src.analytics.routes import router as analytics_router
 from src.auth.routes import router as auth_router
 from src.exercise.routes import router as exercise_router
+from src.health.routes import router as health_router
 from src.sets.routes import router as sets_router
+from src.sync.routes import router as sync_router
 from src.user.routes import router as user_router
 from src.workout_session.routes import router as workout_session_router
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    # Llenar el pool antes de aceptar tráfico
+    await warm_pool()
+    start_hashing_pool()
+    yield
+    shutdown_hashing_pool()
+    await async_engine.dispose()
+
+
+# orjson serializa el resultado ya validado por los response_model
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+
+
+@app.exception_handler(HashingPoolBusy)
+async def hashing_pool_busy_handler(_: Request, __: HashingPoolBusy):
+    # Rechazar rápido en vez de encolar logins que van a llegar tarde
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Servicio de autenticación ocupado, intenta de nuevo"},
+        headers={"Retry-After": "1"},
+    )
+
 
 origins = [
     "http://localhost:3000",
@@ -21,11 +59,28 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Permite todos los métodos: GET, POST, PUT, DELETE...
     allow_headers=["*"],  # Permite todos los headers (incluye Authorization)
+    expose_headers=["ETag", "Server-Timing", "X-Profile-Id"],
 )
+# Perfila solo si lo pide un admin (X-Profile) o por muestreo de fondo
+app.add_middleware(ProfilerMiddleware)
+# Último en agregarse = el más externo: mide también CORS y los errores
+app.add_middleware(MetricsMiddleware)
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(
+        request_metrics.render(), media_type="text/plain; version=0.0.4"
+    )
+
 
+app.include_router(admin_router, prefix="/v1/admin", tags=["Admin"])
+app.include_router(analytics_router, prefix="/v1/analytics", tags=["Analytics"])
 app.include_router(auth_router, prefix="/v1/auth", tags=["Auth"])
 app.include_router(exercise_router, prefix="/v1/exercise", tags=["Exercise"])
+app.include_router(health_router, prefix="/v1/health", tags=["Health"])
 app.include_router(sets_router, prefix="/v1/set", tags=["Sets"])
+app.include_router(sync_router, prefix="/v1/sync", tags=["Sync"])
 app.include_router(user_router, prefix="/v1/user", tags=["User"])
 app.include_router(
     workout_session_router, prefix="/v1/workout-session", tags=["Workout Session"]
@@ -0,0 +1,109 @@
+"""initial schema
+
+Tablas tal como existían antes de introducir migraciones. En una base ya
+creada basta con `alembic stamp 0001`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(150), nullable=False),
+        sa.Column("username", sa.String(30), nullable=False, unique=True),
+        sa.Column("password_hash", sa.String(255), nullable=False),
+        sa.Column("email", sa.String(255), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(), server_default=sa.func.now()),
+        sa.Column("last_login", sa.TIMESTAMP(), server_default=sa.func.now()),
+        sa.Column("active", sa.Boolean()),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+
+    op.create_table(
+        "exercises",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "user_id",
+            sa.Integer(),
+            sa.ForeignKey("users.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("name", sa.String(150), nullable=False),
+        sa.Column("description", sa.Text()),
+        sa.Column("muscle_group", sa.String(150)),
+        sa.Column("created_at", sa.TIMESTAMP(), server_default=sa.func.now()),
+    )
+    op.create_index("ix_exercises_id", "exercises", ["id"])
+
+    op.create_table(
+        "workout_sessions",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "user_id",
+            sa.Integer(),
+            sa.ForeignKey("users.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("name", sa.String(150), nullable=False),
+        sa.Column("notes", sa.Text()),
+        sa.Column("created_at", sa.TIMESTAMP(), server_default=sa.func.now()),
+        sa.Column("session_date", sa.Date(), nullable=False),
+    )
+    op.create_index("ix_workout_sessions_id", "workout_sessions", ["id"])
+
+    op.create_table(
+        "session_exercises",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "session_id",
+            sa.Integer(),
+            sa.ForeignKey("workout_sessions.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column(
+            "exercise_id",
+            sa.Integer(),
+            sa.ForeignKey("exercises.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("order_index", sa.Integer(), nullable=False),
+    )
+    op.create_index("ix_session_exercises_id", "session_exercises", ["id"])
+
+    op.create_table(
+        "sets",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "session_exercise_id",
+            sa.Integer(),
+            sa.ForeignKey("session_exercises.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("set_number", sa.Integer(), nullable=False),
+        sa.Column("reps", sa.Integer(), nullable=False),
+        sa.Column("weight", sa.Float()),
+        sa.Column("unit", sa.Enum("lb", "kg", name="weight_unit"), nullable=False),
+        sa.Column("order_index", sa.Integer(), nullable=False),
+    )
+    op.create_index("ix_sets_id", "sets", ["id"])
+
+
+def downgrade():
+    op.drop_table("sets")
+    op.drop_table("session_exercises")
+    op.drop_table("workout_sessions")
+    op.drop_table("exercises")
+    op.drop_table("users")
+    sa.Enum(name="weight_unit").drop(op.get_bind())
@@ -0,0 +1,172 @@
+"""hot path indexes and unique constraints
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def _compact(table: str, parent: str):
+    # Antes de exigir unicidad, dejar order_index denso 1..N por padre
+    op.execute(f"""
+        UPDATE {table} AS t
+        SET order_index = r.position
+        FROM (
+            SELECT id,
+                   row_number() OVER (
+                       PARTITION BY {parent} ORDER BY order_index, id
+                   ) AS position
+            FROM {table}
+        ) AS r
+        WHERE t.id = r.id AND t.order_index <> r.position
+        """)
+
+
+def _rename_duplicate_exercises():
+    # La API nunca impidió nombres repetidos: el más antiguo conserva el
+    # nombre y los demás pasan a "nombre (id)"
+    op.execute("""
+        UPDATE exercises AS e
+        SET name = left(e.name, 150 - length(' (' || e.id || ')'))
+                   || ' (' || e.id || ')'
+        FROM (
+            SELECT id,
+                   row_number() OVER (PARTITION BY user_id, name ORDER BY id) AS copy
+            FROM exercises
+        ) AS d
+        WHERE e.id = d.id AND d.copy > 1
+        """)
+
+
+# Vínculos repetidos de un ejercicio en una sesión: el primero (por orden)
+# se queda y `copy` numera los demás
+_DUPLICATE_LINKS = """
+    SELECT id, keeper, copy
+    FROM (
+        SELECT id,
+               first_value(id) OVER w AS keeper,
+               row_number() OVER w - 1 AS copy
+        FROM session_exercises
+        WINDOW w AS (PARTITION BY session_id, exercise_id ORDER BY order_index, id)
+    ) AS ranked
+    WHERE copy > 0
+"""
+
+
+def _merge_duplicate_links():
+    # Los sets de cada copia pasan al vínculo que se queda, detrás de los
+    # suyos (la compactación de más abajo los deja densos), y las copias se
+    # borran
+    op.execute(f"""
+        UPDATE sets AS s
+        SET session_exercise_id = d.keeper,
+            order_index = s.order_index + d.copy * 1000000
+        FROM ({_DUPLICATE_LINKS}) AS d
+        WHERE s.session_exercise_id = d.id
+        """)
+    op.execute(f"""
+        DELETE FROM session_exercises
+        WHERE id IN (SELECT id FROM ({_DUPLICATE_LINKS}) AS d)
+        """)
+
+
+def _check_unique(table: str, columns: list[str]):
+    # Si todavía queda algo repetido, cortar con la lista en vez de fallar
+    # al crear la restricción
+    key = ", ".join(columns)
+    query = f"""
+        SELECT {key}, array_agg(id ORDER BY id)
+        FROM {table}
+        GROUP BY {key}
+        HAVING count(*) > 1
+        """
+    conflicts = op.get_bind().execute(sa.text(query)).all()
+    if conflicts:
+        rows = "\n".join(f"  ({key}) = {row[:-1]} ids={row[-1]}" for row in conflicts)
+        raise RuntimeError(
+            f"{table} has rows that repeat ({key}); fix them before "
+            f"upgrading:\n{rows}"
+        )
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Validación de correo repetido en register y edit_profile
+    op.create_index("ix_users_email", "users", ["email"])
+
+    op.create_index(
+        "ix_workout_sessions_user_date_id",
+        "workout_sessions",
+        ["user_id", "session_date", "id"],
+    )
+
+    _rename_duplicate_exercises()
+    _check_unique("exercises", ["user_id", "name"])
+    op.create_unique_constraint(
+        "uq_exercises_user_name", "exercises", ["user_id", "name"]
+    )
+    op.create_index(
+        "ix_exercises_name_trgm",
+        "exercises",
+        ["name"],
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_exercises_muscle_group_trgm",
+        "exercises",
+        ["muscle_group"],
+        postgresql_using="gin",
+        postgresql_ops={"muscle_group": "gin_trgm_ops"},
+    )
+
+    _merge_duplicate_links()
+    _check_unique("session_exercises", ["session_id", "exercise_id"])
+    _compact("session_exercises", "session_id")
+    op.create_unique_constraint(
+        "uq_session_exercises_session_order",
+        "session_exercises",
+        ["session_id", "order_index"],
+        deferrable=True,
+        initially="DEFERRED",
+    )
+    op.create_unique_constraint(
+        "uq_session_exercises_session_exercise",
+        "session_exercises",
+        ["session_id", "exercise_id"],
+    )
+    op.create_index(
+        "ix_session_exercises_exercise_session",
+        "session_exercises",
+        ["exercise_id", "session_id"],
+    )
+
+    _compact("sets", "session_exercise_id")
+    op.create_unique_constraint(
+        "uq_sets_session_exercise_order",
+        "sets",
+        ["session_exercise_id", "order_index"],
+        deferrable=True,
+        initially="DEFERRED",
+    )
+
+
+def downgrade():
+    op.drop_constraint("uq_sets_session_exercise_order", "sets")
+    op.drop_index("ix_session_exercises_exercise_session", "session_exercises")
+    op.drop_constraint("uq_session_exercises_session_exercise", "session_exercises")
+    op.drop_constraint("uq_session_exercises_session_order", "session_exercises")
+    op.drop_index("ix_exercises_muscle_group_trgm", "exercises")
+    op.drop_index("ix_exercises_name_trgm", "exercises")
+    op.drop_constraint("uq_exercises_user_name", "exercises")
+    op.drop_index("ix_workout_sessions_user_date_id", "workout_sessions")
+    op.drop_index("ix_users_email", "users")
@@ -0,0 +1,42 @@
+"""sparse order_index ranks
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+# Mismo valor que src.common.ordering.ORDER_STEP al momento de la migración
+ORDER_STEP = 1024
+
+
+def _respace(table: str, parent: str, step: int):
+    # Deja order_index como step * posición dentro de cada padre
+    op.execute(f"""
+        UPDATE {table} AS t
+        SET order_index = r.position * {step}
+        FROM (
+            SELECT id,
+                   row_number() OVER (
+                       PARTITION BY {parent} ORDER BY order_index, id
+                   ) AS position
+            FROM {table}
+        ) AS r
+        WHERE t.id = r.id AND t.order_index <> r.position * {step}
+        """)
+
+
+def upgrade():
+    _respace("session_exercises", "session_id", ORDER_STEP)
+    _respace("sets", "session_exercise_id", ORDER_STEP)
+
+
+def downgrade():
+    _respace("sets", "session_exercise_id", 1)
+    _respace("session_exercises", "session_id", 1)
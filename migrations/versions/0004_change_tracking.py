@@ -0,0 +1,78 @@
+"""row_version change tracking and tombstones
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+# (tabla, columnas del índice del feed)
+TRACKED = [
+    ("exercises", ["user_id", "row_version"]),
+    ("workout_sessions", ["user_id", "row_version"]),
+    ("session_exercises", ["row_version"]),
+    ("sets", ["row_version"]),
+]
+
+
+def _index_name(table: str, columns: list[str]) -> str:
+    if columns[0] == "user_id":
+        return f"ix_{table}_user_version"
+    return f"ix_{table}_row_version"
+
+
+def upgrade():
+    op.execute("CREATE SEQUENCE change_seq")
+
+    for table, columns in TRACKED:
+        # El default volátil reescribe la tabla y numera las filas existentes
+        op.add_column(
+            table,
+            sa.Column(
+                "row_version",
+                sa.BigInteger(),
+                server_default=sa.text("nextval('change_seq')"),
+                nullable=False,
+            ),
+        )
+        op.create_index(_index_name(table, columns), table, columns)
+
+    op.create_table(
+        "tombstones",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column(
+            "user_id",
+            sa.Integer(),
+            sa.ForeignKey("users.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("entity", sa.String(32), nullable=False),
+        sa.Column("entity_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "row_version",
+            sa.BigInteger(),
+            server_default=sa.text("nextval('change_seq')"),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        "ix_tombstones_user_version", "tombstones", ["user_id", "row_version"]
+    )
+
+
+def downgrade():
+    op.drop_index("ix_tombstones_user_version", "tombstones")
+    op.drop_table("tombstones")
+
+    for table, columns in reversed(TRACKED):
+        op.drop_index(_index_name(table, columns), table)
+        op.drop_column(table, "row_version")
+
+    op.execute("DROP SEQUENCE change_seq")
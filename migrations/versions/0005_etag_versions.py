@@ -0,0 +1,32 @@
+"""session and collection version counters for ETags
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "workout_sessions",
+        sa.Column("version", sa.Integer(), nullable=False, server_default="1"),
+    )
+    op.add_column(
+        "users",
+        sa.Column(
+            "collection_version", sa.Integer(), nullable=False, server_default="1"
+        ),
+    )
+
+
+def downgrade():
+    op.drop_column("users", "collection_version")
+    op.drop_column("workout_sessions", "version")
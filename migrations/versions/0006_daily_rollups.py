@@ -0,0 +1,54 @@
+"""daily training rollups per user, day and muscle group
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "daily_rollups",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("muscle_group", sa.String(length=150), nullable=False),
+        sa.Column("set_count", sa.Integer(), nullable=False),
+        sa.Column("reps", sa.Integer(), nullable=False),
+        sa.Column("volume_kg", sa.Numeric(16, 3), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint(
+            "user_id", "day", "muscle_group", name="pk_daily_rollups"
+        ),
+    )
+
+    # Carga inicial con los sets existentes; misma fórmula que rollup_source
+    op.execute("""
+        INSERT INTO daily_rollups
+            (user_id, day, muscle_group, set_count, reps, volume_kg)
+        SELECT ws.user_id,
+               ws.session_date,
+               coalesce(e.muscle_group, ''),
+               count(s.id),
+               sum(s.reps),
+               sum(round(CAST(coalesce(CASE WHEN s.unit = 'lb'
+                                            THEN s.weight * 0.45359237
+                                            ELSE s.weight END, 0)
+                              * s.reps AS NUMERIC), 3))
+        FROM sets s
+        JOIN session_exercises se ON se.id = s.session_exercise_id
+        JOIN workout_sessions ws ON ws.id = se.session_id
+        JOIN exercises e ON e.id = se.exercise_id
+        GROUP BY ws.user_id, ws.session_date, coalesce(e.muscle_group, '')
+        """)
+
+
+def downgrade():
+    op.drop_table("daily_rollups")
@@ -0,0 +1,55 @@
+"""personal records per user, exercise and rep count
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "personal_records",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("exercise_id", sa.Integer(), nullable=False),
+        sa.Column("reps", sa.Integer(), nullable=False),
+        sa.Column("weight_kg", sa.Float(), nullable=False),
+        sa.Column("set_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["exercise_id"], ["exercises.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["set_id"], ["sets.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint(
+            "user_id", "exercise_id", "reps", name="pk_personal_records"
+        ),
+    )
+    op.create_index("ix_personal_records_set_id", "personal_records", ["set_id"])
+
+    # Carga inicial; misma regla que best_sets: el más pesado y, a igual
+    # peso, el primero que se registró
+    op.execute("""
+        INSERT INTO personal_records (user_id, exercise_id, reps, weight_kg, set_id)
+        SELECT DISTINCT ON (ws.user_id, se.exercise_id, s.reps)
+               ws.user_id,
+               se.exercise_id,
+               s.reps,
+               CASE WHEN s.unit = 'lb' THEN s.weight * 0.45359237
+                    ELSE s.weight END AS weight_kg,
+               s.id
+        FROM sets s
+        JOIN session_exercises se ON se.id = s.session_exercise_id
+        JOIN workout_sessions ws ON ws.id = se.session_id
+        WHERE s.weight IS NOT NULL
+        ORDER BY ws.user_id, se.exercise_id, s.reps, weight_kg DESC, s.id
+        """)
+
+
+def downgrade():
+    op.drop_index("ix_personal_records_set_id", table_name="personal_records")
+    op.drop_table("personal_records")
@@ -0,0 +1,40 @@
+"""canonical weight_kg generated column on sets
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Columna generada STORED: Postgres la calcula para las filas existentes
+    # al agregarla y en cada INSERT/UPDATE
+    op.add_column(
+        "sets",
+        sa.Column(
+            "weight_kg",
+            sa.Float(),
+            sa.Computed(
+                "CASE WHEN unit = 'lb' THEN weight * 0.45359237 ELSE weight END",
+                persisted=True,
+            ),
+        ),
+    )
+    op.create_index(
+        "ix_sets_session_exercise_reps_weight_kg",
+        "sets",
+        ["session_exercise_id", "reps", "weight_kg"],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_sets_session_exercise_reps_weight_kg", table_name="sets")
+    op.drop_column("sets", "weight_kg")
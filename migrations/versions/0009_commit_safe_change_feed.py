@@ -0,0 +1,84 @@
+"""row_xid and per-user indexes for the change feed
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+CURRENT_XID = "(pg_current_xact_id()::text::bigint)"
+
+TRACKED = ["exercises", "workout_sessions", "session_exercises", "sets", "tombstones"]
+
+# (tabla, de dónde sale el dueño)
+DENORMALIZED = [
+    ("session_exercises", "workout_sessions", "session_id"),
+    ("sets", "session_exercises", "session_exercise_id"),
+]
+
+
+def upgrade():
+    # Las filas existentes quedan con el xid de esta migración
+    for table in TRACKED:
+        op.add_column(
+            table,
+            sa.Column(
+                "row_xid",
+                sa.BigInteger(),
+                server_default=sa.text(CURRENT_XID),
+                nullable=False,
+            ),
+        )
+
+    # En orden: los sets copian el dueño de session_exercises ya completado
+    for table, parent, parent_column in DENORMALIZED:
+        op.add_column(table, sa.Column("user_id", sa.Integer(), nullable=True))
+        op.execute(
+            f"UPDATE {table} AS child SET user_id = parent.user_id "
+            f"FROM {parent} AS parent WHERE parent.id = child.{parent_column}"
+        )
+        op.alter_column(table, "user_id", nullable=False)
+        op.create_foreign_key(
+            f"{table}_user_id_fkey",
+            table,
+            "users",
+            ["user_id"],
+            ["id"],
+            ondelete="CASCADE",
+        )
+
+    op.drop_index("ix_session_exercises_row_version", "session_exercises")
+    op.drop_index("ix_sets_row_version", "sets")
+    for table in ["exercises", "workout_sessions", "tombstones"]:
+        op.drop_index(f"ix_{table}_user_version", table)
+
+    for table in TRACKED:
+        op.create_index(
+            f"ix_{table}_user_version", table, ["user_id", "row_xid", "row_version"]
+        )
+
+
+def downgrade():
+    for table in TRACKED:
+        op.drop_index(f"ix_{table}_user_version", table)
+
+    for table in ["exercises", "workout_sessions", "tombstones"]:
+        op.create_index(f"ix_{table}_user_version", table, ["user_id", "row_version"])
+    op.create_index("ix_sets_row_version", "sets", ["row_version"])
+    op.create_index(
+        "ix_session_exercises_row_version", "session_exercises", ["row_version"]
+    )
+
+    for table, _, _ in reversed(DENORMALIZED):
+        op.drop_constraint(f"{table}_user_id_fkey", table, type_="foreignkey")
+        op.drop_column(table, "user_id")
+
+    for table in reversed(TRACKED):
+        op.drop_column(table, "row_xid")
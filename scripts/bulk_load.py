@@ -0,0 +1,270 @@
+"""Bulk-load large synthetic histories with COPY.
+
+    python -m scripts.bulk_load --users 1000 --sets 10000000 --skew 1.1
+
+History sizes are Zipf-distributed over users: the first user gets the
+largest share and the tail only a few sessions each. Inside a history a few
+staple exercises dominate, and working weights progress over time. Rows are
+streamed to ``COPY`` in chunks.
+
+The five tables are locked for the duration of the load, so ids can be taken
+contiguously from their sequences and child rows can point at their parents
+without a round trip. Daily rollups and personal records are rebuilt for the
+loaded users at the end (``--skip-derived`` leaves them stale). Every loaded
+user can log in with SEED_PASSWORD.
+
+``scripts.seed_data`` is the small, ORM-based counterpart; use this one
+when the row count matters.
+"""
+
+import argparse
+import io
+import random
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import text
+
+from config.database import build_engine
+from config.password_utils import hash_password
+from scripts.seed_data import MOVEMENTS, SEED_PASSWORD
+from src.analytics.queries import rebuild_rollup_statements
+from src.analytics.records import rebuild_record_statements
+from src.common.ordering import ORDER_STEP
+from src.sets.schemas import KG_PER_LB
+
+# Orden de carga: padres antes que hijos
+COLUMNS = {
+    "users": ("id", "name", "username", "password_hash", "email"),
+    "exercises": ("id", "user_id", "name", "muscle_group"),
+    "workout_sessions": ("id", "user_id", "name", "session_date"),
+    "session_exercises": ("id", "user_id", "session_id", "exercise_id", "order_index"),
+    "sets": (
+        "id",
+        "user_id",
+        "session_exercise_id",
+        "set_number",
+        "reps",
+        "weight",
+        "unit",
+        "order_index",
+    ),
+}
+
+
+def history_sizes(users: int, sets: int, skew: float) -> list[int]:
+    # Ley de Zipf: el usuario i recibe una parte proporcional a 1 / (i+1)^skew
+    weights = [1 / (rank + 1) ** skew for rank in range(users)]
+    total = sum(weights)
+    return [round(sets * weight / total) for weight in weights]
+
+
+class CopyLoader:
+    def __init__(self, connection, chunk_rows: int = 200_000):
+        self.connection = connection
+        self.chunk_rows = chunk_rows
+        self.buffers = {table: io.StringIO() for table in COLUMNS}
+        self.rows = dict.fromkeys(COLUMNS, 0)
+        self.loaded = dict.fromkeys(COLUMNS, 0)
+        self.next_id = {}
+
+    def __enter__(self):
+        # Con las tablas bloqueadas nadie más toma valores de sus secuencias
+        self.connection.execute(
+            text(f"LOCK TABLE {', '.join(COLUMNS)} IN SHARE ROW EXCLUSIVE MODE")
+        )
+        for table in COLUMNS:
+            self.next_id[table] = self.connection.scalar(
+                text(f"SELECT nextval(pg_get_serial_sequence('{table}', 'id'))")
+            )
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is not None:
+            return
+        self.flush()
+        for table, next_id in self.next_id.items():
+            self.connection.execute(
+                text(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                    f":last, true)"
+                ),
+                {"last": next_id - 1},
+            )
+
+    def add(self, table: str, *values) -> int:
+        row_id = self.next_id[table]
+        self.next_id[table] += 1
+        # Formato de texto de COPY; ninguna columna cargada va en NULL
+        self.buffers[table].write("\t".join(map(str, (row_id, *values))) + "\n")
+        self.rows[table] += 1
+        if self.rows["sets"] >= self.chunk_rows:
+            self.flush()
+        return row_id
+
+    def flush(self):
+        cursor = self.connection.connection.cursor()
+        try:
+            for table, columns in COLUMNS.items():
+                buffer = self.buffers[table]
+                if not self.rows[table]:
+                    continue
+                buffer.seek(0)
+                cursor.copy_expert(
+                    f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffer
+                )
+                self.loaded[table] += self.rows[table]
+                self.buffers[table] = io.StringIO()
+                self.rows[table] = 0
+        finally:
+            cursor.close()
+
+
+def _exercise_names(count: int):
+    # Los movimientos base y, si hacen falta más, variantes
+    for index in range(count):
+        name, group = MOVEMENTS[index % len(MOVEMENTS)]
+        variant = index // len(MOVEMENTS)
+        yield (f"{name} variation {variant}" if variant else name), group
+
+
+def load_history(loader: CopyLoader, rng: random.Random, user_id: int, sets: int):
+    exercise_count = rng.randint(8, 30)
+    exercise_ids = [
+        loader.add("exercises", user_id, name, group)
+        for name, group in _exercise_names(exercise_count)
+    ]
+    # Unos pocos ejercicios básicos concentran la mayoría de las sesiones
+    popularity = [1 / (rank + 1) for rank in range(exercise_count)]
+    base_weight = {eid: rng.uniform(20, 120) for eid in exercise_ids}
+
+    # Primero el tamaño de cada sesión, para saber desde qué fecha empezar
+    plan = []
+    remaining = sets
+    while remaining > 0:
+        per_exercise = []
+        for _ in range(rng.randint(3, 6)):
+            count = min(rng.randint(2, 5), remaining)
+            if count:
+                per_exercise.append(count)
+                remaining -= count
+        plan.append(per_exercise)
+    gaps = [rng.randint(1, 4) for _ in plan]
+    session_date = date.today() - timedelta(days=sum(gaps))
+
+    for number, (per_exercise, gap) in enumerate(zip(plan, gaps), start=1):
+        session_date += timedelta(days=gap)
+        session_id = loader.add(
+            "workout_sessions", user_id, f"Session {number}", session_date
+        )
+        progress = 1 + number / len(plan) * 0.3
+        chosen = []
+        while len(chosen) < len(per_exercise):
+            exercise_id = rng.choices(exercise_ids, popularity)[0]
+            if exercise_id not in chosen:
+                chosen.append(exercise_id)
+
+        for position, (exercise_id, count) in enumerate(
+            zip(chosen, per_exercise), start=1
+        ):
+            link_id = loader.add(
+                "session_exercises",
+                user_id,
+                session_id,
+                exercise_id,
+                position * ORDER_STEP,
+            )
+            for set_number in range(1, count + 1):
+                unit = "kg" if rng.random() < 0.8 else "lb"
+                weight = base_weight[exercise_id] * progress
+                if unit == "lb":
+                    weight /= KG_PER_LB
+                loader.add(
+                    "sets",
+                    user_id,
+                    link_id,
+                    set_number,
+                    rng.randint(3, 12),
+                    round(weight * rng.uniform(0.9, 1.05), 1),
+                    unit,
+                    set_number * ORDER_STEP,
+                )
+
+
+def bulk_load(
+    connection,
+    users: int = 1000,
+    sets: int = 1_000_000,
+    skew: float = 1.1,
+    seed: int = 1,
+    prefix: str = "bulk",
+    chunk_rows: int = 200_000,
+    derived: bool = True,
+):
+    rng = random.Random(seed)
+    password_hash = hash_password(SEED_PASSWORD)
+
+    with CopyLoader(connection, chunk_rows) as loader:
+        user_ids = []
+        for index, size in enumerate(history_sizes(users, sets, skew)):
+            username = f"{prefix}_{seed}_{index}"
+            user_id = loader.add(
+                "users",
+                f"Bulk user {index}",
+                username,
+                password_hash,
+                f"{username}@example.com",
+            )
+            user_ids.append(user_id)
+            load_history(loader, rng, user_id, size)
+
+    # Sin estadísticas el planner trata las tablas recién cargadas como vacías
+    connection.execute(text(f"ANALYZE {', '.join(COLUMNS)}"))
+
+    # El COPY no pasa por las rutas que mantienen los rollups ni los récords
+    if derived:
+        for user_id in user_ids:
+            for statement in [
+                *rebuild_rollup_statements(user_id),
+                *rebuild_record_statements(user_id),
+            ]:
+                connection.execute(statement)
+        connection.execute(text("ANALYZE daily_rollups, personal_records"))
+    return user_ids, loader.loaded
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--sets", type=int, default=1_000_000)
+    parser.add_argument("--skew", type=float, default=1.1)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--prefix", default="bulk")
+    parser.add_argument("--chunk", type=int, default=200_000)
+    parser.add_argument("--skip-derived", action="store_true")
+    args = parser.parse_args()
+
+    engine = build_engine(pooled=False)
+    start = time.perf_counter()
+    with engine.begin() as connection:
+        user_ids, loaded = bulk_load(
+            connection,
+            users=args.users,
+            sets=args.sets,
+            skew=args.skew,
+            seed=args.seed,
+            prefix=args.prefix,
+            chunk_rows=args.chunk,
+            derived=not args.skip_derived,
+        )
+    elapsed = time.perf_counter() - start
+
+    print(", ".join(f"{table}={count}" for table, count in loaded.items()))
+    print(
+        f"loaded {len(user_ids)} users in {elapsed:.1f}s "
+        f"({loaded['sets'] / elapsed:,.0f} sets/s; password: {SEED_PASSWORD!r})"
+    )
+
+
+if __name__ == "__main__":
+    main()
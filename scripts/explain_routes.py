@@ -0,0 +1,352 @@
+"""EXPLAIN every query the routers issue and flag sequential scans.
+
+Sequential scans are disabled for the check (``enable_seqscan = off``): on a
+small seeded database the planner would pick them anyway, so a Seq Scan that
+survives means no index can serve the query at all.
+
+    python -m scripts.explain_routes --seed
+"""
+
+import argparse
+import json
+import sys
+
+import psycopg2
+from sqlalchemy import delete, func, select, text, tuple_
+from sqlalchemy.dialects import postgresql
+
+from config.database import build_engine
+from scripts.seed_data import seed
+from src.analytics.queries import (
+    muscle_group_summary_query,
+    personal_records_query,
+    progression_query,
+    rollup_source,
+    volume_summary_query,
+)
+from src.analytics.records import best_sets
+from src.analytics.schemas import SummaryPeriod
+from src.common.ordering import (
+    ORDER_STEP,
+    neighbour_queries,
+    rebalance_statement,
+    reorder_statement,
+)
+from src.exercise.models import Exercise
+from src.exercise.queries import (
+    exercise_name_taken_query,
+    list_exercises_query,
+    owned_exercise_ids_query,
+    owned_exercise_query,
+    search_exercises_query,
+    sessions_using_exercise,
+)
+from src.session_exercises.models import SessionExercises
+from src.session_exercises.queries import (
+    append_links_statement,
+    link_count_query,
+    owned_link_query,
+    remove_links_statement,
+    session_links_query,
+)
+from src.sets.models import Set
+from src.sets.queries import (
+    batch_targets_query,
+    delete_set_statement,
+    owned_set_query,
+    owned_sets_query,
+    session_of,
+    set_list_query,
+    sibling_ranks_query,
+)
+from src.sets.schemas import WeightUnit
+from src.sync.queries import change_horizon, changes_queries
+from src.user.models import User
+from src.user.queries import user_by_email, user_by_id, user_by_username
+from src.workout_session.models import WorkoutSession
+from src.workout_session.queries import (
+    list_sessions_query,
+    owned_session_query,
+    session_tree_query,
+    session_version_query,
+)
+
+# Con parámetros "named" el SQL literal no lleva los "%" escapados como "%%"
+_DIALECT = postgresql.dialect(paramstyle="named")
+
+
+def sample_ids(connection, user_id: int | None = None):
+    # Sin usuario, el de historial más largo
+    users = select(User.id, User.username, User.email)
+    if user_id is not None:
+        users = users.where(User.id == user_id)
+    user_id, username, email = connection.execute(
+        users.join(WorkoutSession, WorkoutSession.user_id == User.id)
+        .group_by(User.id)
+        .order_by(func.count(WorkoutSession.id).desc())
+        .limit(1)
+    ).one()
+    session_id, session_date = connection.execute(
+        select(WorkoutSession.id, WorkoutSession.session_date)
+        .join(SessionExercises, SessionExercises.session_id == WorkoutSession.id)
+        .where(WorkoutSession.user_id == user_id)
+        .group_by(WorkoutSession.id)
+        .order_by(func.count(SessionExercises.id).desc())
+        .limit(1)
+    ).one()
+    session_exercise_id, exercise_id = connection.execute(
+        select(SessionExercises.id, SessionExercises.exercise_id)
+        .where(SessionExercises.session_id == session_id)
+        .limit(1)
+    ).one()
+    exercise_name = connection.scalar(
+        select(Exercise.name).where(Exercise.id == exercise_id)
+    )
+    set_id = connection.scalar(
+        select(Set.id).where(Set.session_exercise_id == session_exercise_id).limit(1)
+    )
+    return {
+        "user_id": user_id,
+        "username": username,
+        "email": email,
+        "session_id": session_id,
+        "session_date": session_date,
+        "session_exercise_id": session_exercise_id,
+        "exercise_id": exercise_id,
+        "exercise_name": exercise_name,
+        "set_id": set_id,
+    }
+
+
+def route_queries(ids):
+    uid = ids["user_id"]
+    sid = ids["session_id"]
+    seid = ids["session_exercise_id"]
+    eid = ids["exercise_id"]
+    set_id = ids["set_id"]
+
+    # Las mismas consultas que emite rank_for_position al ubicar una posición
+    rank_queries = [
+        (f"workout_session.move_session_exercise:{name}", query)
+        for name, query in neighbour_queries(
+            SessionExercises, SessionExercises.session_id, sid, 3, exclude_id=seid
+        ).items()
+    ] + [
+        (f"sets.add_set_to_session_exercise:{name}", query)
+        for name, query in neighbour_queries(
+            Set, Set.session_exercise_id, seid, 3
+        ).items()
+    ]
+
+    return (
+        [
+            (
+                "analytics.exercise_progression",
+                progression_query(uid, eid, WeightUnit.kg),
+            ),
+            (
+                "analytics.exercise_records",
+                personal_records_query(uid, eid, WeightUnit.kg),
+            ),
+            (
+                "sets.record_personal_records",
+                best_sets(WorkoutSession.user_id == uid, Set.id == set_id),
+            ),
+            (
+                "sets.recompute_personal_records",
+                best_sets(
+                    WorkoutSession.user_id == uid,
+                    tuple_(SessionExercises.exercise_id, Set.reps).in_([(eid, 5)]),
+                ),
+            ),
+            (
+                "analytics.volume_summary:week",
+                volume_summary_query(uid, WeightUnit.kg, SummaryPeriod.week),
+            ),
+            (
+                "analytics.muscle_group_summary",
+                muscle_group_summary_query(uid, WeightUnit.kg),
+            ),
+            (
+                "analytics.apply_rollup:set",
+                rollup_source(WorkoutSession.user_id == uid, Set.id == set_id),
+            ),
+            (
+                "analytics.apply_rollup:session",
+                rollup_source(
+                    WorkoutSession.user_id == uid, SessionExercises.session_id == sid
+                ),
+            ),
+            (
+                "analytics.apply_rollup:exercise",
+                rollup_source(
+                    WorkoutSession.user_id == uid, SessionExercises.exercise_id == eid
+                ),
+            ),
+            ("auth.login", user_by_username(ids["username"])),
+            ("auth.register:email", user_by_email(ids["email"])),
+            ("auth.get_current_user", user_by_id(uid)),
+            (
+                "exercise.list_exercises",
+                list_exercises_query(uid, 50, after=("A", 0)),
+            ),
+            (
+                "exercise.list_exercises:name",
+                list_exercises_query(uid, 50, name="press"),
+            ),
+            ("exercise.search_exercises", search_exercises_query(uid, "press", 20)),
+            (
+                "exercise.create_exercise",
+                exercise_name_taken_query(uid, ids["exercise_name"]),
+            ),
+            ("exercise.edit_exercise", owned_exercise_query(eid, uid)),
+            ("exercise.edit_exercise:sessions", sessions_using_exercise(eid)),
+            (
+                "workout_session.list_sessions",
+                list_sessions_query(uid, 50, after=(ids["session_date"], sid)),
+            ),
+            ("workout_session.detail_session", session_tree_query(sid, uid)),
+            ("workout_session.detail_session:etag", session_version_query(sid, uid)),
+            ("workout_session.add_exercises", owned_session_query(sid, uid)),
+            (
+                "workout_session.add_exercises:exercises",
+                owned_exercise_ids_query([eid], uid),
+            ),
+            ("workout_session.add_exercises:existing", session_links_query(sid)),
+            (
+                "workout_session.add_exercises:append",
+                append_links_statement(sid, uid, [eid]),
+            ),
+            (
+                "workout_session.edit_work_session",
+                owned_session_query(sid, uid, WorkoutSession.session_date),
+            ),
+            (
+                "workout_session.reorder_session_exercises",
+                reorder_statement(SessionExercises, {seid: ORDER_STEP}),
+            ),
+            (
+                "workout_session.move_session_exercise",
+                owned_link_query(sid, eid, uid),
+            ),
+            (
+                "workout_session.move_session_exercise:rebalance",
+                rebalance_statement(SessionExercises, SessionExercises.session_id, sid),
+            ),
+            (
+                "workout_session.remove_exercises_from_session",
+                remove_links_statement(sid, [eid]),
+            ),
+            (
+                "workout_session.remove_exercises_from_session:count",
+                link_count_query(sid),
+            ),
+            # Lo que recorre la base al borrar en cascada por clave foránea
+            (
+                "exercise.delete_exercise:cascade",
+                select(SessionExercises.id).where(SessionExercises.exercise_id == eid),
+            ),
+            (
+                "workout_session.delete_session:cascade",
+                delete(SessionExercises).where(SessionExercises.session_id == sid),
+            ),
+            (
+                "sets.list_sets_from_exercise",
+                owned_link_query(sid, eid, uid, SessionExercises.id),
+            ),
+            ("sets.list_sets_from_exercise:sets", set_list_query(seid)),
+            ("sets.add_sets_batch", batch_targets_query([(sid, eid)], uid)),
+            ("sets.reorder_sets", owned_sets_query([set_id], uid)),
+            ("sets.reorder_sets:siblings", sibling_ranks_query(seid)),
+            (
+                "sets.reorder_sets:update",
+                reorder_statement(Set, {set_id: ORDER_STEP}),
+            ),
+            ("sets.reorder_sets:session", session_of(seid)),
+            ("sets.edit_set", owned_set_query(set_id, uid)),
+            (
+                "sets.move_set:rebalance",
+                rebalance_statement(Set, Set.session_exercise_id, seid),
+            ),
+            ("sets.delete_set", delete_set_statement(set_id, uid)),
+        ]
+        + rank_queries
+        + [
+            (f"sync.list_changes:{name}", query)
+            for name, query in changes_queries(
+                uid, (0, 0), change_horizon(), 50
+            ).items()
+        ]
+    )
+
+
+def _seq_scans(plan: dict):
+    found = []
+    if plan.get("Node Type") == "Seq Scan":
+        found.append(plan.get("Relation Name"))
+    for child in plan.get("Plans", []):
+        found.extend(_seq_scans(child))
+    return found
+
+
+def explain(connection, statement):
+    sql = str(
+        statement.compile(dialect=_DIALECT, compile_kwargs={"literal_binds": True})
+    )
+    # Cursor DBAPI directo: sin parámetros, psycopg2 no interpreta los "%"
+    cursor = connection.connection.cursor()
+    try:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}")
+        plan = cursor.fetchone()[0]
+    finally:
+        cursor.close()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return _seq_scans(plan[0]["Plan"])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seed", action="store_true", help="load synthetic data first")
+    parser.add_argument(
+        "--allow-seqscan",
+        action="store_true",
+        help="leave enable_seqscan on and report the planner's real choice",
+    )
+    args = parser.parse_args()
+
+    engine = build_engine(pooled=False)
+
+    if args.seed:
+        with engine.begin() as connection:
+            seed(connection, users=10, sessions_per_user=100, prefix="explain")
+            connection.execute(text("ANALYZE"))
+
+    failures = 0
+    with engine.connect() as connection:
+        if not args.allow_seqscan:
+            connection.execute(text("SET enable_seqscan = off"))
+
+        for route, statement in route_queries(sample_ids(connection)):
+            savepoint = connection.begin_nested()
+            try:
+                scans = explain(connection, statement)
+            except psycopg2.Error as error:
+                savepoint.rollback()
+                print(f"{route:<48} ERROR {error}".splitlines()[0])
+                failures += 1
+                continue
+            savepoint.commit()
+
+            status = "SEQ SCAN on " + ", ".join(scans) if scans else "ok"
+            print(f"{route:<48} {status}")
+            failures += bool(scans)
+
+        connection.rollback()
+
+    engine.dispose()
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
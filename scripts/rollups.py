@@ -0,0 +1,58 @@
+"""Rebuild or verify the daily training rollups.
+
+The rollups are maintained incrementally by the routers; ``rebuild``
+recomputes them from the sets (after a bulk import or a manual fix) and
+``check`` reports every key whose stored totals disagree with the sets,
+exiting with status 1 if there is any.
+
+    python -m scripts.rollups check
+    python -m scripts.rollups rebuild --user 42
+"""
+
+import argparse
+import sys
+
+from config.database import build_engine
+from src.analytics.queries import rebuild_rollup_statements, rollup_drift_query
+
+
+def rebuild(connection, user_id=None):
+    for statement in rebuild_rollup_statements(user_id):
+        result = connection.execute(statement)
+    return result.rowcount
+
+
+def check(connection, user_id=None):
+    drift = connection.execute(rollup_drift_query(user_id)).all()
+    for row in drift:
+        print(
+            f"user={row.user_id} day={row.day} muscle_group={row.muscle_group!r} "
+            f"expected=({row.expected_set_count}, {row.expected_reps}, "
+            f"{row.expected_volume_kg}) "
+            f"stored=({row.stored_set_count}, {row.stored_reps}, "
+            f"{row.stored_volume_kg})"
+        )
+    return len(drift)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("command", choices=["rebuild", "check"])
+    parser.add_argument("--user", type=int, help="only this user id")
+    args = parser.parse_args()
+
+    engine = build_engine(pooled=False)
+    with engine.begin() as connection:
+        if args.command == "rebuild":
+            print(f"{rebuild(connection, args.user)} rollup rows written")
+            failures = 0
+        else:
+            failures = check(connection, args.user)
+            print(f"{failures} rollup rows out of date")
+    engine.dispose()
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
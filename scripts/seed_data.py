@@ -0,0 +1,188 @@
+"""Synthetic dataset for local checks and benchmarks.
+
+    python -m scripts.seed_data --users 20 --sessions 200
+
+Every seeded user can log in with SEED_PASSWORD.
+"""
+
+import argparse
+import random
+from datetime import date, timedelta
+
+from sqlalchemy import insert
+
+from config.database import build_engine
+from config.password_utils import hash_password
+from src.analytics.queries import rebuild_rollup_statements
+from src.analytics.records import rebuild_record_statements
+from src.common.ordering import ORDER_STEP
+from src.exercise.models import Exercise
+from src.session_exercises.models import SessionExercises
+from src.sets.models import Set
+from src.sets.schemas import KG_PER_LB, WeightUnit
+from src.user.models import User
+from src.workout_session.models import WorkoutSession
+
+SEED_PASSWORD = "seed-password"
+
+MOVEMENTS = [
+    ("Bench press", "chest"),
+    ("Incline dumbbell press", "chest"),
+    ("Cable fly", "chest"),
+    ("Back squat", "legs"),
+    ("Front squat", "legs"),
+    ("Romanian deadlift", "legs"),
+    ("Leg press", "legs"),
+    ("Deadlift", "back"),
+    ("Barbell row", "back"),
+    ("Pull up", "back"),
+    ("Lat pulldown", "back"),
+    ("Overhead press", "shoulders"),
+    ("Lateral raise", "shoulders"),
+    ("Barbell curl", "biceps"),
+    ("Hammer curl", "biceps"),
+    ("Triceps pushdown", "triceps"),
+    ("Skull crusher", "triceps"),
+    ("Plank", "core"),
+]
+
+
+def _insert_returning_ids(connection, table, rows):
+    if not rows:
+        return []
+    result = connection.execute(
+        insert(table).returning(table.id, sort_by_parameter_order=True), rows
+    )
+    return list(result.scalars())
+
+
+def seed(
+    connection,
+    users: int = 20,
+    sessions_per_user: int = 200,
+    exercises_per_user: int = 12,
+    exercises_per_session: int = 5,
+    sets_per_exercise: int = 4,
+    seed: int = 1,
+    prefix: str = "seed",
+):
+    rng = random.Random(seed)
+    password_hash = hash_password(SEED_PASSWORD)
+    exercises_per_user = min(exercises_per_user, len(MOVEMENTS))
+
+    user_ids = _insert_returning_ids(
+        connection,
+        User,
+        [
+            {
+                "name": f"Seed user {i}",
+                "username": f"{prefix}_{seed}_{i}",
+                "password_hash": password_hash,
+                "email": f"{prefix}_{seed}_{i}@example.com",
+            }
+            for i in range(users)
+        ],
+    )
+
+    for user_id in user_ids:
+        movements = rng.sample(MOVEMENTS, exercises_per_user)
+        exercise_ids = _insert_returning_ids(
+            connection,
+            Exercise,
+            [
+                {"user_id": user_id, "name": name, "muscle_group": group}
+                for name, group in movements
+            ],
+        )
+        # Peso de trabajo por ejercicio; progresa lentamente con el tiempo
+        base_weight = {eid: rng.uniform(20, 120) for eid in exercise_ids}
+
+        start = date.today() - timedelta(days=sessions_per_user * 2)
+        session_ids = _insert_returning_ids(
+            connection,
+            WorkoutSession,
+            [
+                {
+                    "user_id": user_id,
+                    "name": f"Session {i}",
+                    "session_date": start + timedelta(days=i * 2),
+                }
+                for i in range(sessions_per_user)
+            ],
+        )
+
+        links = []
+        for session_id in session_ids:
+            chosen = rng.sample(
+                exercise_ids, min(exercises_per_session, len(exercise_ids))
+            )
+            links.extend(
+                {
+                    "session_id": session_id,
+                    "user_id": user_id,
+                    "exercise_id": eid,
+                    "order_index": i * ORDER_STEP,
+                }
+                for i, eid in enumerate(chosen, start=1)
+            )
+        link_ids = _insert_returning_ids(connection, SessionExercises, links)
+
+        sets = []
+        for index, (link_id, link) in enumerate(zip(link_ids, links)):
+            progress = 1 + index / max(len(links), 1) * 0.3
+            for number in range(1, sets_per_exercise + 1):
+                unit = WeightUnit.kg if rng.random() < 0.8 else WeightUnit.lb
+                weight = base_weight[link["exercise_id"]] * progress
+                if unit is WeightUnit.lb:
+                    weight /= KG_PER_LB
+                sets.append(
+                    {
+                        "user_id": user_id,
+                        "session_exercise_id": link_id,
+                        "set_number": number,
+                        "reps": rng.randint(3, 12),
+                        "weight": round(weight * rng.uniform(0.9, 1.05), 1),
+                        "unit": unit,
+                        "order_index": number * ORDER_STEP,
+                    }
+                )
+        if sets:
+            connection.execute(insert(Set), sets)
+
+        # La carga masiva no pasa por las rutas que mantienen los rollups
+        # ni los récords
+        for statement in [
+            *rebuild_rollup_statements(user_id),
+            *rebuild_record_statements(user_id),
+        ]:
+            connection.execute(statement)
+
+    return user_ids
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--exercises", type=int, default=12)
+    parser.add_argument("--per-session", type=int, default=5)
+    parser.add_argument("--sets", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    engine = build_engine(pooled=False)
+    with engine.begin() as connection:
+        user_ids = seed(
+            connection,
+            users=args.users,
+            sessions_per_user=args.sessions,
+            exercises_per_user=args.exercises,
+            exercises_per_session=args.per_session,
+            sets_per_exercise=args.sets,
+            seed=args.seed,
+        )
+    print(f"seeded {len(user_ids)} users (password: {SEED_PASSWORD!r})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+import hmac
+
+from fastapi import Header, HTTPException, status
+
+from config.security import ADMIN_TOKEN
+
+
+async def require_admin(x_admin_token: str | None = Header(default=None)):
+    # Sin ADMIN_TOKEN configurado los endpoints no existen
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+    # En bytes: compare_digest rechaza str con caracteres no ASCII, y el
+    # header llega decodificado como latin-1
+    if not x_admin_token or not hmac.compare_digest(
+        x_admin_token.encode("latin-1"), ADMIN_TOKEN.encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Invalid admin token"
+        )
@@ -0,0 +1,69 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+
+from config import database
+from config.profiler import profile_store
+from src.admin.dependencies import require_admin
+from src.admin.schemas import ProfileSummary, SlowQueryReport
+from src.common.schemas import Message
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@router.get("/slow-queries", response_model=SlowQueryReport)
+def slow_queries(limit: int = Query(default=20, ge=1, le=200)):
+    log = database.slow_query_log
+    if log is None:
+        return {"enabled": False, "threshold_ms": None, "queries": []}
+
+    return {
+        "enabled": True,
+        "threshold_ms": log.threshold * 1000,
+        "queries": log.top(limit),
+    }
+
+
+@router.delete("/slow-queries", response_model=Message)
+def reset_slow_queries():
+    if database.slow_query_log is not None:
+        database.slow_query_log.reset()
+
+    return {"detail": "Slow query log cleared"}
+
+
+@router.get("/profiles", response_model=list[ProfileSummary])
+def list_profiles():
+    return [profile.summary() for profile in reversed(profile_store.recent)]
+
+
+@router.get("/profiles/routes", response_model=list[ProfileSummary])
+def list_route_profiles():
+    profiles = sorted(
+        profile_store.routes.values(),
+        key=lambda profile: sum(profile.samples.values()),
+        reverse=True,
+    )
+    return [profile.summary() for profile in profiles]
+
+
+@router.get("/profiles/routes/folded", response_class=PlainTextResponse)
+def route_profile_folded(method: str, route: str):
+    profile = profile_store.route(method.upper(), route)
+    if profile is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found"
+        )
+
+    return profile.folded()
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+def get_profile(profile_id: str):
+    # Pilas en formato "folded": flamegraph.pl, speedscope, inferno
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found"
+        )
+
+    return profile.folded()
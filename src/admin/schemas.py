@@ -0,0 +1,37 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class SlowQueryEntry(BaseModel):
+    fingerprint: str
+    # SQL normalizado: sin valores y con las listas colapsadas
+    statement: str
+    calls: int
+    total_ms: float
+    mean_ms: float
+    max_ms: float
+    routes: dict[str, int]
+    parameter_shapes: dict[str, int]
+    plan: str | None
+    last_seen: datetime | None
+
+
+class SlowQueryReport(BaseModel):
+    enabled: bool
+    threshold_ms: float | None
+    queries: list[SlowQueryEntry]
+
+
+class ProfileSummary(BaseModel):
+    id: str
+    method: str
+    path: str
+    route: str
+    started: datetime
+    duration_ms: float
+    # Requests acumulados (más de uno solo en los perfiles por ruta)
+    requests: int
+    samples: int
+    # Muestras por categoría: jwt, validation, orm, serialization, ...
+    categories: dict[str, int]
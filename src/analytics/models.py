@@ -0,0 +1,54 @@
+from sqlalchemy import (
+    Column,
+    Date,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    PrimaryKeyConstraint,
+    String,
+)
+from config.database import Base
+
+
+class DailyRollup(Base):
+    # Totales por (usuario, día, grupo muscular); se mantienen en la misma
+    # transacción que cada cambio sobre los sets
+    __tablename__ = "daily_rollups"
+    __table_args__ = (
+        PrimaryKeyConstraint("user_id", "day", "muscle_group", name="pk_daily_rollups"),
+    )
+
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    day = Column(Date, nullable=False)
+    # "" cuando el ejercicio no tiene grupo muscular
+    muscle_group = Column(String(150), nullable=False)
+    set_count = Column(Integer, nullable=False)
+    reps = Column(Integer, nullable=False)
+    # Volumen en kg, redondeado por set para que sumar y restar sea exacto
+    volume_kg = Column(Numeric(16, 3), nullable=False)
+
+
+class PersonalRecord(Base):
+    # Mejor peso por (usuario, ejercicio, reps) y el set que lo tiene
+    __tablename__ = "personal_records"
+    __table_args__ = (
+        PrimaryKeyConstraint(
+            "user_id", "exercise_id", "reps", name="pk_personal_records"
+        ),
+        # Para saber si un set que se edita o borra tiene algún récord
+        Index("ix_personal_records_set_id", "set_id"),
+    )
+
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    exercise_id = Column(
+        Integer, ForeignKey("exercises.id", ondelete="CASCADE"), nullable=False
+    )
+    reps = Column(Integer, nullable=False)
+    weight_kg = Column(Float, nullable=False)
+    set_id = Column(Integer, ForeignKey("sets.id", ondelete="CASCADE"), nullable=False)
@@ -0,0 +1,283 @@
+from datetime import date
+
+from sqlalchemy import (
+    Date,
+    Float,
+    Numeric,
+    and_,
+    case,
+    cast,
+    delete,
+    func,
+    insert,
+    literal_column,
+    or_,
+    select,
+    tuple_,
+)
+from sqlalchemy.dialects.postgresql import aggregate_order_by, array_agg
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.analytics.models import DailyRollup, PersonalRecord
+from src.analytics.schemas import SummaryPeriod
+from src.exercise.models import Exercise
+from src.session_exercises.models import SessionExercises
+from src.sets.models import Set
+from src.sets.schemas import KG_PER_LB, WeightUnit
+from src.workout_session.models import WorkoutSession
+
+# Redondeado por set: los rollups suman y restan estos valores sin deriva
+set_volume_kg = func.round(cast(func.coalesce(Set.weight_kg, 0) * Set.reps, Numeric), 3)
+
+ROLLUP_TOTALS = ("set_count", "reps", "volume_kg")
+ROLLUP_COLUMNS = ("user_id", "day", "muscle_group", *ROLLUP_TOTALS)
+
+
+# Todo se calcula sobre sets.weight_kg y se convierte a la unidad pedida al
+# final
+def in_unit(value_kg, unit: WeightUnit):
+    if unit is WeightUnit.lb:
+        value_kg = value_kg / KG_PER_LB
+    return cast(func.round(cast(value_kg, Numeric), 2), Float)
+
+
+def epley(weight, reps):
+    # Con una sola repetición el 1RM es el propio peso
+    return case((reps <= 1, weight), else_=weight * (1 + reps / 30.0))
+
+
+def progression_query(
+    user_id: int,
+    exercise_id: int,
+    unit: WeightUnit,
+    date_from: date | None = None,
+    date_to: date | None = None,
+):
+    # Una fila por sesión, agregada en la base: sets del ejercicio
+    # (exercise_id, session_id) -> sets por session_exercise_id
+    top_weight = array_agg(
+        aggregate_order_by(Set.weight_kg, Set.weight_kg.desc(), Set.reps.desc())
+    )[1]
+    top_reps = array_agg(
+        aggregate_order_by(Set.reps, Set.weight_kg.desc(), Set.reps.desc())
+    )[1]
+
+    query = (
+        select(
+            WorkoutSession.id.label("session_id"),
+            WorkoutSession.session_date,
+            func.count(Set.id).label("sets"),
+            func.sum(Set.reps).label("total_reps"),
+            in_unit(top_weight, unit).label("top_set_weight"),
+            top_reps.label("top_set_reps"),
+            in_unit(func.max(epley(Set.weight_kg, Set.reps)), unit).label(
+                "estimated_1rm"
+            ),
+            in_unit(func.sum(Set.weight_kg * Set.reps), unit).label("volume"),
+        )
+        .join(SessionExercises, SessionExercises.id == Set.session_exercise_id)
+        .join(WorkoutSession, WorkoutSession.id == SessionExercises.session_id)
+        .where(
+            SessionExercises.exercise_id == exercise_id,
+            WorkoutSession.user_id == user_id,
+            Set.weight_kg.is_not(None),
+        )
+        .group_by(WorkoutSession.id)
+        .order_by(WorkoutSession.session_date, WorkoutSession.id)
+    )
+
+    if date_from:
+        query = query.where(WorkoutSession.session_date >= date_from)
+
+    if date_to:
+        query = query.where(WorkoutSession.session_date <= date_to)
+
+    return query
+
+
+def rollup_source(*criteria):
+    # Aporte de los sets que cumplen los criterios, por clave del rollup.
+    # Literal en SQL (no parámetro) para que el GROUP BY coincida con el SELECT
+    muscle_group = func.coalesce(Exercise.muscle_group, literal_column("''"))
+    return (
+        select(
+            WorkoutSession.user_id,
+            WorkoutSession.session_date.label("day"),
+            muscle_group.label("muscle_group"),
+            func.count(Set.id).label("set_count"),
+            func.sum(Set.reps).label("reps"),
+            func.sum(set_volume_kg).label("volume_kg"),
+        )
+        .select_from(Set)
+        .join(SessionExercises, SessionExercises.id == Set.session_exercise_id)
+        .join(WorkoutSession, WorkoutSession.id == SessionExercises.session_id)
+        .join(Exercise, Exercise.id == SessionExercises.exercise_id)
+        .where(*criteria)
+        .group_by(WorkoutSession.user_id, WorkoutSession.session_date, muscle_group)
+    )
+
+
+async def apply_rollup(db: AsyncSession, user_id: int, *criteria, sign: int = 1):
+    # sign=-1 antes de borrar o modificar los sets, sign=1 después de
+    # escribirlos (con flush si fueron por el ORM); misma transacción
+    source = rollup_source(WorkoutSession.user_id == user_id, *criteria).subquery()
+    statement = pg_insert(DailyRollup).from_select(
+        list(ROLLUP_COLUMNS),
+        select(
+            source.c.user_id,
+            source.c.day,
+            source.c.muscle_group,
+            *(source.c[name] * sign for name in ROLLUP_TOTALS),
+        ),
+    )
+    statement = statement.on_conflict_do_update(
+        constraint="pk_daily_rollups",
+        set_={
+            name: getattr(DailyRollup, name) + statement.excluded[name]
+            for name in ROLLUP_TOTALS
+        },
+    ).returning(DailyRollup.day, DailyRollup.muscle_group, DailyRollup.set_count)
+
+    empty = [
+        (row.day, row.muscle_group)
+        for row in await db.execute(statement)
+        if row.set_count == 0
+    ]
+    if empty:
+        await db.execute(
+            delete(DailyRollup).where(
+                DailyRollup.user_id == user_id,
+                tuple_(DailyRollup.day, DailyRollup.muscle_group).in_(empty),
+            )
+        )
+
+
+def rebuild_rollup_statements(user_id: int | None = None):
+    stored, source = [], []
+    if user_id is not None:
+        stored.append(DailyRollup.user_id == user_id)
+        source.append(WorkoutSession.user_id == user_id)
+
+    return [
+        delete(DailyRollup).where(*stored),
+        insert(DailyRollup).from_select(list(ROLLUP_COLUMNS), rollup_source(*source)),
+    ]
+
+
+def rollup_drift_query(user_id: int | None = None):
+    # Claves cuyo rollup guardado no coincide con lo que dicen los sets
+    expected = rollup_source(
+        *([] if user_id is None else [WorkoutSession.user_id == user_id])
+    ).subquery("expected")
+    stored = (
+        select(DailyRollup)
+        .where(*([] if user_id is None else [DailyRollup.user_id == user_id]))
+        .subquery("stored")
+    )
+    keys = ("user_id", "day", "muscle_group")
+
+    return (
+        select(
+            *(func.coalesce(expected.c[key], stored.c[key]).label(key) for key in keys),
+            *(expected.c[name].label(f"expected_{name}") for name in ROLLUP_TOTALS),
+            *(stored.c[name].label(f"stored_{name}") for name in ROLLUP_TOTALS),
+        )
+        .select_from(
+            expected.join(
+                stored,
+                and_(*(expected.c[key] == stored.c[key] for key in keys)),
+                full=True,
+            )
+        )
+        .where(
+            or_(
+                *(
+                    expected.c[name].is_distinct_from(stored.c[name])
+                    for name in ROLLUP_TOTALS
+                )
+            )
+        )
+    )
+
+
+def _summary_range(query, date_from: date | None, date_to: date | None):
+    if date_from:
+        query = query.where(DailyRollup.day >= date_from)
+
+    if date_to:
+        query = query.where(DailyRollup.day <= date_to)
+
+    return query
+
+
+def volume_summary_query(
+    user_id: int,
+    unit: WeightUnit,
+    period: SummaryPeriod,
+    date_from: date | None = None,
+    date_to: date | None = None,
+):
+    # Lee los rollups: una fila por día y grupo muscular, no por set
+    if period is SummaryPeriod.week:
+        start = cast(func.date_trunc(literal_column("'week'"), DailyRollup.day), Date)
+    else:
+        start = DailyRollup.day
+
+    query = (
+        select(
+            start.label("period_start"),
+            func.sum(DailyRollup.set_count).label("sets"),
+            func.sum(DailyRollup.reps).label("reps"),
+            in_unit(func.sum(DailyRollup.volume_kg), unit).label("volume"),
+        )
+        .where(DailyRollup.user_id == user_id)
+        .group_by(start)
+        .order_by(start)
+    )
+
+    return _summary_range(query, date_from, date_to)
+
+
+def muscle_group_summary_query(
+    user_id: int,
+    unit: WeightUnit,
+    date_from: date | None = None,
+    date_to: date | None = None,
+):
+    volume = func.sum(DailyRollup.volume_kg)
+    query = (
+        select(
+            func.nullif(DailyRollup.muscle_group, literal_column("''")).label(
+                "muscle_group"
+            ),
+            func.sum(DailyRollup.set_count).label("sets"),
+            func.sum(DailyRollup.reps).label("reps"),
+            in_unit(volume, unit).label("volume"),
+        )
+        .where(DailyRollup.user_id == user_id)
+        .group_by(DailyRollup.muscle_group)
+        .order_by(volume.desc(), DailyRollup.muscle_group)
+    )
+
+    return _summary_range(query, date_from, date_to)
+
+
+def personal_records_query(user_id: int, exercise_id: int, unit: WeightUnit):
+    return (
+        select(
+            PersonalRecord.reps,
+            in_unit(PersonalRecord.weight_kg, unit).label("weight"),
+            PersonalRecord.set_id,
+            WorkoutSession.id.label("session_id"),
+            WorkoutSession.session_date,
+        )
+        .join(Set, Set.id == PersonalRecord.set_id)
+        .join(SessionExercises, SessionExercises.id == Set.session_exercise_id)
+        .join(WorkoutSession, WorkoutSession.id == SessionExercises.session_id)
+        .where(
+            PersonalRecord.user_id == user_id,
+            PersonalRecord.exercise_id == exercise_id,
+        )
+        .order_by(PersonalRecord.reps)
+    )
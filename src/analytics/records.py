@@ -0,0 +1,107 @@
+from sqlalchemy import delete, insert, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.analytics.models import PersonalRecord
+from src.session_exercises.models import SessionExercises
+from src.sets.models import Set
+from src.workout_session.models import WorkoutSession
+
+# Índice de récords personales por (usuario, ejercicio, reps). Cada escritura
+# de sets compara solo sus propios sets contra el récord guardado; el récord
+# se recalcula desde los sets únicamente cuando el set que lo tiene se edita
+# o se borra.
+
+RECORD_COLUMNS = ("user_id", "exercise_id", "reps", "weight_kg", "set_id")
+
+
+def best_sets(*criteria):
+    # El set más pesado de cada (usuario, ejercicio, reps); a igual peso,
+    # el primero que se registró
+    return (
+        select(
+            WorkoutSession.user_id,
+            SessionExercises.exercise_id,
+            Set.reps,
+            Set.weight_kg,
+            Set.id.label("set_id"),
+        )
+        .distinct(WorkoutSession.user_id, SessionExercises.exercise_id, Set.reps)
+        .join(SessionExercises, SessionExercises.id == Set.session_exercise_id)
+        .join(WorkoutSession, WorkoutSession.id == SessionExercises.session_id)
+        .where(Set.weight_kg.is_not(None), *criteria)
+        .order_by(
+            WorkoutSession.user_id,
+            SessionExercises.exercise_id,
+            Set.reps,
+            Set.weight_kg.desc(),
+            Set.id,
+        )
+    )
+
+
+async def _upsert_best(db: AsyncSession, user_id: int, *criteria) -> set[int]:
+    # Un solo INSERT ... ON CONFLICT: solo reemplaza si el peso es mayor.
+    # Devuelve los sets que quedaron como récord
+    statement = pg_insert(PersonalRecord).from_select(
+        list(RECORD_COLUMNS), best_sets(WorkoutSession.user_id == user_id, *criteria)
+    )
+    statement = statement.on_conflict_do_update(
+        constraint="pk_personal_records",
+        set_={
+            "weight_kg": statement.excluded.weight_kg,
+            "set_id": statement.excluded.set_id,
+        },
+        where=statement.excluded.weight_kg > PersonalRecord.weight_kg,
+    ).returning(PersonalRecord.set_id)
+
+    return set((await db.execute(statement)).scalars())
+
+
+async def record_personal_records(
+    db: AsyncSession, user_id: int, *criteria
+) -> set[int]:
+    # Después de insertar o editar sets (con flush si fueron por el ORM)
+    return await _upsert_best(db, user_id, *criteria)
+
+
+async def release_personal_records(db: AsyncSession, user_id: int, *criteria):
+    # Antes de editar o borrar sets: quita los récords que tienen y devuelve
+    # las claves (exercise_id, reps) que hay que recalcular
+    holders = (
+        select(Set.id)
+        .join(SessionExercises, SessionExercises.id == Set.session_exercise_id)
+        .join(WorkoutSession, WorkoutSession.id == SessionExercises.session_id)
+        .where(WorkoutSession.user_id == user_id, *criteria)
+    )
+    released = await db.execute(
+        delete(PersonalRecord)
+        .where(PersonalRecord.user_id == user_id, PersonalRecord.set_id.in_(holders))
+        .returning(PersonalRecord.exercise_id, PersonalRecord.reps)
+    )
+
+    return [tuple(key) for key in released]
+
+
+async def recompute_personal_records(
+    db: AsyncSession, user_id: int, keys: list[tuple[int, int]]
+) -> set[int]:
+    # Recalcula solo las claves liberadas, con los sets que quedan
+    if not keys:
+        return set()
+
+    return await _upsert_best(
+        db, user_id, tuple_(SessionExercises.exercise_id, Set.reps).in_(keys)
+    )
+
+
+def rebuild_record_statements(user_id: int | None = None):
+    stored, source = [], []
+    if user_id is not None:
+        stored.append(PersonalRecord.user_id == user_id)
+        source.append(WorkoutSession.user_id == user_id)
+
+    return [
+        delete(PersonalRecord).where(*stored),
+        insert(PersonalRecord).from_select(list(RECORD_COLUMNS), best_sets(*source)),
+    ]
@@ -0,0 +1,110 @@
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.database import get_db
+from src.analytics.queries import (
+    muscle_group_summary_query,
+    personal_records_query,
+    progression_query,
+    volume_summary_query,
+)
+from src.analytics.schemas import (
+    ExerciseProgression,
+    ExerciseRecords,
+    MuscleGroupSummary,
+    SummaryPeriod,
+    VolumeSummary,
+)
+from src.auth.dependencies import get_current_principal
+from src.auth.schema import Principal
+from src.exercise.models import Exercise
+from src.exercise.queries import owned_exercise_query
+from src.sets.schemas import WeightUnit
+
+router = APIRouter()
+
+
+async def _owned_exercise_name(db: AsyncSession, exercise_id: int, user_id: int):
+    name = await db.scalar(owned_exercise_query(exercise_id, user_id, Exercise.name))
+
+    if name is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Exercise not found"
+        )
+
+    return name
+
+
+@router.get("/exercises/{exercise_id}/progression", response_model=ExerciseProgression)
+async def exercise_progression(
+    exercise_id: int,
+    unit: WeightUnit = WeightUnit.kg,
+    date_from: date | None = Query(default=None, alias="from"),
+    date_to: date | None = Query(default=None, alias="to"),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+):
+    name = await _owned_exercise_name(db, exercise_id, current_user.id)
+
+    rows = await db.execute(
+        progression_query(current_user.id, exercise_id, unit, date_from, date_to)
+    )
+
+    return {
+        "exercise_id": exercise_id,
+        "name": name,
+        "unit": unit,
+        "points": rows.mappings().all(),
+    }
+
+
+@router.get("/exercises/{exercise_id}/records", response_model=ExerciseRecords)
+async def exercise_records(
+    exercise_id: int,
+    unit: WeightUnit = WeightUnit.kg,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+):
+    name = await _owned_exercise_name(db, exercise_id, current_user.id)
+
+    rows = await db.execute(personal_records_query(current_user.id, exercise_id, unit))
+
+    return {
+        "exercise_id": exercise_id,
+        "name": name,
+        "unit": unit,
+        "records": rows.mappings().all(),
+    }
+
+
+@router.get("/volume", response_model=VolumeSummary)
+async def volume_summary(
+    period: SummaryPeriod = SummaryPeriod.day,
+    unit: WeightUnit = WeightUnit.kg,
+    date_from: date | None = Query(default=None, alias="from"),
+    date_to: date | None = Query(default=None, alias="to"),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+):
+    rows = await db.execute(
+        volume_summary_query(current_user.id, unit, period, date_from, date_to)
+    )
+
+    return {"period": period, "unit": unit, "points": rows.mappings().all()}
+
+
+@router.get("/muscle-groups", response_model=MuscleGroupSummary)
+async def muscle_group_summary(
+    unit: WeightUnit = WeightUnit.kg,
+    date_from: date | None = Query(default=None, alias="from"),
+    date_to: date | None = Query(default=None, alias="to"),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+):
+    rows = await db.execute(
+        muscle_group_summary_query(current_user.id, unit, date_from, date_to)
+    )
+
+    return {"unit": unit, "groups": rows.mappings().all()}
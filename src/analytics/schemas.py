@@ -0,0 +1,72 @@
+from datetime import date
+from enum import Enum
+
+from pydantic import BaseModel
+
+from src.sets.schemas import WeightUnit
+
+
+class SummaryPeriod(str, Enum):
+    day = "day"
+    week = "week"
+
+
+class ProgressionPoint(BaseModel):
+    session_id: int
+    session_date: date
+    sets: int
+    total_reps: int
+    # Peso y reps del set más pesado de la sesión
+    top_set_weight: float
+    top_set_reps: int
+    # Epley: peso * (1 + reps / 30), el mejor set de la sesión
+    estimated_1rm: float
+    # Suma de peso * reps
+    volume: float
+
+
+class ExerciseProgression(BaseModel):
+    exercise_id: int
+    name: str
+    unit: WeightUnit
+    points: list[ProgressionPoint]
+
+
+class VolumePoint(BaseModel):
+    period_start: date
+    sets: int
+    reps: int
+    volume: float
+
+
+class VolumeSummary(BaseModel):
+    period: SummaryPeriod
+    unit: WeightUnit
+    points: list[VolumePoint]
+
+
+class MuscleGroupTotal(BaseModel):
+    muscle_group: str | None
+    sets: int
+    reps: int
+    volume: float
+
+
+class MuscleGroupSummary(BaseModel):
+    unit: WeightUnit
+    groups: list[MuscleGroupTotal]
+
+
+class PersonalRecordRead(BaseModel):
+    reps: int
+    weight: float
+    set_id: int
+    session_id: int
+    session_date: date
+
+
+class ExerciseRecords(BaseModel):
+    exercise_id: int
+    name: str
+    unit: WeightUnit
+    records: list[PersonalRecordRead]
@@ -1,18 +1,20 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from config.database import get_db
 from config.security import SECRET_KEY, ALGORITHM
-from src.user.models import User
+from src.auth.schema import Principal
+from src.user.cache import user_cache
+from src.user.queries import user_by_id
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
-):
+async def get_current_principal(token: str = Depends(oauth2_scheme)):
+    # Solo valida el JWT: para rutas que únicamente necesitan el id del usuario.
+    # async aunque no espere nada: así corre en el loop y no en el threadpool
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id: int = payload.get("user_id")
@@ -31,9 +33,24 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user = db.query(User).filter(User.id == user_id).first()
+    return Principal(id=user_id, username=payload.get("sub", ""))
+
+
+async def get_current_user(
+    principal: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+):
+    user = user_cache.get(principal.id)
+    if user is not None:
+        return user
+
+    user = await db.scalar(user_by_id(principal.id))
 
     if not user:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
 
+    # Se guarda desvinculado de la sesión: quien lo reciba solo debe leerlo
+    db.expunge(user)
+    user_cache.set(principal.id, user)
+
     return user
@@ -1,54 +1,76 @@
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from config.database import get_db
-from config.password_utils import verify_password
-from config.security import create_access_token, hash_password
+from config.password_utils import hash_password_async, verify_password_async
+from config.security import create_access_token
+from src.auth.schema import Token
 from src.user.models import User
+from src.user.queries import user_by_email, user_by_username
 from src.user.schema import UserCreate, UserResponse
 
 router = APIRouter()
 
 
-@router.post("/login")
+@router.post("/login", response_model=Token)
 async def login(
-    form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: AsyncSession = Depends(get_db),
 ):
-    user = db.query(User).filter(User.username == form_data.username).first()
+    user = await db.scalar(user_by_username(form_data.username))
 
     if not user:
         raise HTTPException(status_code=400, detail="Usuario no encontrado")
 
-    if not verify_password(form_data.password, user.password_hash):
+    # La conexión vuelve al pool antes de esperar el hash en otro proceso
+    user_id, username, password_hash = user.id, user.username, user.password_hash
+    await db.rollback()
+
+    if not await verify_password_async(form_data.password, password_hash):
         raise HTTPException(status_code=400, detail="Contraseña incorrecta")
 
-    token = create_access_token({"sub": user.username, "user_id": user.id})
+    token = create_access_token({"sub": username, "user_id": user_id})
 
     return {"access_token": token, "token_type": "bearer"}
 
 
 @router.post("/register", response_model=UserResponse)
-def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     # ¿Existe el usuario?
-    existing_user = db.query(User).filter(User.username == user_data.username).first()
+    existing_user = await db.scalar(user_by_username(user_data.username))
     if existing_user:
         raise HTTPException(status_code=400, detail="El nombre de usuario ya existe")
 
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    existing_user = await db.scalar(user_by_email(user_data.email))
     if existing_user:
         raise HTTPException(status_code=400, detail="El correo ya esta en uso")
 
-    # Crear usuario nuevo
-    new_user = User(
-        name=user_data.name,
-        username=user_data.username,
-        password_hash=hash_password(user_data.password),
-        email=user_data.email,
-    )
+    # La conexión vuelve al pool mientras se calcula el hash; el INSERT abre
+    # otra transacción
+    await db.rollback()
+    password_hash = await hash_password_async(user_data.password)
 
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    # Crear usuario nuevo; la respuesta sale del mismo INSERT
+    try:
+        new_user = (
+            await db.execute(
+                insert(User)
+                .values(
+                    name=user_data.name,
+                    username=user_data.username,
+                    password_hash=password_hash,
+                    email=user_data.email,
+                )
+                .returning(User.id, User.name, User.username)
+            )
+        ).one()
+        await db.commit()
+    except IntegrityError:
+        # Otro registro con el mismo nombre entró mientras se calculaba el hash
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="El nombre de usuario ya existe")
 
-    return new_user
+    return UserResponse(**new_user._asdict())
@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+
+
+class Principal(BaseModel):
+    id: int
+    username: str
+
+
+class Token(BaseModel):
+    access_token: str
+    token_type: str
@@ -0,0 +1,141 @@
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class TTLCache:
+    # LRU acotado en tamaño donde cada entrada además expira a los `ttl` segundos
+
+    def __init__(self, maxsize: int, ttl: float, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value = entry
+                if expires_at > self._clock():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (self._clock() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+# Backends async para caches de respuestas serializadas. Todos exponen
+# get/set/delete sobre claves str y valores bytes, más stats().
+
+
+class MemoryBackend:
+    # En el proceso: LRU + TTL sobre TTLCache
+
+    name = "memory"
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, key: str) -> bytes | None:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: bytes):
+        self._cache.set(key, value)
+
+    async def delete(self, key: str):
+        self._cache.invalidate(key)
+
+    def stats(self):
+        stats = self._cache.stats()
+        return {k: stats[k] for k in ("size", "maxsize", "ttl")}
+
+
+class SharedBackend:
+    # Compartido entre procesos sobre un cliente con la API de redis.asyncio
+    # (get, set con ex=, delete). La expulsión LRU la hace el servidor
+    # (maxmemory-policy allkeys-lru).
+
+    name = "shared"
+
+    def __init__(self, client, ttl: float, prefix: str):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    async def get(self, key: str) -> bytes | None:
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, key: str, value: bytes):
+        await self.client.set(self.prefix + key, value, ex=max(int(self.ttl), 1))
+
+    async def delete(self, key: str):
+        await self.client.delete(self.prefix + key)
+
+    def stats(self):
+        return {"ttl": self.ttl, "prefix": self.prefix}
+
+
+class LocalSharedClient:
+    # Sustituto en memoria del servidor compartido, para correr localmente y
+    # en pruebas sin levantar uno: misma API que redis.asyncio, con
+    # expiración por clave y LRU acotado
+
+    def __init__(self, maxsize: int = 10_000, clock=time.monotonic):
+        self.maxsize = maxsize
+        self._clock = clock
+        self._data: OrderedDict = OrderedDict()
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= self._clock():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ex: int | None = None):
+        expires_at = self._clock() + ex if ex is not None else None
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    async def delete(self, *keys: str) -> int:
+        return sum(self._data.pop(key, None) is not None for key in keys)
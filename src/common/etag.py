@@ -0,0 +1,39 @@
+import hashlib
+import json
+
+from fastapi import Request, Response, status
+
+# ETags fuertes a partir de contadores de versión: comparar el ETag no
+# necesita leer ni serializar el cuerpo, solo el contador.
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts) -> str:
+    # Las partes incluyen la versión y los parámetros que cambian el cuerpo
+    raw = json.dumps(parts, default=str, separators=(",", ":"))
+    return '"' + hashlib.sha1(raw.encode()).hexdigest()[:20] + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+
+    if header.strip() == "*":
+        return True
+
+    # If-None-Match usa comparación débil: se ignora el prefijo W/
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in candidates
+
+
+def set_etag(response: Response, etag: str):
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+
+def not_modified(etag: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+    )
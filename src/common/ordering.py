@@ -0,0 +1,129 @@
+from sqlalchemy import case, func, select, update
+
+# order_index guarda un rango disperso (múltiplos de ORDER_STEP al crearse),
+# no la posición. Insertar, borrar o mover un elemento escribe una sola fila:
+# el nuevo rango se toma entre los de sus vecinos. Solo cuando ya no queda
+# hueco entre dos vecinos se reparte de nuevo toda la lista (rebalance).
+# Los clientes siguen viendo posiciones densas 1..N, calculadas al leer.
+#
+# Sirve para cualquier modelo con columnas `id` y `order_index`
+# (SessionExercises dentro de una sesión, Set dentro de un SessionExercises).
+# Las restricciones únicas sobre order_index son diferidas, así que los
+# intercambios de posición intermedios no chocan.
+
+ORDER_STEP = 1024
+
+
+def reorder_statement(model, positions: dict[int, int]):
+    # UPDATE ... SET order_index = CASE id WHEN :id THEN :rank ... END
+    return (
+        update(model)
+        .where(model.id.in_(list(positions)))
+        .values(order_index=case(positions, value=model.id))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def ranks_for_order(ids: list[int]) -> dict[int, int]:
+    return {item_id: position * ORDER_STEP for position, item_id in enumerate(ids, 1)}
+
+
+def append_rank(model, parent_column, parent_id: int, offset: int = 1):
+    # Subconsulta escalar para usar dentro del propio INSERT: evita leer el
+    # máximo en una consulta aparte
+    return (
+        select(func.coalesce(func.max(model.order_index), 0) + ORDER_STEP * offset)
+        .where(parent_column == parent_id)
+        .scalar_subquery()
+    )
+
+
+def rebalance_statement(model, parent_column, parent_id: int):
+    # Reparte los rangos como ORDER_STEP * posición y solo escribe las filas
+    # que cambian
+    ranked = (
+        select(
+            model.id,
+            func.row_number()
+            .over(order_by=(model.order_index, model.id))
+            .label("position"),
+        )
+        .where(parent_column == parent_id)
+        .subquery()
+    )
+    new_rank = ranked.c.position * ORDER_STEP
+
+    return (
+        update(model)
+        .where(model.id == ranked.c.id, model.order_index != new_rank)
+        .values(order_index=new_rank)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def neighbour_queries(model, parent_column, parent_id, position, exclude_id=None):
+    # Las consultas que puede hacer rank_for_position para ubicar `position`:
+    # los rangos vecinos, el final de la lista y el primero
+    siblings = select(model.order_index).where(parent_column == parent_id)
+    if exclude_id is not None:
+        siblings = siblings.where(model.id != exclude_id)
+
+    return {
+        "neighbours": siblings.order_by(model.order_index)
+        .offset(max(position - 2, 0))
+        .limit(2),
+        "tail": siblings.with_only_columns(func.count(), func.max(model.order_index)),
+        "first": siblings.order_by(model.order_index).limit(1),
+    }
+
+
+async def _neighbours(db, model, parent_column, parent_id, position, exclude_id):
+    # Rangos del elemento anterior y siguiente a `position`, y la posición
+    # efectiva (si pide una más allá del final, queda al final)
+    queries = neighbour_queries(model, parent_column, parent_id, position, exclude_id)
+
+    if position > 1:
+        ranks = (await db.scalars(queries["neighbours"])).all()
+        if ranks:
+            return ranks[0], ranks[1] if len(ranks) > 1 else None, position
+
+        count, last = (await db.execute(queries["tail"])).one()
+        return last or 0, None, count + 1
+
+    after = await db.scalar(queries["first"])
+    return 0, after, 1
+
+
+async def rank_for_position(
+    db,
+    model,
+    parent_column,
+    parent_id: int,
+    position: int,
+    exclude_id: int | None = None,
+    current_rank: int | None = None,
+) -> tuple[int, int]:
+    # Rango para que el elemento quede en `position` (1..N) entre sus hermanos,
+    # junto con la posición que realmente ocupa. `exclude_id`/`current_rank`
+    # describen al elemento cuando ya existe y se está moviendo.
+    position = max(position, 1)
+
+    for _ in range(2):
+        before, after, position = await _neighbours(
+            db, model, parent_column, parent_id, position, exclude_id
+        )
+
+        if current_rank is not None and before < current_rank:
+            if after is None or current_rank < after:
+                return current_rank, position
+
+        if after is None:
+            return before + ORDER_STEP, position
+
+        if after - before >= 2:
+            return (before + after) // 2, position
+
+        await db.execute(rebalance_statement(model, parent_column, parent_id))
+        current_rank = None
+
+    raise RuntimeError("order_index rebalance did not open a gap")
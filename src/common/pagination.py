@@ -0,0 +1,45 @@
+import base64
+import binascii
+import json
+from datetime import date
+
+from fastapi import HTTPException, status
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def _to_json(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def encode_cursor(*values) -> str:
+    raw = json.dumps([_to_json(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types) -> tuple:
+    # El cursor es opaco para el cliente: la clave de orden de la última fila
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError(cursor)
+        return tuple(
+            date.fromisoformat(v) if t is date else t(v) for t, v in zip(types, values)
+        )
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido"
+        )
+
+
+def page_from_rows(rows: list, limit: int, key) -> tuple[list, str | None]:
+    # Las consultas piden limit + 1 filas para saber si hay otra página
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    return rows, encode_cursor(*key(rows[-1]))
@@ -1,11 +1,41 @@
-from sqlalchemy import Column, Integer, String, TIMESTAMP, ForeignKey, Text
+from sqlalchemy import (
+    DDL,
+    Column,
+    Integer,
+    String,
+    TIMESTAMP,
+    ForeignKey,
+    Text,
+    Index,
+    UniqueConstraint,
+    event,
+)
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from config.database import Base
+from src.sync.models import row_version_column, row_xid_column
 
 
 class Exercise(Base):
     __tablename__ = "exercises"
+    __table_args__ = (
+        UniqueConstraint("user_id", "name", name="uq_exercises_user_name"),
+        # Feed de cambios por usuario
+        Index("ix_exercises_user_version", "user_id", "row_xid", "row_version"),
+        # Índices de trigramas: sirven a la búsqueda difusa y a los ILIKE '%...%'
+        Index(
+            "ix_exercises_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_exercises_muscle_group_trgm",
+            "muscle_group",
+            postgresql_using="gin",
+            postgresql_ops={"muscle_group": "gin_trgm_ops"},
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(
@@ -15,6 +45,8 @@ class Exercise(Base):
     description = Column(Text, nullable=True)
     muscle_group = Column(String(150), nullable=True)
     created_at = Column(TIMESTAMP, server_default=func.now())
+    row_version = row_version_column()
+    row_xid = row_xid_column()
 
     user = relationship("User", back_populates="exercises")
     session_exercises = relationship(
@@ -23,3 +55,10 @@ class Exercise(Base):
         cascade="all, delete",
         passive_deletes=True,
     )
+
+
+event.listen(
+    Exercise.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"),
+)
@@ -0,0 +1,89 @@
+from sqlalchemy import func, or_, select, tuple_
+
+from src.exercise.models import Exercise
+from src.session_exercises.models import SessionExercises
+
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+
+# Las columnas de ExerciseRead
+EXERCISE_COLUMNS = (
+    Exercise.id,
+    Exercise.name,
+    Exercise.description,
+    Exercise.muscle_group,
+    Exercise.created_at,
+)
+
+
+def search_exercises_query(user_id: int, q: str, limit: int):
+    # word_similarity compara el texto buscado con la palabra más parecida
+    # del nombre, así "ben" encuentra "Bench press". El filtro `name %> q`
+    # (lo mismo que `q <% name`) es word_similarity(q, name) sobre el umbral,
+    # escrito con la columna a la izquierda para que lo resuelvan los índices
+    # GIN de trigramas.
+    name_rank = func.word_similarity(q, Exercise.name)
+    group_rank = func.word_similarity(q, func.coalesce(Exercise.muscle_group, ""))
+    rank = func.greatest(name_rank, group_rank).label("rank")
+
+    return (
+        select(*EXERCISE_COLUMNS, rank)
+        .where(
+            Exercise.user_id == user_id,
+            or_(
+                Exercise.name.bool_op("%>")(q),
+                Exercise.muscle_group.bool_op("%>")(q),
+            ),
+        )
+        .order_by(rank.desc(), Exercise.name, Exercise.id)
+        .limit(limit)
+    )
+
+
+def list_exercises_query(
+    user_id: int,
+    limit: int,
+    name: str | None = None,
+    muscle_group: str | None = None,
+    after: tuple[str, int] | None = None,
+):
+    # Orden por (name, id): el cursor es la clave de la última fila
+    query = select(*EXERCISE_COLUMNS).where(Exercise.user_id == user_id)
+
+    if name:
+        query = query.where(Exercise.name.ilike(f"%{name}%"))
+
+    if muscle_group:
+        query = query.where(Exercise.muscle_group.ilike(f"%{muscle_group}%"))
+
+    if after:
+        query = query.where(tuple_(Exercise.name, Exercise.id) > tuple_(*after))
+
+    return query.order_by(Exercise.name, Exercise.id).limit(limit + 1)
+
+
+def owned_exercise_query(exercise_id: int, user_id: int, *columns):
+    return select(*(columns or (Exercise,))).where(
+        Exercise.id == exercise_id, Exercise.user_id == user_id
+    )
+
+
+def owned_exercise_ids_query(exercise_ids: list[int], user_id: int):
+    return select(Exercise.id).where(
+        Exercise.id.in_(exercise_ids), Exercise.user_id == user_id
+    )
+
+
+def exercise_name_taken_query(user_id: int, name: str, exclude_id: int | None = None):
+    query = select(Exercise.id).where(
+        Exercise.user_id == user_id, Exercise.name == name
+    )
+    if exclude_id is not None:
+        query = query.where(Exercise.id != exclude_id)
+    return query
+
+
+def sessions_using_exercise(exercise_id: int):
+    return select(SessionExercises.session_id).where(
+        SessionExercises.exercise_id == exercise_id
+    )
@@ -1,42 +1,91 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from config.database import get_db
-from src.auth.dependencies import get_current_user
+from src.analytics.queries import apply_rollup
+from src.auth.dependencies import get_current_principal
+from src.auth.schema import Principal
+from src.common.etag import etag_matches, make_etag, not_modified, set_etag
+from src.common.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    decode_cursor,
+    page_from_rows,
+)
+from src.common.schemas import Message
 from src.exercise.models import Exercise
-from src.exercise.schemas import ExerciseCreate
-from src.user.models import User
+from src.exercise.queries import (
+    EXERCISE_COLUMNS,
+    SEARCH_DEFAULT_LIMIT,
+    SEARCH_MAX_LIMIT,
+    exercise_name_taken_query,
+    list_exercises_query,
+    owned_exercise_query,
+    search_exercises_query,
+    sessions_using_exercise,
+)
+from src.exercise.schemas import (
+    ExerciseCreate,
+    ExercisePage,
+    ExerciseRead,
+    ExerciseSearchResult,
+)
+from src.session_exercises.models import SessionExercises
+from src.sync.queries import record_tombstones
+from src.user.queries import bump_collection_version, collection_version_query
+from src.workout_session.queries import bump_session_version
 
 router = APIRouter()
 
 
-@router.get("/")
+@router.get("/", response_model=ExercisePage)
 async def list_exercises(
+    request: Request,
+    response: Response,
     name: str | None = None,
     muscle_group: str | None = None,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    cursor: str | None = None,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
 ):
-    query = db.query(Exercise).filter(Exercise.user_id == current_user.id)
+    version = await db.scalar(collection_version_query(current_user.id))
+    etag = make_etag(
+        "exercises", current_user.id, version, name, muscle_group, cursor, limit
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    after = decode_cursor(cursor, str, int) if cursor else None
+    query = list_exercises_query(current_user.id, limit, name, muscle_group, after)
 
-    if name:
-        query = query.filter(Exercise.name.ilike(f"%{name}%"))
+    exercises = (await db.execute(query)).all()
+    items, next_cursor = page_from_rows(exercises, limit, key=lambda e: (e.name, e.id))
 
-    if muscle_group:
-        query = query.filter(Exercise.muscle_group.ilike(f"%{muscle_group}%"))
+    set_etag(response, etag)
+    return {"items": items, "next_cursor": next_cursor}
 
-    exercises = query.all()
-    return exercises
+
+@router.get("/search", response_model=list[ExerciseSearchResult])
+async def search_exercises(
+    q: str = Query(..., min_length=2),
+    limit: int = Query(default=SEARCH_DEFAULT_LIMIT, ge=1, le=SEARCH_MAX_LIMIT),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+):
+    rows = await db.execute(search_exercises_query(current_user.id, q, limit))
+    return rows.mappings().all()
 
 
-@router.post("/")
+@router.post("/", response_model=ExerciseRead)
 async def create_exercise(
     exercise_data: ExerciseCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
 ):
-    exercise_exist = (
-        db.query(Exercise).filter(Exercise.name == exercise_data.name).first()
+    exercise_exist = await db.scalar(
+        exercise_name_taken_query(current_user.id, exercise_data.name)
     )
 
     if exercise_exist:
@@ -44,70 +93,105 @@ async def create_exercise(
             status_code=400, detail="El nombre del ejercicio ya está en uso"
         )
 
-    new_exercise = Exercise(
-        user_id=current_user.id,
-        name=exercise_data.name,
-        description=exercise_data.description,
-        muscle_group=exercise_data.muscle_group,
-    )
-
-    db.add(new_exercise)
-    db.commit()
-    db.refresh(new_exercise)
+    # La respuesta sale del mismo INSERT, sin volver a leer la fila
+    new_exercise = (
+        await db.execute(
+            insert(Exercise)
+            .values(
+                user_id=current_user.id,
+                name=exercise_data.name,
+                description=exercise_data.description,
+                muscle_group=exercise_data.muscle_group,
+            )
+            .returning(*EXERCISE_COLUMNS)
+        )
+    ).one()
+    await db.execute(bump_collection_version(current_user.id))
+    await db.commit()
 
-    return new_exercise
+    return ExerciseRead(**new_exercise._asdict())
 
 
-@router.put("/{exercise_id}")
+@router.put("/{exercise_id}", response_model=ExerciseRead)
 async def edit_exercise(
     exercise_id: int,
     exercise_data: ExerciseCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
 ):
-    exercise = (
-        db.query(Exercise)
-        .filter(Exercise.id == exercise_id, Exercise.user_id == current_user.id)
-        .first()
-    )
+    current = (
+        await db.execute(
+            owned_exercise_query(exercise_id, current_user.id, Exercise.muscle_group)
+        )
+    ).first()
 
-    if not exercise:
+    if not current:
         raise HTTPException(status_code=404, detail="No se encontró el ejercicio")
 
-    exercise.name = exercise_data.name
-    exercise.muscle_group = exercise_data.muscle_group
-    exercise.description = exercise_data.description
+    name_taken = await db.scalar(
+        exercise_name_taken_query(current_user.id, exercise_data.name, exercise_id)
+    )
+
+    if name_taken:
+        raise HTTPException(
+            status_code=400, detail="El nombre del ejercicio ya está en uso"
+        )
 
-    db.commit()
-    db.refresh(exercise)
+    # Los rollups van por grupo muscular
+    group_changed = current.muscle_group != exercise_data.muscle_group
+    if group_changed:
+        await apply_rollup(
+            db, current_user.id, SessionExercises.exercise_id == exercise_id, sign=-1
+        )
 
-    return {
-        "id": exercise.id,
-        "name": exercise.name,
-        "description": exercise.description,
-        "muscle_group": exercise.muscle_group,
-        "created_at": exercise.created_at,
-    }
+    # La respuesta sale del mismo UPDATE
+    exercise = (
+        await db.execute(
+            update(Exercise)
+            .where(Exercise.id == exercise_id)
+            .values(
+                name=exercise_data.name,
+                muscle_group=exercise_data.muscle_group,
+                description=exercise_data.description,
+            )
+            .returning(*EXERCISE_COLUMNS)
+        )
+    ).one()
 
+    if group_changed:
+        await apply_rollup(
+            db, current_user.id, SessionExercises.exercise_id == exercise_id
+        )
 
-@router.delete("/{exercise_id}")
+    # El nombre aparece en el detalle de las sesiones que lo usan
+    await db.execute(bump_session_version(sessions_using_exercise(exercise_id)))
+    await db.execute(bump_collection_version(current_user.id))
+    await db.commit()
+
+    return ExerciseRead(**exercise._asdict())
+
+
+@router.delete("/{exercise_id}", response_model=Message)
 async def delete_exercise(
     exercise_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
 ):
-    exercise = (
-        db.query(Exercise)
-        .filter(Exercise.id == exercise_id, Exercise.user_id == current_user.id)
-        .first()
-    )
+    exercise = await db.scalar(owned_exercise_query(exercise_id, current_user.id))
 
     if not exercise:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Exercise not found"
         )
 
-    db.delete(exercise)
-    db.commit()
+    # Antes del DELETE, mientras los vínculos con sesiones todavía existen
+    await apply_rollup(
+        db, current_user.id, SessionExercises.exercise_id == exercise_id, sign=-1
+    )
+    await db.execute(bump_session_version(sessions_using_exercise(exercise_id)))
+    await db.execute(bump_collection_version(current_user.id))
+    await db.delete(exercise)
+    await record_tombstones(db, current_user.id, Exercise, [exercise_id])
+    await db.commit()
 
     return {"detail": "Ejercicio eliminado"}
@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from pydantic import BaseModel, Field
 
 
@@ -11,3 +13,25 @@ class ExerciseUpdate(BaseModel):
     name: str | None = Field(default=None)
     description: str | None = Field(default=None)
     muscle_group: str | None = Field(default=None)
+
+
+class ExerciseRead(BaseModel):
+    id: int
+    name: str
+    description: str | None
+    muscle_group: str | None
+    created_at: datetime | None
+
+
+class ExercisePage(BaseModel):
+    items: list[ExerciseRead]
+    next_cursor: str | None
+
+
+class ExerciseSearchResult(BaseModel):
+    id: int
+    name: str
+    description: str | None
+    muscle_group: str | None
+    created_at: datetime | None
+    rank: float
@@ -0,0 +1,28 @@
+from fastapi import APIRouter
+
+from config.database import pool_stats
+from config.password_utils import hashing_pool_stats
+from src.user.cache import user_cache
+from src.workout_session.cache import session_tree_cache
+
+router = APIRouter()
+
+
+@router.get("/db-pool")
+def db_pool():
+    return pool_stats()
+
+
+@router.get("/hashing-pool")
+def hashing_pool():
+    return hashing_pool_stats()
+
+
+@router.get("/user-cache")
+def user_cache_stats():
+    return user_cache.stats()
+
+
+@router.get("/session-cache")
+def session_cache_stats():
+    return session_tree_cache.stats()
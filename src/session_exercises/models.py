@@ -1,12 +1,35 @@
-from sqlalchemy import Column, Integer, ForeignKey
+from sqlalchemy import Column, Integer, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from config.database import Base
+from src.sync.models import row_version_column, row_xid_column
 
 
 class SessionExercises(Base):
     __tablename__ = "session_exercises"
+    __table_args__ = (
+        # Diferida para que un reordenamiento pueda intercambiar posiciones
+        # dentro de la misma transacción
+        UniqueConstraint(
+            "session_id",
+            "order_index",
+            name="uq_session_exercises_session_order",
+            deferrable=True,
+            initially="DEFERRED",
+        ),
+        UniqueConstraint(
+            "session_id", "exercise_id", name="uq_session_exercises_session_exercise"
+        ),
+        # Borrado en cascada de un ejercicio y consultas por ejercicio
+        Index("ix_session_exercises_exercise_session", "exercise_id", "session_id"),
+        # Feed de cambios por usuario
+        Index("ix_session_exercises_user_version", "user_id", "row_xid", "row_version"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
+    # Copia del dueño de la sesión, para el feed de cambios por usuario
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
     session_id = Column(
         Integer, ForeignKey("workout_sessions.id", ondelete="CASCADE"), nullable=False
     )
@@ -14,6 +37,8 @@ class SessionExercises(Base):
         Integer, ForeignKey("exercises.id", ondelete="CASCADE"), nullable=False
     )
     order_index = Column(Integer, nullable=False)
+    row_version = row_version_column()
+    row_xid = row_xid_column()
 
     session = relationship("WorkoutSession", back_populates="session_exercises")
     exercise = relationship("Exercise", back_populates="session_exercises")
@@ -0,0 +1,64 @@
+from sqlalchemy import delete, func, insert, select
+
+from src.common.ordering import append_rank
+from src.session_exercises.models import SessionExercises
+from src.workout_session.models import WorkoutSession
+
+
+def owned_link_query(session_id: int, exercise_id: int, user_id: int, *columns):
+    # Vínculo sesión-ejercicio, solo si la sesión es del usuario
+    return (
+        select(*(columns or (SessionExercises,)))
+        .join(WorkoutSession, WorkoutSession.id == SessionExercises.session_id)
+        .where(
+            SessionExercises.session_id == session_id,
+            SessionExercises.exercise_id == exercise_id,
+            WorkoutSession.user_id == user_id,
+        )
+    )
+
+
+def session_links_query(session_id: int):
+    # exercise_id -> id del vínculo
+    return select(SessionExercises.exercise_id, SessionExercises.id).where(
+        SessionExercises.session_id == session_id
+    )
+
+
+def append_links_statement(session_id: int, user_id: int, exercise_ids: list[int]):
+    # Al final, con el rango calculado dentro del propio INSERT
+    return insert(SessionExercises).values(
+        [
+            {
+                "session_id": session_id,
+                "user_id": user_id,
+                "exercise_id": exercise_id,
+                "order_index": append_rank(
+                    SessionExercises,
+                    SessionExercises.session_id,
+                    session_id,
+                    offset=offset,
+                ),
+            }
+            for offset, exercise_id in enumerate(exercise_ids, start=1)
+        ]
+    )
+
+
+def remove_links_statement(session_id: int, exercise_ids: list[int]):
+    return (
+        delete(SessionExercises)
+        .where(
+            SessionExercises.session_id == session_id,
+            SessionExercises.exercise_id.in_(exercise_ids),
+        )
+        .returning(SessionExercises.id, SessionExercises.exercise_id)
+    )
+
+
+def link_count_query(session_id: int):
+    return (
+        select(func.count())
+        .select_from(SessionExercises)
+        .where(SessionExercises.session_id == session_id)
+    )
@@ -1,13 +1,46 @@
-from sqlalchemy import Column, Enum, ForeignKey, Float, Integer
+from sqlalchemy import (
+    Column,
+    Computed,
+    Enum,
+    ForeignKey,
+    Float,
+    Index,
+    Integer,
+    UniqueConstraint,
+)
 from sqlalchemy.orm import relationship
 from config.database import Base
-from src.sets.schemas import WeightUnit
+from src.sets.schemas import KG_PER_LB, WeightUnit
+from src.sync.models import row_version_column, row_xid_column
 
 
 class Set(Base):
     __tablename__ = "sets"
+    __table_args__ = (
+        UniqueConstraint(
+            "session_exercise_id",
+            "order_index",
+            name="uq_sets_session_exercise_order",
+            deferrable=True,
+            initially="DEFERRED",
+        ),
+        # Feed de cambios por usuario
+        Index("ix_sets_user_version", "user_id", "row_xid", "row_version"),
+        # Récords (reps exactas, el más pesado primero) y agregados por
+        # ejercicio de la sesión sin leer la tabla
+        Index(
+            "ix_sets_session_exercise_reps_weight_kg",
+            "session_exercise_id",
+            "reps",
+            "weight_kg",
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
+    # Copia del dueño de la sesión, para el feed de cambios por usuario
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
     session_exercise_id = Column(
         Integer, ForeignKey("session_exercises.id", ondelete="CASCADE"), nullable=False
     )
@@ -15,6 +48,17 @@ class Set(Base):
     reps = Column(Integer, nullable=False)
     weight = Column(Float, nullable=True)
     unit = Column(Enum(WeightUnit, name="weight_unit"), nullable=False)
+    # Peso canónico en kg que calcula la base; weight/unit siguen siendo lo
+    # que envió el cliente
+    weight_kg = Column(
+        Float,
+        Computed(
+            f"CASE WHEN unit = 'lb' THEN weight * {KG_PER_LB} ELSE weight END",
+            persisted=True,
+        ),
+    )
     order_index = Column(Integer, nullable=False)
+    row_version = row_version_column()
+    row_xid = row_xid_column()
 
     session_exercise = relationship("SessionExercises", back_populates="sets")
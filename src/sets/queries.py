@@ -0,0 +1,90 @@
+from sqlalchemy import delete, func, select, tuple_
+
+from src.session_exercises.models import SessionExercises
+from src.sets.models import Set
+from src.workout_session.models import WorkoutSession
+
+
+def _owned_sets(user_id: int, *columns):
+    return (
+        select(*columns)
+        .join(SessionExercises, SessionExercises.id == Set.session_exercise_id)
+        .join(WorkoutSession, WorkoutSession.id == SessionExercises.session_id)
+        .where(WorkoutSession.user_id == user_id)
+    )
+
+
+def owned_set_query(set_id: int, user_id: int):
+    return _owned_sets(user_id, Set).where(Set.id == set_id)
+
+
+def owned_sets_query(set_ids: list[int], user_id: int):
+    return _owned_sets(user_id, Set.id, Set.session_exercise_id).where(
+        Set.id.in_(set_ids)
+    )
+
+
+def set_list_query(session_exercise_id: int):
+    return (
+        select(Set.id, Set.set_number, Set.reps, Set.weight, Set.unit)
+        .where(Set.session_exercise_id == session_exercise_id)
+        .order_by(Set.order_index)
+    )
+
+
+def sibling_ranks_query(session_exercise_id: int):
+    return (
+        select(Set.id, Set.order_index)
+        .where(Set.session_exercise_id == session_exercise_id)
+        .order_by(Set.order_index)
+    )
+
+
+def batch_targets_query(pairs: list[tuple[int, int]], user_id: int):
+    # Propiedad de cada (sesión, ejercicio) junto con el último rango y la
+    # cantidad de sets que ya tiene. Bloquea las sesiones (siempre en orden de
+    # id, para no cruzarse con otro batch); por eso los agregados van como
+    # subconsultas y no con GROUP BY
+    siblings = Set.session_exercise_id == SessionExercises.id
+    return (
+        select(
+            SessionExercises.id,
+            SessionExercises.session_id,
+            SessionExercises.exercise_id,
+            select(func.coalesce(func.max(Set.order_index), 0))
+            .where(siblings)
+            .scalar_subquery()
+            .label("last_rank"),
+            select(func.count()).where(siblings).scalar_subquery().label("count"),
+        )
+        .join(WorkoutSession, WorkoutSession.id == SessionExercises.session_id)
+        .where(
+            tuple_(SessionExercises.session_id, SessionExercises.exercise_id).in_(
+                pairs
+            ),
+            WorkoutSession.user_id == user_id,
+        )
+        .order_by(WorkoutSession.id)
+        .with_for_update(of=WorkoutSession)
+    )
+
+
+def delete_set_statement(set_id: int, user_id: int):
+    return (
+        delete(Set)
+        .where(
+            Set.id == set_id,
+            Set.session_exercise_id.in_(
+                select(SessionExercises.id)
+                .join(WorkoutSession, WorkoutSession.id == SessionExercises.session_id)
+                .where(WorkoutSession.user_id == user_id)
+            ),
+        )
+        .returning(Set.id, Set.session_exercise_id)
+    )
+
+
+def session_of(session_exercise_id: int):
+    return select(SessionExercises.session_id).where(
+        SessionExercises.id == session_exercise_id
+    )
@@ -1,99 +1,231 @@
+from collections import defaultdict
+
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import exists, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from config.database import get_db
 
-from src.auth.dependencies import get_current_user
+from src.analytics.models import PersonalRecord
+from src.analytics.queries import apply_rollup
+from src.analytics.records import (
+    record_personal_records,
+    recompute_personal_records,
+    release_personal_records,
+)
+from src.auth.dependencies import get_current_principal
+from src.auth.schema import Principal
+from src.common.ordering import (
+    ORDER_STEP,
+    rank_for_position,
+    ranks_for_order,
+    reorder_statement,
+)
+from src.common.schemas import Message
 from src.session_exercises.models import SessionExercises
+from src.session_exercises.queries import owned_link_query
 from src.sets.models import Set
-from src.sets.schemas import SetCreate, SetUpdate, ReorderSetsRequest
-from src.user.models import User
+from src.sets.queries import (
+    batch_targets_query,
+    delete_set_statement,
+    owned_set_query,
+    owned_sets_query,
+    session_of,
+    set_list_query,
+    sibling_ranks_query,
+)
+from src.sets.schemas import (
+    ReorderSetsRequest,
+    SetBatchCreate,
+    SetCreate,
+    SetPosition,
+    SetPositionResult,
+    SetRead,
+    SetUpdate,
+    SetWritten,
+)
+from src.sync.queries import record_tombstones
 from src.workout_session.models import WorkoutSession
+from src.workout_session.queries import bump_session_version
 
 router = APIRouter()
 
 
-@router.get("/{session_id}/{exercise_id}")
+@router.get("/{session_id}/{exercise_id}", response_model=list[SetRead])
 async def list_sets_from_exercise(
     session_id: int,
     exercise_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
 ):
-    session_exercise = (
-        db.query(SessionExercises)
-        .join(WorkoutSession, WorkoutSession.id == SessionExercises.session_id)
-        .filter(
-            SessionExercises.session_id == session_id,
-            SessionExercises.exercise_id == exercise_id,
-            WorkoutSession.user_id == current_user.id,
-        )
-        .first()
+    session_exercise_id = await db.scalar(
+        owned_link_query(session_id, exercise_id, current_user.id, SessionExercises.id)
     )
 
-    sets = db.query(Set).filter(Set.session_exercise_id == session_exercise.id).all()
+    if not session_exercise_id:
+        raise HTTPException(status_code=404, detail="Session exercise not found")
 
-    return sets
+    rows = await db.execute(set_list_query(session_exercise_id))
+
+    # order_index se expone como posición densa 1..N
+    return [
+        SetRead(
+            id=set_id,
+            session_exercise_id=session_exercise_id,
+            set_number=set_number,
+            reps=reps,
+            weight=weight,
+            unit=unit,
+            order_index=position,
+        )
+        for position, (set_id, set_number, reps, weight, unit) in enumerate(
+            rows, start=1
+        )
+    ]
 
 
-@router.post("/{session_id}/{exercise_id}")
+@router.post("/{session_id}/{exercise_id}", response_model=SetWritten)
 async def add_set_to_session_exercise(
     session_id: int,
     exercise_id: int,
     data: SetCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
 ):
-    session_exercise = (
-        db.query(SessionExercises)
-        .join(WorkoutSession, WorkoutSession.id == SessionExercises.session_id)
-        .filter(
-            SessionExercises.session_id == session_id,
-            SessionExercises.exercise_id == exercise_id,
-            WorkoutSession.user_id == current_user.id,
-        )
-        .first()
+    # Bloquea la sesión hasta el commit: los rangos de sus sets se calculan
+    # de a una petición por vez
+    session_exercise_id = await db.scalar(
+        owned_link_query(
+            session_id, exercise_id, current_user.id, SessionExercises.id
+        ).with_for_update(of=WorkoutSession)
     )
 
-    if not session_exercise:
+    if not session_exercise_id:
         raise HTTPException(status_code=404, detail="Session exercise not found")
 
-    existing_set = (
-        db.query(Set)
-        .filter(
-            Set.session_exercise_id == session_exercise.id,
-            Set.order_index == data.order_index,
-        )
-        .first()
+    # order_index llega como posición: el set se inserta ahí y los demás
+    # se corren sin reescribirlos
+    rank, position = await rank_for_position(
+        db, Set, Set.session_exercise_id, session_exercise_id, data.order_index
     )
 
-    if existing_set:
-        raise HTTPException(
-            status_code=400,
-            detail=f"order_index {data.order_index} is already in use for this exercise in this session",
-        )
-
     new_set = Set(
-        session_exercise_id=session_exercise.id,
+        user_id=current_user.id,
+        session_exercise_id=session_exercise_id,
         set_number=data.set_number,
         reps=data.reps,
         weight=data.weight,
         unit=data.unit,
-        order_index=data.order_index,
+        order_index=rank,
     )
 
     db.add(new_set)
-    db.commit()
-    db.refresh(new_set)
+    await db.flush()
+    await apply_rollup(db, current_user.id, Set.id == new_set.id)
+    records = await record_personal_records(db, current_user.id, Set.id == new_set.id)
+    await db.execute(bump_session_version([session_id]))
+    await db.commit()
+
+    return SetWritten(
+        id=new_set.id,
+        session_exercise_id=session_exercise_id,
+        set_number=data.set_number,
+        reps=data.reps,
+        weight=data.weight,
+        unit=data.unit,
+        order_index=position,
+        is_pr=new_set.id in records,
+    )
+
+
+@router.post(
+    "/batch", response_model=list[SetWritten], status_code=status.HTTP_201_CREATED
+)
+async def add_sets_batch(
+    data: SetBatchCreate,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+):
+    pairs = list(dict.fromkeys((s.session_id, s.exercise_id) for s in data.sets))
+
+    # 1. una sola consulta: propiedad de cada (sesión, ejercicio) junto con el
+    # último rango y la cantidad de sets que ya tiene; bloquea las sesiones
+    owned = {
+        (row.session_id, row.exercise_id): row
+        for row in await db.execute(batch_targets_query(pairs, current_user.id))
+    }
+
+    if len(owned) != len(pairs):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="One or more session exercises not found",
+        )
+
+    # 2. los sets se agregan al final, en el orden recibido
+    appended = defaultdict(int)
+    rows, positions = [], []
+    for item in data.sets:
+        link = owned[(item.session_id, item.exercise_id)]
+        appended[link.id] += 1
+        rows.append(
+            {
+                "user_id": current_user.id,
+                "session_exercise_id": link.id,
+                "set_number": item.set_number,
+                "reps": item.reps,
+                "weight": item.weight,
+                "unit": item.unit,
+                "order_index": link.last_rank + appended[link.id] * ORDER_STEP,
+            }
+        )
+        positions.append(link.count + appended[link.id])
+
+    # 3. un solo INSERT ... RETURNING; las sesiones quedaron bloqueadas en el
+    # paso 1, la restricción única sobre order_index queda como resguardo
+    created = (
+        await db.execute(
+            insert(Set).returning(
+                Set.id,
+                Set.session_exercise_id,
+                Set.set_number,
+                Set.reps,
+                Set.weight,
+                Set.unit,
+                sort_by_parameter_order=True,
+            ),
+            rows,
+        )
+    ).all()
+    created_ids = [row.id for row in created]
+    await apply_rollup(db, current_user.id, Set.id.in_(created_ids))
+    records = await record_personal_records(
+        db, current_user.id, Set.id.in_(created_ids)
+    )
+    await db.execute(
+        bump_session_version(list({session_id for session_id, _ in pairs}))
+    )
+
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Sets were added concurrently, retry the request",
+        )
 
-    return new_set
+    return [
+        SetWritten(**row._asdict(), order_index=position, is_pr=row.id in records)
+        for row, position in zip(created, positions)
+    ]
 
 
-@router.put("/reorder")
+@router.put("/reorder", response_model=Message)
 async def reorder_sets(
     payload: ReorderSetsRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
 ):
     if not payload.orders:
         raise HTTPException(400, "Order list cannot be empty")
@@ -107,12 +239,12 @@ async def reorder_sets(
 
     # 2. Obtener los sets y validar que existan y sean del usuario
     sets = (
-        db.query(Set)
-        .join(SessionExercises, SessionExercises.id == Set.session_exercise_id)
-        .join(WorkoutSession, WorkoutSession.id == SessionExercises.session_id)
-        .filter(Set.id.in_(set_ids), WorkoutSession.user_id == current_user.id)
-        .all()
-    )
+        await db.execute(
+            owned_sets_query(set_ids, current_user.id).with_for_update(
+                of=WorkoutSession
+            )
+        )
+    ).all()
 
     if len(sets) != len(set_ids):
         raise HTTPException(404, "One or more sets not found or unauthorized")
@@ -122,108 +254,164 @@ async def reorder_sets(
     if len(session_exercise_ids) != 1:
         raise HTTPException(400, "All sets must belong to the same session exercise")
 
-    # 4. Actualizar los order_index
-    id_to_order = {item.set_id: item.order_index for item in payload.orders}
-
-    for s in sets:
-        s.order_index = id_to_order[s.id]
+    # 4. Armar el orden final: los sets enviados van a su posición y el resto
+    # conserva su orden relativo en los huecos
+    session_exercise_id = session_exercise_ids.pop()
+    current = dict((await db.execute(sibling_ranks_query(session_exercise_id))).all())
+    placed = {item.order_index: item.set_id for item in payload.orders}
+    others = iter(set_id for set_id in current if set_id not in set_ids)
+
+    final_order = []
+    for position in range(1, len(current) + 1):
+        if position in placed:
+            final_order.append(placed.pop(position))
+        elif (set_id := next(others, None)) is not None:
+            final_order.append(set_id)
+    final_order.extend(placed[position] for position in sorted(placed))
+
+    # 5. Una sola sentencia, solo para las filas cuyo rango cambia
+    changed = {
+        set_id: rank
+        for set_id, rank in ranks_for_order(final_order).items()
+        if current[set_id] != rank
+    }
+    if changed:
+        await db.execute(reorder_statement(Set, changed))
+        await db.execute(bump_session_version(session_of(session_exercise_id)))
 
-    db.commit()
+    await db.commit()
 
     return {"detail": "Set order updated successfully"}
 
 
-@router.put("/{set_id}")
-async def edit_set(
+@router.put("/{set_id}/position", response_model=SetPositionResult)
+async def move_set(
     set_id: int,
-    data: SetUpdate,
-    _: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    data: SetPosition,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
 ):
-    set = db.query(Set).filter(Set.id == set_id).first()
+    # Bloquea la sesión del set mientras se calcula el rango nuevo
+    set = await db.scalar(
+        owned_set_query(set_id, current_user.id).with_for_update(of=WorkoutSession)
+    )
 
     if not set:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Set not found"
         )
 
-    session_exercise = (
-        db.query(SessionExercises)
-        .filter(SessionExercises.id == set.session_exercise_id)
-        .first()
+    set.order_index, position = await rank_for_position(
+        db,
+        Set,
+        Set.session_exercise_id,
+        set.session_exercise_id,
+        data.position,
+        exclude_id=set.id,
+        current_rank=set.order_index,
     )
 
-    if not session_exercise:
-        raise HTTPException(status_code=404, detail="Session exercise not found")
+    await db.execute(bump_session_version(session_of(set.session_exercise_id)))
+    await db.commit()
 
-    existing_set = (
-        db.query(Set)
-        .filter(
-            Set.session_exercise_id == session_exercise.id,
-            Set.order_index == data.order_index,
-            Set.id != set_id,
+    return {"id": set.id, "order_index": position}
+
+
+@router.put("/{set_id}", response_model=SetWritten)
+async def edit_set(
+    set_id: int,
+    data: SetUpdate,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+):
+    # Junto con el set: si hoy tiene algún récord. Bloquea la sesión del set
+    # mientras se calcula el rango nuevo
+    row = (
+        await db.execute(
+            owned_set_query(set_id, current_user.id)
+            .add_columns(exists().where(PersonalRecord.set_id == Set.id))
+            .with_for_update(of=WorkoutSession)
         )
-        .first()
-    )
+    ).first()
+    set, holds_record = row if row else (None, False)
 
-    if existing_set:
+    if not set:
         raise HTTPException(
-            status_code=400,
-            detail=f"order_index {data.order_index} is already in use for this exercise in this session",
+            status_code=status.HTTP_404_NOT_FOUND, detail="Set not found"
         )
 
+    # Solo reps, peso y unidad cuentan para los rollups
+    totals_changed = (set.reps, set.weight, set.unit) != (
+        data.reps,
+        data.weight,
+        data.unit,
+    )
+    released = []
+    if totals_changed:
+        await apply_rollup(db, current_user.id, Set.id == set_id, sign=-1)
+    if totals_changed and holds_record:
+        # El récord se recalcula con el resto de los sets
+        released = await release_personal_records(db, current_user.id, Set.id == set_id)
+
     set.reps = data.reps
     set.set_number = data.set_number
     set.unit = data.unit
     set.weight = data.weight
-    set.order_index = data.order_index
-
-    db.commit()
-    db.refresh(set)
+    set.order_index, position = await rank_for_position(
+        db,
+        Set,
+        Set.session_exercise_id,
+        set.session_exercise_id,
+        data.order_index,
+        exclude_id=set.id,
+        current_rank=set.order_index,
+    )
 
-    return {
-        "id": set.id,
-        "set_number": set.set_number,
-        "reps": set.reps,
-        "unit": set.unit,
-        "weight": set.weight,
-    }
+    if totals_changed:
+        await db.flush()
+        await apply_rollup(db, current_user.id, Set.id == set_id)
+        records = await recompute_personal_records(db, current_user.id, released)
+        records |= await record_personal_records(db, current_user.id, Set.id == set_id)
+        is_pr = set.id in records
+    else:
+        is_pr = holds_record
+
+    await db.execute(bump_session_version(session_of(set.session_exercise_id)))
+    await db.commit()
+
+    return SetWritten(
+        id=set.id,
+        session_exercise_id=set.session_exercise_id,
+        set_number=set.set_number,
+        reps=set.reps,
+        weight=set.weight,
+        unit=set.unit,
+        order_index=position,
+        is_pr=is_pr,
+    )
 
 
-@router.delete("/{set_id}")
+@router.delete("/{set_id}", response_model=Message)
 async def delete_set(
     set_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
 ):
-    set_to_delete = (
-        db.query(Set)
-        .join(SessionExercises, SessionExercises.id == Set.session_exercise_id)
-        .join(WorkoutSession, WorkoutSession.id == SessionExercises.session_id)
-        .filter(Set.id == set_id, WorkoutSession.user_id == current_user.id)
-        .first()
-    )
+    # Antes del DELETE, mientras el set todavía existe
+    await apply_rollup(db, current_user.id, Set.id == set_id, sign=-1)
+    released = await release_personal_records(db, current_user.id, Set.id == set_id)
+
+    # Los demás sets conservan su rango: no hay que renumerarlos
+    deleted = (await db.execute(delete_set_statement(set_id, current_user.id))).first()
 
-    if not set_to_delete:
+    if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Set not found"
         )
 
-    session_exercise_id = set_to_delete.session_exercise_id
-
-    db.delete(set_to_delete)
-    db.commit()
-
-    remaining_sets = (
-        db.query(Set)
-        .filter(Set.session_exercise_id == session_exercise_id)
-        .order_by(Set.order_index.asc())
-        .all()
-    )
-
-    for index, s in enumerate(remaining_sets, start=1):
-        s.order_index = index
-
-    db.commit()
+    await recompute_personal_records(db, current_user.id, released)
+    await record_tombstones(db, current_user.id, Set, [deleted.id])
+    await db.execute(bump_session_version(session_of(deleted.session_exercise_id)))
+    await db.commit()
 
     return {"detail": "Set deleted and order_index updated successfully"}
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List
 from enum import Enum
 
@@ -8,6 +8,9 @@ class WeightUnit(str, Enum):
     kg = "kg"
 
 
+KG_PER_LB = 0.45359237
+
+
 class SetCreate(BaseModel):
     set_number: int
     reps: int
@@ -24,6 +27,22 @@ class SetUpdate(BaseModel):
     order_index: int
 
 
+class SetRead(BaseModel):
+    id: int
+    session_exercise_id: int
+    set_number: int
+    reps: int
+    weight: float | None
+    unit: WeightUnit
+    # Posición densa 1..N dentro del ejercicio
+    order_index: int
+
+
+class SetWritten(SetRead):
+    # El set tiene el récord personal de su ejercicio para esa cantidad de reps
+    is_pr: bool
+
+
 class SetOrderItem(BaseModel):
     set_id: int
     order_index: int
@@ -31,3 +50,25 @@ class SetOrderItem(BaseModel):
 
 class ReorderSetsRequest(BaseModel):
     orders: List[SetOrderItem]
+
+
+class SetPosition(BaseModel):
+    position: int = Field(..., ge=1)
+
+
+class SetBatchItem(BaseModel):
+    session_id: int
+    exercise_id: int
+    set_number: int
+    reps: int
+    weight: float
+    unit: WeightUnit
+
+
+class SetBatchCreate(BaseModel):
+    sets: List[SetBatchItem] = Field(..., min_length=1, max_length=200)
+
+
+class SetPositionResult(BaseModel):
+    id: int
+    order_index: int
@@ -0,0 +1,61 @@
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    ForeignKey,
+    Index,
+    Integer,
+    Sequence,
+    String,
+    text,
+)
+
+from config.database import Base
+
+# Secuencia global de cambios: cada INSERT o UPDATE de una fila sincronizable
+# le asigna el siguiente valor en row_version.
+# El valor se toma al escribir, no al confirmar: una transacción que confirma
+# tarde deja versiones menores detrás de otras ya leídas. Por eso cada fila
+# guarda también la transacción que la escribió (row_xid) y el feed solo
+# sirve filas de transacciones anteriores a la más vieja todavía abierta,
+# ordenadas por (row_xid, row_version). Un cliente guarda ese par de la
+# última fila que vio y pide solo lo que vino después.
+change_seq = Sequence("change_seq", metadata=Base.metadata)
+
+CURRENT_XID = "(pg_current_xact_id()::text::bigint)"
+
+
+def row_version_column():
+    return Column(
+        BigInteger,
+        server_default=change_seq.next_value(),
+        onupdate=change_seq.next_value(),
+        nullable=False,
+    )
+
+
+def row_xid_column():
+    return Column(
+        BigInteger,
+        server_default=text(CURRENT_XID),
+        onupdate=text(CURRENT_XID),
+        nullable=False,
+    )
+
+
+class Tombstone(Base):
+    # Registro de borrados para el feed de cambios. Borrar un padre implica a
+    # sus hijos (sesión -> ejercicios de la sesión -> sets; ejercicio -> sus
+    # vínculos con sesiones), que se borran en cascada sin lápida propia.
+    __tablename__ = "tombstones"
+    __table_args__ = (
+        Index("ix_tombstones_user_version", "user_id", "row_xid", "row_version"),
+    )
+
+    id = Column(BigInteger, primary_key=True)
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    entity = Column(String(32), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    row_version = row_version_column()
+    row_xid = row_xid_column()
@@ -0,0 +1,116 @@
+from sqlalchemy import BigInteger, Text, cast, func, insert, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.exercise.models import Exercise
+from src.session_exercises.models import SessionExercises
+from src.sets.models import Set
+from src.sync.models import Tombstone
+from src.workout_session.models import WorkoutSession
+
+
+async def record_tombstones(db: AsyncSession, user_id: int, model, ids: list[int]):
+    # Se llama en la misma transacción que el DELETE
+    if ids:
+        await db.execute(
+            insert(Tombstone),
+            [
+                {"user_id": user_id, "entity": model.__tablename__, "entity_id": i}
+                for i in ids
+            ],
+        )
+
+
+def _feeds(user_id: int):
+    # Filas del usuario por tabla; cada consulta se filtra por (row_xid,
+    # row_version) y se sirve de su índice (user_id, row_xid, row_version)
+    return {
+        "exercises": select(
+            Exercise.id,
+            Exercise.name,
+            Exercise.description,
+            Exercise.muscle_group,
+            Exercise.created_at,
+            Exercise.row_version,
+            Exercise.row_xid,
+        ).where(Exercise.user_id == user_id),
+        "workout_sessions": select(
+            WorkoutSession.id,
+            WorkoutSession.name,
+            WorkoutSession.notes,
+            WorkoutSession.session_date,
+            WorkoutSession.created_at,
+            WorkoutSession.row_version,
+            WorkoutSession.row_xid,
+        ).where(WorkoutSession.user_id == user_id),
+        "session_exercises": select(
+            SessionExercises.id,
+            SessionExercises.session_id,
+            SessionExercises.exercise_id,
+            SessionExercises.order_index,
+            SessionExercises.row_version,
+            SessionExercises.row_xid,
+        ).where(SessionExercises.user_id == user_id),
+        "sets": select(
+            Set.id,
+            Set.session_exercise_id,
+            Set.set_number,
+            Set.reps,
+            Set.weight,
+            Set.unit,
+            Set.order_index,
+            Set.row_version,
+            Set.row_xid,
+        ).where(Set.user_id == user_id),
+        "deleted": select(
+            Tombstone.entity,
+            Tombstone.entity_id.label("id"),
+            Tombstone.row_version,
+            Tombstone.row_xid,
+        ).where(Tombstone.user_id == user_id),
+    }
+
+
+def change_horizon():
+    # La transacción abierta más vieja: todo lo escrito por transacciones
+    # anteriores ya está confirmado (o descartado) y no puede cambiar de lugar
+    return cast(
+        cast(func.pg_snapshot_xmin(func.pg_current_snapshot()), Text), BigInteger
+    )
+
+
+def changes_queries(user_id: int, after: tuple[int, int], horizon, limit: int) -> dict:
+    # limit + 1 por tabla: al mezclar, si sobran filas hay otra página
+    queries = {}
+    for name, query in _feeds(user_id).items():
+        columns = query.selected_columns
+        key = tuple_(columns.row_xid, columns.row_version)
+        queries[name] = (
+            query.where(key > tuple_(*after), columns.row_xid < horizon)
+            .order_by(columns.row_xid, columns.row_version)
+            .limit(limit + 1)
+        )
+    return queries
+
+
+async def load_changes(
+    db: AsyncSession, user_id: int, after: tuple[int, int], limit: int
+):
+    # Un solo horizonte para todas las tablas, así la página mezclada es
+    # consistente
+    horizon = await db.scalar(select(change_horizon()))
+
+    merged = []
+    for name, query in changes_queries(user_id, after, horizon, limit).items():
+        merged.extend(
+            ((row.row_xid, row.row_version), name, row)
+            for row in await db.execute(query)
+        )
+    merged.sort(key=lambda item: item[0])
+
+    page = merged[:limit]
+    changes = {name: [] for name in _feeds(user_id)}
+    for _, name, row in page:
+        changes[name].append(row._asdict())
+
+    last_key = page[-1][0] if page else after
+    return changes, last_key, len(merged) > limit
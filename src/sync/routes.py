@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.database import get_db
+from src.auth.dependencies import get_current_principal
+from src.auth.schema import Principal
+from src.common.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    decode_cursor,
+    encode_cursor,
+)
+from src.sync.queries import load_changes
+from src.sync.schemas import ChangesPage
+
+router = APIRouter()
+
+
+@router.get("/changes", response_model=ChangesPage)
+async def list_changes(
+    cursor: str | None = None,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+):
+    # Sin cursor se empieza desde cero (sincronización inicial paginada).
+    # El cliente guarda next_cursor y sigue pidiendo mientras has_more.
+    after = decode_cursor(cursor, int, int) if cursor else (0, 0)
+
+    changes, last_key, has_more = await load_changes(db, current_user.id, after, limit)
+
+    return {
+        **changes,
+        "next_cursor": encode_cursor(*last_key),
+        "has_more": has_more,
+    }
@@ -0,0 +1,59 @@
+from datetime import date, datetime
+
+from pydantic import BaseModel
+
+from src.sets.schemas import WeightUnit
+
+
+class ExerciseChange(BaseModel):
+    id: int
+    name: str
+    description: str | None
+    muscle_group: str | None
+    created_at: datetime | None
+    row_version: int
+
+
+class WorkoutSessionChange(BaseModel):
+    id: int
+    name: str
+    notes: str | None
+    session_date: date
+    created_at: datetime | None
+    row_version: int
+
+
+class SessionExerciseChange(BaseModel):
+    id: int
+    session_id: int
+    exercise_id: int
+    # Rango disperso: el cliente ordena por este valor
+    order_index: int
+    row_version: int
+
+
+class SetChange(BaseModel):
+    id: int
+    session_exercise_id: int
+    set_number: int
+    reps: int
+    weight: float | None
+    unit: WeightUnit
+    order_index: int
+    row_version: int
+
+
+class DeletedEntity(BaseModel):
+    entity: str
+    id: int
+    row_version: int
+
+
+class ChangesPage(BaseModel):
+    exercises: list[ExerciseChange]
+    workout_sessions: list[WorkoutSessionChange]
+    session_exercises: list[SessionExerciseChange]
+    sets: list[SetChange]
+    deleted: list[DeletedEntity]
+    next_cursor: str
+    has_more: bool
@@ -0,0 +1,9 @@
+import os
+
+from src.common.cache import TTLCache
+
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", 10_000))
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", 60))
+
+# Usuarios ya cargados (desvinculados de su sesión) indexados por id
+user_cache = TTLCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL)
@@ -11,10 +11,12 @@ class User(Base):
     name = Column(String(150), nullable=False)
     username = Column(String(30), nullable=False, unique=True)
     password_hash = Column(String(255), nullable=False)
-    email = Column(String(255), nullable=False)
+    email = Column(String(255), nullable=False, index=True)
     created_at = Column(TIMESTAMP, server_default=func.now())
     last_login = Column(TIMESTAMP, server_default=func.now())
     active = Column(Boolean, default=False)
+    # Versión de los listados del usuario (ETag de sesiones, ejercicios y perfil)
+    collection_version = Column(Integer, nullable=False, server_default="1")
 
     exercises = relationship("Exercise", back_populates="user")
     workout_session = relationship("WorkoutSession", back_populates="user")
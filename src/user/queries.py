@@ -0,0 +1,30 @@
+from sqlalchemy import select, update
+
+from src.user.models import User
+
+
+def collection_version_query(user_id: int):
+    return select(User.collection_version).where(User.id == user_id)
+
+
+def bump_collection_version(user_id: int):
+    # Cambia con cualquier alta, edición o baja de sesiones o ejercicios del
+    # usuario, y con la edición del perfil: invalida los ETag de los listados
+    return (
+        update(User)
+        .where(User.id == user_id)
+        .values(collection_version=User.collection_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def user_by_id(user_id: int):
+    return select(User).where(User.id == user_id)
+
+
+def user_by_username(username: str):
+    return select(User).where(User.username == username)
+
+
+def user_by_email(email: str):
+    return select(User).where(User.email == email)
@@ -1,16 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from config.database import get_db
-from src.auth.dependencies import get_current_user
+from src.auth.dependencies import get_current_principal, get_current_user
+from src.auth.schema import Principal
+from src.common.etag import etag_matches, make_etag, not_modified, set_etag
+from src.user.cache import user_cache
 from src.user.models import User
-from src.user.schema import UserEdit
+from src.user.queries import user_by_email, user_by_username
+from src.user.schema import UserEdit, UserProfile
 
 router = APIRouter()
 
 
-@router.get("/")
-def get_profile(current_user: User = Depends(get_current_user)):
+@router.get("/", response_model=UserProfile)
+async def get_profile(
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+):
+    # collection_version también cambia al editar el perfil
+    etag = make_etag("profile", current_user.id, current_user.collection_version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    set_etag(response, etag)
     return {
         "id": current_user.id,
         "name": current_user.name,
@@ -20,31 +35,41 @@ def get_profile(current_user: User = Depends(get_current_user)):
     }
 
 
-@router.put("/")
-def edit_profile(
+@router.put("/", response_model=UserProfile)
+async def edit_profile(
     user_edit: UserEdit,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    principal: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
 ):
-    username_exists = db.query(User).filter(User.username == user_edit.username).first()
+    # El usuario en caché está desvinculado; para editarlo se carga en esta sesión
+    current_user = await db.get(User, principal.id)
+
+    if not current_user:
+        raise HTTPException(status_code=404, detail="Usuario no encontrado")
+
+    username_exists = await db.scalar(user_by_username(user_edit.username))
     if username_exists and username_exists.username != current_user.username:
         raise HTTPException(status_code=400, detail="El nombre de usuario ya existe")
 
-    email_exists = db.query(User).filter(User.email == user_edit.email).first()
+    email_exists = await db.scalar(user_by_email(user_edit.email))
     if email_exists and email_exists.email != current_user.email:
         raise HTTPException(status_code=400, detail="El correo ya existe")
 
-    current_user.name = user_edit.name
-    current_user.username = user_edit.username
-    current_user.email = user_edit.email
-
-    db.commit()
-    db.refresh(current_user)
+    # La respuesta sale del mismo UPDATE
+    profile = (
+        await db.execute(
+            update(User)
+            .where(User.id == principal.id)
+            .values(
+                name=user_edit.name,
+                username=user_edit.username,
+                email=user_edit.email,
+                collection_version=User.collection_version + 1,
+            )
+            .returning(User.id, User.username, User.name, User.email, User.created_at)
+        )
+    ).one()
+    await db.commit()
+    user_cache.invalidate(principal.id)
 
-    return {
-        "id": current_user.id,
-        "username": current_user.username,
-        "name": current_user.name,
-        "email": current_user.email,
-        "created_at": current_user.created_at,
-    }
+    return profile._asdict()
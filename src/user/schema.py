@@ -1,4 +1,6 @@
-from pydantic import BaseModel, Field
+from datetime import datetime
+
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class UserCreate(BaseModel):
@@ -14,8 +16,7 @@ class UserRead(BaseModel):
     username: str
     active: bool
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class UserResponse(BaseModel):
@@ -23,11 +24,18 @@ class UserResponse(BaseModel):
     name: str
     username: str
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class UserEdit(BaseModel):
     name: str
     username: str
     email: str
+
+
+class UserProfile(BaseModel):
+    id: int
+    name: str
+    username: str
+    email: str
+    created_at: datetime | None
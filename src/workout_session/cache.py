@@ -0,0 +1,66 @@
+import os
+
+from src.common.cache import LocalSharedClient, MemoryBackend, SharedBackend
+
+SESSION_CACHE_BACKEND = os.getenv("SESSION_CACHE_BACKEND", "memory")
+SESSION_CACHE_SIZE = int(os.getenv("SESSION_CACHE_SIZE", 2_000))
+SESSION_CACHE_TTL = float(os.getenv("SESSION_CACHE_TTL", 300))
+# Sin URL el backend compartido usa el sustituto local en memoria
+SESSION_CACHE_URL = os.getenv("SESSION_CACHE_URL")
+
+
+class SessionTreeCache:
+    # Árbol de detail_session ya serializado. La clave incluye la versión de
+    # la sesión: cada escritura la incrementa, así que una entrada vieja
+    # nunca se vuelve a pedir y sale por LRU o TTL. Eso sirve igual para el
+    # backend compartido, donde borrar en cada proceso no es posible.
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(user_id: int, session_id: int, version: int) -> str:
+        return f"session-tree:{user_id}:{session_id}:{version}"
+
+    async def get(self, user_id: int, session_id: int, version: int) -> bytes | None:
+        body = await self.backend.get(self.key(user_id, session_id, version))
+        if body is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return body
+
+    async def set(self, user_id: int, session_id: int, version: int, body: bytes):
+        await self.backend.set(self.key(user_id, session_id, version), body)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            **self.backend.stats(),
+        }
+
+
+def build_backend(kind: str):
+    if kind == "memory":
+        return MemoryBackend(maxsize=SESSION_CACHE_SIZE, ttl=SESSION_CACHE_TTL)
+
+    if kind == "shared":
+        if SESSION_CACHE_URL:
+            # Dependencia opcional: solo hace falta con un servidor real
+            import redis.asyncio as redis
+
+            client = redis.from_url(SESSION_CACHE_URL)
+        else:
+            client = LocalSharedClient(maxsize=SESSION_CACHE_SIZE)
+        return SharedBackend(client, ttl=SESSION_CACHE_TTL, prefix="tt:")
+
+    raise ValueError(f"SESSION_CACHE_BACKEND desconocido: {kind}")
+
+
+session_tree_cache = SessionTreeCache(build_backend(SESSION_CACHE_BACKEND))
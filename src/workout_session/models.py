@@ -1,11 +1,27 @@
-from sqlalchemy import Column, Integer, String, TIMESTAMP, ForeignKey, Text, Date
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    TIMESTAMP,
+    ForeignKey,
+    Text,
+    Date,
+    Index,
+)
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from config.database import Base
+from src.sync.models import row_version_column, row_xid_column
 
 
 class WorkoutSession(Base):
     __tablename__ = "workout_sessions"
+    __table_args__ = (
+        # Paginación por (session_date, id) dentro de cada usuario
+        Index("ix_workout_sessions_user_date_id", "user_id", "session_date", "id"),
+        # Feed de cambios por usuario
+        Index("ix_workout_sessions_user_version", "user_id", "row_xid", "row_version"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(
@@ -15,6 +31,10 @@ class WorkoutSession(Base):
     notes = Column(Text, nullable=True)
     created_at = Column(TIMESTAMP, server_default=func.now())
     session_date = Column(Date, nullable=False)
+    row_version = row_version_column()
+    row_xid = row_xid_column()
+    # Versión del árbol completo (sesión, ejercicios y sets) para el ETag
+    version = Column(Integer, nullable=False, server_default="1")
 
     user = relationship("User", back_populates="workout_session")
     session_exercises = relationship(
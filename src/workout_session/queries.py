@@ -0,0 +1,174 @@
+from sqlalchemy import select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.exercise.models import Exercise
+from src.session_exercises.models import SessionExercises
+from src.sets.models import Set
+from src.workout_session.models import WorkoutSession
+from src.workout_session.schema import (
+    SessionExerciseDetail,
+    SessionSetDetail,
+    WorkoutSessionDetail,
+)
+
+# Las columnas de WorkoutSessionRead
+SESSION_COLUMNS = (
+    WorkoutSession.id,
+    WorkoutSession.user_id,
+    WorkoutSession.name,
+    WorkoutSession.notes,
+    WorkoutSession.session_date,
+    WorkoutSession.created_at,
+)
+
+
+def list_sessions_query(
+    user_id: int,
+    limit: int,
+    date_from=None,
+    date_to=None,
+    after=None,
+):
+    # Más recientes primero; el índice (user_id, session_date, id) se recorre
+    # hacia atrás, así que cada página cuesta O(limit)
+    query = select(*SESSION_COLUMNS).where(WorkoutSession.user_id == user_id)
+
+    if date_from:
+        query = query.where(WorkoutSession.session_date >= date_from)
+
+    if date_to:
+        query = query.where(WorkoutSession.session_date <= date_to)
+
+    if after:
+        query = query.where(
+            tuple_(WorkoutSession.session_date, WorkoutSession.id) < tuple_(*after)
+        )
+
+    return query.order_by(
+        WorkoutSession.session_date.desc(), WorkoutSession.id.desc()
+    ).limit(limit + 1)
+
+
+def owned_session_query(session_id: int, user_id: int, *columns):
+    return select(*(columns or (WorkoutSession,))).where(
+        WorkoutSession.id == session_id, WorkoutSession.user_id == user_id
+    )
+
+
+def session_version_query(session_id: int, user_id: int):
+    return select(WorkoutSession.version).where(
+        WorkoutSession.id == session_id, WorkoutSession.user_id == user_id
+    )
+
+
+def session_tree_query(session_id: int, user_id: int):
+    # Sesión -> ejercicios -> sets en una sola consulta; los LEFT JOIN
+    # conservan la sesión aunque no tenga ejercicios y los ejercicios sin sets
+    return (
+        select(
+            WorkoutSession.id,
+            WorkoutSession.user_id,
+            WorkoutSession.name,
+            WorkoutSession.notes,
+            WorkoutSession.created_at,
+            WorkoutSession.session_date,
+            WorkoutSession.version,
+            SessionExercises.id,
+            SessionExercises.order_index,
+            Exercise.id,
+            Exercise.name,
+            Exercise.description,
+            Set.id,
+            Set.set_number,
+            Set.reps,
+            Set.weight,
+            Set.unit,
+            Set.order_index,
+        )
+        .select_from(WorkoutSession)
+        .outerjoin(SessionExercises, SessionExercises.session_id == WorkoutSession.id)
+        .outerjoin(Exercise, Exercise.id == SessionExercises.exercise_id)
+        .outerjoin(Set, Set.session_exercise_id == SessionExercises.id)
+        .where(WorkoutSession.id == session_id, WorkoutSession.user_id == user_id)
+        .order_by(SessionExercises.order_index, Set.order_index, Set.id)
+    )
+
+
+def build_session_tree(rows) -> WorkoutSessionDetail | None:
+    if not rows:
+        return None
+
+    exercises: list[SessionExerciseDetail] = []
+    current = None
+
+    for row in rows:
+        (
+            *session_columns,
+            session_exercise_id,
+            session_exercise_order,
+            exercise_id,
+            exercise_name,
+            exercise_description,
+            set_id,
+            set_number,
+            reps,
+            weight,
+            unit,
+            set_order,
+        ) = row
+
+        if session_exercise_id is None:
+            continue
+
+        # order_index se guarda como rango disperso; se expone la posición
+        if current is None or current.session_exercise_id != session_exercise_id:
+            current = SessionExerciseDetail(
+                id=exercise_id,
+                name=exercise_name,
+                description=exercise_description,
+                session_exercise_id=session_exercise_id,
+                order_index=len(exercises) + 1,
+                sets=[],
+            )
+            exercises.append(current)
+
+        if set_id is not None:
+            current.sets.append(
+                SessionSetDetail(
+                    id=set_id,
+                    set_number=set_number,
+                    reps=reps,
+                    weight=weight,
+                    unit=unit,
+                    order_index=len(current.sets) + 1,
+                )
+            )
+
+    session_id, user_id, name, notes, created_at, session_date, version = rows[0][:7]
+    return WorkoutSessionDetail(
+        id=session_id,
+        user_id=user_id,
+        name=name,
+        notes=notes,
+        created_at=created_at,
+        session_date=session_date,
+        version=version,
+        exercises=exercises,
+    )
+
+
+async def load_session_tree(
+    db: AsyncSession, session_id: int, user_id: int
+) -> WorkoutSessionDetail | None:
+    rows = (await db.execute(session_tree_query(session_id, user_id))).all()
+    return build_session_tree(rows)
+
+
+def bump_session_version(session_ids):
+    # session_ids puede ser una lista o una subconsulta de ids
+    return (
+        update(WorkoutSession)
+        .where(WorkoutSession.id.in_(session_ids))
+        .values(version=WorkoutSession.version + 1)
+        .execution_options(synchronize_session=False)
+    )
@@ -1,131 +1,189 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from config.database import get_db
-from src.auth.dependencies import get_current_user
-from src.user.models import User
+from src.analytics.queries import apply_rollup
+from src.analytics.records import (
+    recompute_personal_records,
+    release_personal_records,
+)
+from src.auth.dependencies import get_current_principal
+from src.auth.schema import Principal
+from src.common.ordering import (
+    rank_for_position,
+    ranks_for_order,
+    reorder_statement,
+)
+from src.common.etag import etag_matches, make_etag, not_modified, set_etag
+from src.common.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    decode_cursor,
+    page_from_rows,
+)
+from src.common.schemas import Message
+from src.session_exercises.queries import (
+    append_links_statement,
+    link_count_query,
+    owned_link_query,
+    remove_links_statement,
+    session_links_query,
+)
+from src.sync.queries import record_tombstones
+from src.user.queries import bump_collection_version, collection_version_query
+from src.workout_session.cache import session_tree_cache
 from src.workout_session.models import WorkoutSession
+from src.workout_session.queries import (
+    SESSION_COLUMNS,
+    bump_session_version,
+    list_sessions_query,
+    load_session_tree,
+    owned_session_query,
+    session_version_query,
+)
 from src.workout_session.schema import (
     AddExercises,
+    AddExercisesResult,
+    ExercisePosition,
+    ExercisePositionResult,
+    ReorderResult,
     UpdateOrder,
     RemoveExercises,
+    RemoveExercisesResult,
     WorkoutSessionCreate,
+    WorkoutSessionDetail,
+    WorkoutSessionPage,
+    WorkoutSessionRead,
+    WorkoutSessionSync,
 )
+from src.workout_session.sync import sync_session_tree
 from src.session_exercises.models import SessionExercises
-from src.exercise.models import Exercise
+from src.exercise.queries import owned_exercise_ids_query
 
 router = APIRouter()
 
 
-@router.get("/")
+@router.get("/", response_model=WorkoutSessionPage)
 async def list_sessions(
-    current_user: User = Depends(get_current_user), db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    cursor: str | None = None,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    date_from: date | None = Query(default=None, alias="from"),
+    date_to: date | None = Query(default=None, alias="to"),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
 ):
-    workout_sessions = (
-        db.query(WorkoutSession).filter(WorkoutSession.user_id == current_user.id).all()
+    # El ETag depende de la versión de la colección y de los parámetros: si
+    # coincide no se consulta la lista
+    version = await db.scalar(collection_version_query(current_user.id))
+    etag = make_etag(
+        "sessions", current_user.id, version, cursor, limit, date_from, date_to
     )
-    return workout_sessions
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    after = decode_cursor(cursor, date, int) if cursor else None
+    query = list_sessions_query(current_user.id, limit, date_from, date_to, after)
+
+    workout_sessions = (await db.execute(query)).all()
+    items, next_cursor = page_from_rows(
+        workout_sessions, limit, key=lambda s: (s.session_date, s.id)
+    )
+
+    set_etag(response, etag)
+    return {"items": items, "next_cursor": next_cursor}
 
 
-@router.get("/{session_id}")
+@router.get("/{session_id}", response_model=WorkoutSessionDetail)
 async def detail_session(
     session_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    request: Request,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
 ):
-    session = (
-        db.query(WorkoutSession)
-        .filter(
-            WorkoutSession.id == session_id,
-            WorkoutSession.user_id == current_user.id,
-        )
-        .first()
-    )
+    # Solo se lee la versión: alcanza para el 304 y para buscar en el cache;
+    # el árbol se arma únicamente si no está
+    version = await db.scalar(session_version_query(session_id, current_user.id))
 
-    if not session:
+    if version is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Session not found"
         )
 
-    # Traer ejercicios + sets
-    session_exercises = (
-        db.query(SessionExercises)
-        .join(Exercise, Exercise.id == SessionExercises.exercise_id)
-        .filter(SessionExercises.session_id == session_id)
-        .order_by(SessionExercises.order_index.asc())
-        .all()
-    )
+    etag = make_etag("session", session_id, version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
 
-    # Formar respuesta completa
-    exercises_output = []
-    for se in session_exercises:
-        exercises_output.append(
-            {
-                "id": se.exercise.id,
-                "name": se.exercise.name,
-                "description": se.exercise.description,
-                "session_exercise_id": se.id,
-                "order_index": se.order_index,
-                "sets": [
-                    {
-                        "id": s.id,
-                        "set_number": s.set_number,
-                        "reps": s.reps,
-                        "weight": s.weight,
-                        "unit": s.unit.value,
-                        "order_index": s.order_index,
-                    }
-                    for s in se.sets
-                ],
-            }
-        )
+    body = await session_tree_cache.get(current_user.id, session_id, version)
+    if body is None:
+        session = await load_session_tree(db, session_id, current_user.id)
 
-    return {
-        "id": session.id,
-        "user_id": session.user_id,
-        "name": session.name,
-        "notes": session.notes,
-        "created_at": session.created_at,
-        "session_date": session.session_date,
-        "exercises": exercises_output,
-    }
+        if not session:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Session not found"
+            )
+
+        # Se guarda con la versión que trae el árbol, por si cambió entre
+        # las dos consultas
+        version = session.version
+        etag = make_etag("session", session_id, version)
+        body = session.model_dump_json().encode()
+        await session_tree_cache.set(current_user.id, session_id, version, body)
+
+    response = Response(content=body, media_type="application/json")
+    set_etag(response, etag)
+    return response
 
 
-@router.post("/")
+@router.post("/", response_model=WorkoutSessionRead)
 async def create_session(
     session_data: WorkoutSessionCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
 ):
-    new_session = WorkoutSession(
-        user_id=current_user.id,
-        name=session_data.name,
-        notes=session_data.notes,
-        session_date=session_data.session_date,
-    )
+    # La respuesta sale del mismo INSERT, sin volver a leer la fila
+    new_session = (
+        await db.execute(
+            insert(WorkoutSession)
+            .values(
+                user_id=current_user.id,
+                name=session_data.name,
+                notes=session_data.notes,
+                session_date=session_data.session_date,
+            )
+            .returning(*SESSION_COLUMNS)
+        )
+    ).one()
+    await db.execute(bump_collection_version(current_user.id))
+    await db.commit()
 
-    db.add(new_session)
-    db.commit()
-    db.refresh(new_session)
+    return WorkoutSessionRead(**new_session._asdict())
 
-    return new_session
 
+@router.put("/sync", response_model=WorkoutSessionDetail)
+async def sync_session(
+    data: WorkoutSessionSync,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+):
+    return await sync_session_tree(db, data, current_user.id)
 
-@router.post("/{session_id}/add-exercises")
+
+@router.post("/{session_id}/add-exercises", response_model=AddExercisesResult)
 async def add_exercises_to_session(
     session_id: int,
     data: AddExercises,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
 ):
-    # 1. verificar que la sesión existe
-    session = (
-        db.query(WorkoutSession)
-        .filter(
-            WorkoutSession.id == session_id,
-            WorkoutSession.user_id == current_user.id,
-        )
-        .first()
+    # 1. verificar que la sesión existe; queda bloqueada hasta el commit para
+    # que los rangos al final no se calculen dos veces iguales
+    session = await db.scalar(
+        owned_session_query(session_id, current_user.id).with_for_update()
     )
 
     if not session:
@@ -133,46 +191,30 @@ async def add_exercises_to_session(
             status_code=status.HTTP_404_NOT_FOUND, detail="Session not found"
         )
 
-    # 2. obtener los ejercicios
-    exercises = db.query(Exercise).filter(Exercise.id.in_(data.exercise_ids)).all()
+    # 2. obtener los ejercicios del usuario
+    exercises = (
+        await db.scalars(owned_exercise_ids_query(data.exercise_ids, current_user.id))
+    ).all()
 
-    if len(exercises) != len(data.exercise_ids):
+    if len(exercises) != len(set(data.exercise_ids)):
         raise HTTPException(
-            status_code=status.HTTP_400_NOT_FOUND,
+            status_code=status.HTTP_400_BAD_REQUEST,
             detail="One or more exercise IDs do not exist",
         )
 
     # 3. evitar duplicados
-    existing = (
-        db.query(SessionExercises.exercise_id)
-        .filter(SessionExercises.session_id == session_id)
-        .all()
-    )
+    existing = (await db.execute(session_links_query(session_id))).all()
     existing_ids = {e[0] for e in existing}
 
-    new_ids = [eid for eid in data.exercise_ids if eid not in existing_ids]
+    new_ids = [
+        eid for eid in dict.fromkeys(data.exercise_ids) if eid not in existing_ids
+    ]
 
-    # 4. obtener el último order_index
-    last_order = (
-        db.query(SessionExercises)
-        .filter(SessionExercises.session_id == session_id)
-        .order_by(SessionExercises.order_index.desc())
-        .first()
-    )
-
-    next_index = last_order.order_index + 1 if last_order else 1
-
-    # 5. insertar ejercicios con order_index
-    for exercise_id in new_ids:
-        link = SessionExercises(
-            session_id=session_id,
-            exercise_id=exercise_id,
-            order_index=next_index,
-        )
-        next_index += 1
-        db.add(link)
-
-    db.commit()
+    # 4. insertar al final; el rango se calcula dentro del propio INSERT
+    if new_ids:
+        await db.execute(append_links_statement(session_id, current_user.id, new_ids))
+        await db.execute(bump_session_version([session_id]))
+    await db.commit()
 
     return {
         "session_id": session_id,
@@ -181,66 +223,66 @@ async def add_exercises_to_session(
     }
 
 
-@router.put("/{session_id}")
+@router.put("/{session_id}", response_model=WorkoutSessionRead)
 async def edit_work_session(
     session_id: int,
     session_data: WorkoutSessionCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
 ):
-    session_exists = (
-        db.query(WorkoutSession)
-        .filter(
-            WorkoutSession.name == session_data.name,
-            WorkoutSession.user_id == current_user.id,
-        )
-        .first()
+    current_date = await db.scalar(
+        owned_session_query(session_id, current_user.id, WorkoutSession.session_date)
     )
 
-    if session_exists and session_data.name != session_exists.name:
+    if current_date is None:
         raise HTTPException(
-            status_code=status.HTTP_400_NOT_FOUND,
-            detail="El nombre de la sesión ya está en uso",
+            status_code=status.HTTP_404_NOT_FOUND, detail="No se encontró el ejercicio"
         )
 
-    session = (
-        db.query(WorkoutSession)
-        .filter(
-            WorkoutSession.id == session_id, WorkoutSession.user_id == current_user.id
+    # Los rollups van por día: mover la sesión mueve sus totales
+    date_changed = current_date != session_data.session_date
+    if date_changed:
+        await apply_rollup(
+            db, current_user.id, SessionExercises.session_id == session_id, sign=-1
         )
-        .first()
-    )
 
-    if not session:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="No se encontró el ejercicio"
+    # La respuesta sale del mismo UPDATE
+    session = (
+        await db.execute(
+            update(WorkoutSession)
+            .where(WorkoutSession.id == session_id)
+            .values(
+                name=session_data.name,
+                notes=session_data.notes,
+                session_date=session_data.session_date,
+            )
+            .returning(*SESSION_COLUMNS)
         )
+    ).one()
 
-    session.name = session_data.name
-    session.notes = session_data.notes
-    session.session_date = session_data.session_date
+    if date_changed:
+        await apply_rollup(
+            db, current_user.id, SessionExercises.session_id == session_id
+        )
 
-    db.commit()
-    db.refresh(session)
+    await db.execute(bump_session_version([session_id]))
+    await db.execute(bump_collection_version(current_user.id))
+    await db.commit()
 
-    return session
+    return WorkoutSessionRead(**session._asdict())
 
 
-@router.put("/{session_id}/reorder")
+@router.put("/{session_id}/reorder", response_model=ReorderResult)
 async def reorder_session_exercises(
     session_id: int,
     data: UpdateOrder,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
 ):
-    # 1. verificar que la sesión existe y pertenece al usuario
-    session = (
-        db.query(WorkoutSession)
-        .filter(
-            WorkoutSession.id == session_id,
-            WorkoutSession.user_id == current_user.id,
-        )
-        .first()
+    # 1. verificar que la sesión existe y pertenece al usuario; queda bloqueada
+    # hasta el commit
+    session = await db.scalar(
+        owned_session_query(session_id, current_user.id).with_for_update()
     )
 
     if not session:
@@ -249,29 +291,23 @@ async def reorder_session_exercises(
         )
 
     # 2. obtener los ejercicios reales en esta sesión
-    session_exercises = (
-        db.query(SessionExercises)
-        .filter(SessionExercises.session_id == session_id)
-        .all()
-    )
-
-    current_ids = {se.exercise_id for se in session_exercises}
+    links = dict((await db.execute(session_links_query(session_id))).all())
 
     # 3. validar que los enviados coinciden con los actuales
-    if set(data.exercise_ids) != current_ids:
+    if len(data.exercise_ids) != len(links) or set(data.exercise_ids) != set(links):
         raise HTTPException(
-            status_code=status.HTTP_400_NOT_FOUND,
+            status_code=status.HTTP_400_BAD_REQUEST,
             detail="Exercise list does not match current session exercises",
         )
 
-    # 4. actualizar order_index según el nuevo orden
-    for new_index, exercise_id in enumerate(data.exercise_ids, start=1):
-        db.query(SessionExercises).filter(
-            SessionExercises.session_id == session_id,
-            SessionExercises.exercise_id == exercise_id,
-        ).update({"order_index": new_index})
-
-    db.commit()
+    # 4. actualizar order_index según el nuevo orden en una sola sentencia
+    positions = ranks_for_order(
+        [links[exercise_id] for exercise_id in data.exercise_ids]
+    )
+    if positions:
+        await db.execute(reorder_statement(SessionExercises, positions))
+        await db.execute(bump_session_version([session_id]))
+    await db.commit()
 
     return {
         "session_id": session_id,
@@ -279,92 +315,133 @@ async def reorder_session_exercises(
     }
 
 
-@router.delete("/{session_id}/remove-exercises")
+@router.put(
+    "/{session_id}/exercises/{exercise_id}/position",
+    response_model=ExercisePositionResult,
+)
+async def move_session_exercise(
+    session_id: int,
+    exercise_id: int,
+    data: ExercisePosition,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+):
+    # Bloquea la sesión mientras se calcula el rango nuevo
+    link = await db.scalar(
+        owned_link_query(session_id, exercise_id, current_user.id).with_for_update(
+            of=WorkoutSession
+        )
+    )
+
+    if not link:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session exercise not found",
+        )
+
+    # solo se escribe la fila movida (salvo que haya que repartir rangos)
+    link.order_index, position = await rank_for_position(
+        db,
+        SessionExercises,
+        SessionExercises.session_id,
+        session_id,
+        data.position,
+        exclude_id=link.id,
+        current_rank=link.order_index,
+    )
+
+    await db.execute(bump_session_version([session_id]))
+    await db.commit()
+
+    return {
+        "session_id": session_id,
+        "exercise_id": exercise_id,
+        "order_index": position,
+    }
+
+
+@router.delete("/{session_id}/remove-exercises", response_model=RemoveExercisesResult)
 async def remove_exercises_from_session(
     session_id: int,
     data: RemoveExercises,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
 ):
     # 1. verificar sesión
-    session = (
-        db.query(WorkoutSession)
-        .filter(
-            WorkoutSession.id == session_id,
-            WorkoutSession.user_id == current_user.id,
-        )
-        .first()
-    )
+    session = await db.scalar(owned_session_query(session_id, current_user.id))
 
     if not session:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Session not found"
         )
 
-    # 2. obtener solo ejercicios que estén realmente en la sesión
-    existing_links = (
-        db.query(SessionExercises)
-        .filter(
-            SessionExercises.session_id == session_id,
-            SessionExercises.exercise_id.in_(data.exercise_ids),
-        )
-        .all()
+    # 2. eliminar solo los vínculos que estén realmente en la sesión; sus
+    # sets salen de los rollups antes de borrarse en cascada
+    await apply_rollup(
+        db,
+        current_user.id,
+        SessionExercises.session_id == session_id,
+        SessionExercises.exercise_id.in_(data.exercise_ids),
+        sign=-1,
     )
+    released = await release_personal_records(
+        db,
+        current_user.id,
+        SessionExercises.session_id == session_id,
+        SessionExercises.exercise_id.in_(data.exercise_ids),
+    )
+    removed = (
+        await db.execute(remove_links_statement(session_id, data.exercise_ids))
+    ).all()
 
-    if not existing_links:
+    if not removed:
         raise HTTPException(
-            status_code=status.HTTP_400_NOT_FOUND,
+            status_code=status.HTTP_400_BAD_REQUEST,
             detail="None of the provided exercises are in this session",
         )
 
-    removed_ids = [link.exercise_id for link in existing_links]
-
-    # 3. eliminar vínculos
-    for link in existing_links:
-        db.delete(link)
-
-    db.commit()
-
-    # 4. Reordenar order_index para no dejar huecos
-    remaining = (
-        db.query(SessionExercises)
-        .filter(SessionExercises.session_id == session_id)
-        .order_by(SessionExercises.order_index.asc())
-        .all()
+    await recompute_personal_records(db, current_user.id, released)
+    await record_tombstones(
+        db, current_user.id, SessionExercises, [r.id for r in removed]
     )
 
-    for idx, link in enumerate(remaining, start=1):
-        link.order_index = idx
+    # 3. los demás conservan su rango: no hay que renumerarlos
+    remaining_count = await db.scalar(link_count_query(session_id))
 
-    db.commit()
+    await db.execute(bump_session_version([session_id]))
+    await db.commit()
 
     return {
         "session_id": session_id,
-        "removed_exercises": removed_ids,
-        "remaining_count": len(remaining),
+        "removed_exercises": [r.exercise_id for r in removed],
+        "remaining_count": remaining_count,
     }
 
 
-@router.delete("/{session_id}")
+@router.delete("/{session_id}", response_model=Message)
 async def delete_session(
     session_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
 ):
-    session = (
-        db.query(WorkoutSession)
-        .filter(
-            WorkoutSession.id == session_id, WorkoutSession.user_id == current_user.id
-        )
-        .first()
-    )
+    session = await db.scalar(owned_session_query(session_id, current_user.id))
 
     if not session:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Workout session not found"
         )
 
-    db.delete(session)
-    db.commit()
+    await apply_rollup(
+        db, current_user.id, SessionExercises.session_id == session_id, sign=-1
+    )
+    released = await release_personal_records(
+        db, current_user.id, SessionExercises.session_id == session_id
+    )
+    await db.delete(session)
+    await db.flush()
+    await recompute_personal_records(db, current_user.id, released)
+    await record_tombstones(db, current_user.id, WorkoutSession, [session_id])
+    await db.execute(bump_collection_version(current_user.id))
+    await db.commit()
 
     return {"detail": "Workout session deleted succesfully"}
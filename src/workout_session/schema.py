@@ -1,5 +1,7 @@
-from pydantic import BaseModel, Field
-from datetime import date
+from pydantic import BaseModel, ConfigDict, Field
+from datetime import date, datetime
+
+from src.sets.schemas import WeightUnit
 
 
 class WorkoutSessionCreate(BaseModel):
@@ -10,13 +12,18 @@ class WorkoutSessionCreate(BaseModel):
 
 class WorkoutSessionRead(BaseModel):
     id: int
+    user_id: int
     name: str
     notes: str | None
     session_date: date
-    created_at: str
+    created_at: datetime | None
+
+    model_config = ConfigDict(from_attributes=True)
 
-    class Config:
-        orm_mode = True
+
+class WorkoutSessionPage(BaseModel):
+    items: list[WorkoutSessionRead]
+    next_cursor: str | None
 
 
 class AddExercises(BaseModel):
@@ -29,3 +36,77 @@ class UpdateOrder(BaseModel):
 
 class RemoveExercises(BaseModel):
     exercise_ids: list[int]
+
+
+class ExercisePosition(BaseModel):
+    position: int = Field(..., ge=1)
+
+
+class AddExercisesResult(BaseModel):
+    session_id: int
+    added_exercises: list[int]
+    skipped_duplicates: list[int]
+
+
+class ReorderResult(BaseModel):
+    session_id: int
+    new_order: list[int]
+
+
+class ExercisePositionResult(BaseModel):
+    session_id: int
+    exercise_id: int
+    order_index: int
+
+
+class RemoveExercisesResult(BaseModel):
+    session_id: int
+    removed_exercises: list[int]
+    remaining_count: int
+
+
+class SessionSetDetail(BaseModel):
+    id: int
+    set_number: int
+    reps: int
+    weight: float | None
+    unit: WeightUnit
+    order_index: int
+
+
+class SessionExerciseDetail(BaseModel):
+    id: int
+    name: str
+    description: str | None
+    session_exercise_id: int
+    order_index: int
+    sets: list[SessionSetDetail]
+
+
+class WorkoutSessionDetail(BaseModel):
+    id: int
+    user_id: int
+    name: str
+    notes: str | None
+    created_at: datetime | None
+    session_date: date
+    version: int
+    exercises: list[SessionExerciseDetail]
+
+
+class SyncSet(BaseModel):
+    id: int | None = None
+    set_number: int
+    reps: int
+    weight: float
+    unit: WeightUnit
+
+
+class SyncExercise(BaseModel):
+    exercise_id: int
+    sets: list[SyncSet] = []
+
+
+class WorkoutSessionSync(WorkoutSessionCreate):
+    id: int | None = None
+    exercises: list[SyncExercise] = []
@@ -0,0 +1,262 @@
+from fastapi import HTTPException, status
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.analytics.queries import apply_rollup
+from src.analytics.records import (
+    record_personal_records,
+    recompute_personal_records,
+    release_personal_records,
+)
+from src.common.ordering import ORDER_STEP, ranks_for_order, reorder_statement
+from src.exercise.models import Exercise
+from src.session_exercises.models import SessionExercises
+from src.sets.models import Set
+from src.sync.queries import record_tombstones
+from src.workout_session.models import WorkoutSession
+from src.user.queries import bump_collection_version
+from src.workout_session.queries import (
+    bump_session_version,
+    load_session_tree,
+    session_tree_query,
+)
+from src.workout_session.schema import WorkoutSessionDetail, WorkoutSessionSync
+
+# Aplica el árbol completo de una sesión (sesión, ejercicios en orden y sets)
+# como un diff contra lo guardado, en una sola transacción. La cantidad de
+# sentencias no depende del tamaño del árbol: cada tipo de cambio
+# (insertar, actualizar, borrar) se hace con una sentencia por tabla.
+# Reenviar el mismo árbol (reintento de un cliente offline) solo lee: no
+# escribe nada ni toca rollups, récords o versiones.
+
+SET_FIELDS = ("set_number", "reps", "weight", "unit")
+# Lo que cuenta para los rollups y los récords
+TOTALS_KEYS = ("session_exercise_id", "reps", "weight", "unit")
+
+
+async def _current_tree(db: AsyncSession, session_id: int, user_id: int):
+    # Bloquea la sesión para que dos sync de la misma sesión no se mezclen
+    rows = (
+        await db.execute(
+            session_tree_query(session_id, user_id).with_for_update(of=WorkoutSession)
+        )
+    ).all()
+
+    if not rows:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Session not found"
+        )
+
+    _, _, name, notes, _, session_date = rows[0][:6]
+    session = {"name": name, "notes": notes, "session_date": session_date}
+    links, sets = {}, {}
+    for row in rows:
+        *_, link_id, link_rank, exercise_id, _, _, set_id = row[:-5]
+        if link_id is None:
+            continue
+        links[exercise_id] = (link_id, link_rank)
+        if set_id is not None:
+            sets[set_id] = {
+                "session_exercise_id": link_id,
+                **dict(zip(SET_FIELDS, row[-5:-1])),
+                "order_index": row[-1],
+            }
+
+    return session, links, sets
+
+
+async def _check_exercises(db: AsyncSession, exercise_ids: list[int], user_id: int):
+    if len(exercise_ids) != len(set(exercise_ids)):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="An exercise can only appear once per session",
+        )
+
+    if not exercise_ids:
+        return
+
+    owned = (
+        await db.scalars(
+            select(Exercise.id).where(
+                Exercise.id.in_(exercise_ids), Exercise.user_id == user_id
+            )
+        )
+    ).all()
+
+    if len(owned) != len(exercise_ids):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="One or more exercise IDs do not exist",
+        )
+
+
+async def sync_session_tree(
+    db: AsyncSession, data: WorkoutSessionSync, user_id: int
+) -> WorkoutSessionDetail:
+    exercise_ids = [e.exercise_id for e in data.exercises]
+    await _check_exercises(db, exercise_ids, user_id)
+
+    fields = {
+        "name": data.name,
+        "notes": data.notes,
+        "session_date": data.session_date,
+    }
+
+    # 1. lo guardado (nada si la sesión es nueva)
+    if data.id is None:
+        current, links, current_sets = None, {}, {}
+    else:
+        current, links, current_sets = await _current_tree(db, data.id, user_id)
+
+    # 2. el diff completo, antes de escribir nada
+    fields_changed = current != fields
+    date_changed = current is not None and current["session_date"] != data.session_date
+
+    exercise_ranks = dict(zip(exercise_ids, ranks_for_order(exercise_ids).values()))
+    new_exercises = [eid for eid in exercise_ids if eid not in links]
+    moved = {
+        links[eid][0]: rank
+        for eid, rank in exercise_ranks.items()
+        if eid in links and links[eid][1] != rank
+    }
+    removed_links = [
+        link_id for eid, (link_id, _) in links.items() if eid not in exercise_ranks
+    ]
+
+    # Los sets de ejercicios nuevos reciben el id del vínculo al insertarlo
+    new_sets, changed_sets, kept = [], [], set()
+    # Sets con otros totales (reps, peso, unidad) o en otro ejercicio
+    totals_changed = []
+    for exercise in data.exercises:
+        link_id = (
+            links[exercise.exercise_id][0] if exercise.exercise_id in links else None
+        )
+        for position, item in enumerate(exercise.sets, start=1):
+            values = {
+                "session_exercise_id": link_id,
+                **item.model_dump(include=set(SET_FIELDS)),
+                "order_index": position * ORDER_STEP,
+            }
+            if item.id is None:
+                new_sets.append((exercise.exercise_id, {"user_id": user_id, **values}))
+                continue
+
+            if item.id not in current_sets or item.id in kept:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Set {item.id} does not belong to this session",
+                )
+            kept.add(item.id)
+            stored = current_sets[item.id]
+            if stored != values:
+                changed_sets.append((exercise.exercise_id, {"id": item.id, **values}))
+            if any(stored[key] != values[key] for key in TOTALS_KEYS):
+                totals_changed.append(item.id)
+
+    removed_sets = [set_id for set_id in current_sets if set_id not in kept]
+
+    tree_changed = fields_changed or any(
+        (new_exercises, moved, removed_sets, changed_sets, removed_links, new_sets)
+    )
+    if not tree_changed:
+        # Reenvío sin cambios: solo lecturas
+        await db.commit()
+        return await load_session_tree(db, data.id, user_id)
+
+    # 3. lo que sale de los rollups y los récords, antes de tocar los sets.
+    # Si cambia la fecha los rollups mueven la sesión entera; si no, todo se
+    # limita a los sets afectados, como en edit_set y delete_set
+    stale = removed_sets + totals_changed
+    if date_changed:
+        await apply_rollup(db, user_id, SessionExercises.session_id == data.id, sign=-1)
+    elif stale:
+        await apply_rollup(db, user_id, Set.id.in_(stale), sign=-1)
+    released = []
+    if stale:
+        released = await release_personal_records(db, user_id, Set.id.in_(stale))
+
+    # 4. sesión: crearla o actualizar lo que cambió
+    if data.id is None:
+        session_id = await db.scalar(
+            insert(WorkoutSession)
+            .values(user_id=user_id, **fields)
+            .returning(WorkoutSession.id)
+        )
+    else:
+        session_id = data.id
+        if fields_changed:
+            await db.execute(
+                update(WorkoutSession)
+                .where(WorkoutSession.id == session_id)
+                .values(**fields)
+            )
+
+    # 5. ejercicios nuevos, con su rango final
+    if new_exercises:
+        inserted = await db.execute(
+            insert(SessionExercises).returning(
+                SessionExercises.exercise_id,
+                SessionExercises.id,
+                sort_by_parameter_order=True,
+            ),
+            [
+                {
+                    "session_id": session_id,
+                    "user_id": user_id,
+                    "exercise_id": eid,
+                    "order_index": exercise_ranks[eid],
+                }
+                for eid in new_exercises
+            ],
+        )
+        links.update({eid: (link_id, exercise_ranks[eid]) for eid, link_id in inserted})
+    for eid, values in new_sets + changed_sets:
+        values["session_exercise_id"] = links[eid][0]
+
+    # 6. ejercicios existentes que cambian de posición
+    if moved:
+        await db.execute(reorder_statement(SessionExercises, moved))
+
+    # 7. sets
+    if removed_sets:
+        await db.execute(delete(Set).where(Set.id.in_(removed_sets)))
+        await record_tombstones(db, user_id, Set, removed_sets)
+
+    # UPDATE masivo por clave primaria: un solo executemany
+    if changed_sets:
+        await db.execute(update(Set), [values for _, values in changed_sets])
+
+    # 8. ejercicios quitados (sus sets ya se borraron arriba)
+    if removed_links:
+        await db.execute(
+            delete(SessionExercises).where(SessionExercises.id.in_(removed_links))
+        )
+        await record_tombstones(db, user_id, SessionExercises, removed_links)
+
+    new_ids = []
+    if new_sets:
+        new_ids = (
+            await db.scalars(
+                insert(Set).returning(Set.id), [values for _, values in new_sets]
+            )
+        ).all()
+
+    # 9. lo que vuelve a los rollups y récords
+    fresh = totals_changed + list(new_ids)
+    if date_changed:
+        await apply_rollup(db, user_id, SessionExercises.session_id == session_id)
+    elif fresh:
+        await apply_rollup(db, user_id, Set.id.in_(fresh))
+    await recompute_personal_records(db, user_id, released)
+    if fresh:
+        await record_personal_records(db, user_id, Set.id.in_(fresh))
+
+    # 10. versiones para los ETag
+    if data.id is not None:
+        await db.execute(bump_session_version([session_id]))
+    if fields_changed:
+        await db.execute(bump_collection_version(user_id))
+
+    await db.commit()
+
+    return await load_session_tree(db, session_id, user_id)
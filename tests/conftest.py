@@ -0,0 +1,58 @@
+import pytest
+from sqlalchemy import delete, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Los tests corren contra la base de DB_* ya migrada (alembic upgrade head);
+# si no hay base disponible se saltean
+from config.database import build_async_engine
+from src.user.models import User
+from tests.helpers import create_user
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def engine():
+    engine = build_async_engine(pooled=False)
+    try:
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+    except (OSError, DBAPIError) as error:
+        await engine.dispose()
+        pytest.skip(f"database not available: {error}")
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+async def db(engine):
+    # Todo el test corre en una transacción que se descarta al final; los
+    # commit de las rutas quedan como savepoints
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        session = AsyncSession(
+            bind=connection,
+            join_transaction_mode="create_savepoint",
+            expire_on_commit=False,
+        )
+        try:
+            yield session
+        finally:
+            await session.close()
+            await transaction.rollback()
+
+
+@pytest.fixture
+async def committed_user(engine):
+    # Para tests con varias conexiones a la vez: los datos se confirman y se
+    # borran al final junto con el usuario (ON DELETE CASCADE)
+    async with AsyncSession(engine) as db:
+        user_id = await create_user(db)
+        await db.commit()
+    yield user_id
+    async with engine.begin() as connection:
+        await connection.execute(delete(User).where(User.id == user_id))
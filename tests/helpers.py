@@ -0,0 +1,48 @@
+import uuid
+
+from sqlalchemy import event, insert
+
+from src.user.models import User
+
+
+async def create_user(db) -> int:
+    username = f"test_{uuid.uuid4().hex[:12]}"
+    return await db.scalar(
+        insert(User)
+        .values(
+            name="Test user",
+            username=username,
+            password_hash="x",
+            email=f"{username}@example.com",
+        )
+        .returning(User.id)
+    )
+
+
+class QueryCounter:
+    # Cuenta las sentencias que el engine envía a la base
+    def __init__(self, engine):
+        self.engine = engine.sync_engine
+        self.statements = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    @property
+    def writes(self) -> list[str]:
+        return [
+            statement
+            for statement in self.statements
+            if statement.lstrip().upper().startswith(("INSERT", "UPDATE", "DELETE"))
+        ]
+
+    def _count(self, conn, cursor, statement, *args):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._count)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._count)
@@ -0,0 +1,42 @@
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.exercise.models import Exercise
+from src.sync.queries import load_changes
+
+pytestmark = pytest.mark.anyio
+
+
+async def _poll(engine, user_id: int, after: tuple[int, int]):
+    async with AsyncSession(engine) as db:
+        changes, last_key, _ = await load_changes(db, user_id, after, 50)
+    return {row["id"] for row in changes["exercises"]}, last_key
+
+
+async def test_late_commit_is_not_skipped(engine, committed_user):
+    async with AsyncSession(engine) as slow, AsyncSession(engine) as fast:
+        # La transacción lenta escribe primero (versión menor) y confirma
+        # después de que otra ya confirmó y el feed avanzó
+        slow_id = await slow.scalar(
+            insert(Exercise)
+            .values(user_id=committed_user, name="Slow")
+            .returning(Exercise.id)
+        )
+        fast_id = await fast.scalar(
+            insert(Exercise)
+            .values(user_id=committed_user, name="Fast")
+            .returning(Exercise.id)
+        )
+        await fast.commit()
+
+        seen, cursor = await _poll(engine, committed_user, (0, 0))
+        # Mientras la lenta no confirma, el feed no pasa de ella: tampoco
+        # entrega la rápida, que quedaría antes del cursor
+        assert fast_id not in seen
+        await slow.commit()
+
+    later, _ = await _poll(engine, committed_user, cursor)
+
+    assert slow_id not in seen
+    assert later == {slow_id, fast_id}
@@ -0,0 +1,115 @@
+import asyncio
+from datetime import date
+
+import pytest
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth.schema import Principal
+from src.common.ordering import ORDER_STEP
+from src.exercise.models import Exercise
+from src.session_exercises.models import SessionExercises
+from src.sets.models import Set
+from src.sets.routes import add_set_to_session_exercise
+from src.sets.schemas import SetCreate, WeightUnit
+from src.workout_session.models import WorkoutSession
+from src.workout_session.routes import add_exercises_to_session
+from src.workout_session.schema import AddExercises
+
+pytestmark = pytest.mark.anyio
+
+CONCURRENT = 5
+
+
+async def _session_with_exercises(engine, user_id: int, exercises: int):
+    async with AsyncSession(engine) as db:
+        session_id = await db.scalar(
+            insert(WorkoutSession)
+            .values(user_id=user_id, name="Ranks", session_date=date(2024, 5, 1))
+            .returning(WorkoutSession.id)
+        )
+        exercise_ids = (
+            await db.scalars(
+                insert(Exercise).returning(Exercise.id),
+                [
+                    {"user_id": user_id, "name": f"Exercise {number}"}
+                    for number in range(exercises)
+                ],
+            )
+        ).all()
+        await db.commit()
+    return session_id, list(exercise_ids)
+
+
+async def _concurrently(engine, route, calls):
+    # Cada llamada con su propia conexión, todas a la vez
+    async def call(args):
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            return await route(*args, db=db)
+
+    return await asyncio.gather(*(call(args) for args in calls))
+
+
+async def test_concurrent_set_adds_get_distinct_ranks(engine, committed_user):
+    principal = Principal(id=committed_user, username="test")
+    session_id, (exercise_id,) = await _session_with_exercises(
+        engine, committed_user, 1
+    )
+    async with AsyncSession(engine) as db:
+        await db.execute(
+            insert(SessionExercises).values(
+                session_id=session_id,
+                user_id=committed_user,
+                exercise_id=exercise_id,
+                order_index=ORDER_STEP,
+            )
+        )
+        await db.commit()
+
+    data = SetCreate(
+        set_number=1, reps=5, weight=60.0, unit=WeightUnit.kg, order_index=1
+    )
+    created = await _concurrently(
+        engine,
+        add_set_to_session_exercise,
+        [(session_id, exercise_id, data, principal)] * CONCURRENT,
+    )
+
+    async with AsyncSession(engine) as db:
+        ranks = (
+            await db.scalars(
+                select(Set.order_index)
+                .join(SessionExercises, SessionExercises.id == Set.session_exercise_id)
+                .where(SessionExercises.session_id == session_id)
+            )
+        ).all()
+
+    assert len({written.id for written in created}) == CONCURRENT
+    assert len(set(ranks)) == CONCURRENT
+
+
+async def test_concurrent_exercise_adds_get_distinct_ranks(engine, committed_user):
+    principal = Principal(id=committed_user, username="test")
+    session_id, exercise_ids = await _session_with_exercises(
+        engine, committed_user, CONCURRENT
+    )
+
+    await _concurrently(
+        engine,
+        add_exercises_to_session,
+        [
+            (session_id, AddExercises(exercise_ids=[exercise_id]), principal)
+            for exercise_id in exercise_ids
+        ],
+    )
+
+    async with AsyncSession(engine) as db:
+        ranks = (
+            await db.scalars(
+                select(SessionExercises.order_index).where(
+                    SessionExercises.session_id == session_id
+                )
+            )
+        ).all()
+
+    assert len(set(ranks)) == CONCURRENT
@@ -0,0 +1,86 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import insert
+
+from src.exercise.models import Exercise
+from src.sets.schemas import WeightUnit
+from src.workout_session.schema import SyncExercise, SyncSet, WorkoutSessionSync
+from src.workout_session.sync import sync_session_tree
+from tests.helpers import QueryCounter, create_user
+
+pytestmark = pytest.mark.anyio
+
+
+def _resend(tree) -> WorkoutSessionSync:
+    # Lo mismo que devolvió el servidor, como lo reenviaría un cliente offline
+    return WorkoutSessionSync(
+        id=tree.id,
+        name=tree.name,
+        notes=tree.notes,
+        session_date=tree.session_date,
+        exercises=[
+            SyncExercise(
+                exercise_id=exercise.id,
+                sets=[
+                    SyncSet(
+                        id=s.id,
+                        set_number=s.set_number,
+                        reps=s.reps,
+                        weight=s.weight,
+                        unit=s.unit,
+                    )
+                    for s in exercise.sets
+                ],
+            )
+            for exercise in tree.exercises
+        ],
+    )
+
+
+async def test_unchanged_resync_does_not_write(engine, db):
+    user_id = await create_user(db)
+
+    counts = {}
+    for exercises, sets in [(1, 1), (10, 5)]:
+        exercise_ids = (
+            await db.scalars(
+                insert(Exercise).returning(Exercise.id),
+                [
+                    {"user_id": user_id, "name": f"Exercise {exercises}-{number}"}
+                    for number in range(exercises)
+                ],
+            )
+        ).all()
+        tree = await sync_session_tree(
+            db,
+            WorkoutSessionSync(
+                name="Offline day",
+                session_date=date(2024, 5, 1),
+                exercises=[
+                    SyncExercise(
+                        exercise_id=exercise_id,
+                        sets=[
+                            SyncSet(
+                                set_number=number,
+                                reps=5,
+                                weight=60.0 + number,
+                                unit=WeightUnit.kg,
+                            )
+                            for number in range(1, sets + 1)
+                        ],
+                    )
+                    for exercise_id in exercise_ids
+                ],
+            ),
+            user_id,
+        )
+
+        with QueryCounter(engine) as counter:
+            again = await sync_session_tree(db, _resend(tree), user_id)
+
+        assert again == tree
+        assert counter.writes == [], counter.writes
+        counts[(exercises, sets)] = counter.count
+
+    assert len(set(counts.values())) == 1, counts
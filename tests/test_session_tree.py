@@ -0,0 +1,73 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import insert
+
+from src.common.ordering import ORDER_STEP
+from src.exercise.models import Exercise
+from src.session_exercises.models import SessionExercises
+from src.sets.models import Set
+from src.sets.schemas import WeightUnit
+from src.workout_session.models import WorkoutSession
+from src.workout_session.queries import load_session_tree
+from tests.helpers import QueryCounter, create_user
+
+pytestmark = pytest.mark.anyio
+
+
+async def _session_with(db, user_id: int, exercises: int, sets: int) -> int:
+    session_id = await db.scalar(
+        insert(WorkoutSession)
+        .values(user_id=user_id, name="Tree", session_date=date(2024, 5, 1))
+        .returning(WorkoutSession.id)
+    )
+    for position in range(1, exercises + 1):
+        exercise_id = await db.scalar(
+            insert(Exercise)
+            .values(user_id=user_id, name=f"Exercise {session_id}-{position}")
+            .returning(Exercise.id)
+        )
+        link_id = await db.scalar(
+            insert(SessionExercises)
+            .values(
+                session_id=session_id,
+                user_id=user_id,
+                exercise_id=exercise_id,
+                order_index=position * ORDER_STEP,
+            )
+            .returning(SessionExercises.id)
+        )
+        if sets:
+            await db.execute(
+                insert(Set),
+                [
+                    {
+                        "user_id": user_id,
+                        "session_exercise_id": link_id,
+                        "set_number": number,
+                        "reps": 5,
+                        "weight": 60.0,
+                        "unit": WeightUnit.kg,
+                        "order_index": number * ORDER_STEP,
+                    }
+                    for number in range(1, sets + 1)
+                ],
+            )
+    return session_id
+
+
+async def test_session_tree_query_count_does_not_grow(engine, db):
+    user_id = await create_user(db)
+
+    counts = {}
+    for exercises, sets in [(1, 1), (10, 5), (30, 10)]:
+        session_id = await _session_with(db, user_id, exercises, sets)
+
+        with QueryCounter(engine) as counter:
+            tree = await load_session_tree(db, session_id, user_id)
+
+        assert len(tree.exercises) == exercises
+        assert all(len(e.sets) == sets for e in tree.exercises)
+        counts[(exercises, sets)] = counter.count
+
+    assert set(counts.values()) == {1}, counts